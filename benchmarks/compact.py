@@ -0,0 +1,61 @@
+"""Backlog compaction: time to fold days of inboxes into the partitions.
+
+    python -m benchmarks.compact [--days 4] [--max_inboxes 600] [--max_workers 1 4]
+
+Writes `--days` days of full-horizon synthetic scrapes (48 a day) as inbox
+databases, then compacts them as the daily job does after an outage, in
+batches of `--max_inboxes`, and reports the total and per-inbox merge time for
+each `--max_workers` (partitions written at once).
+The inboxes are rewritten for every repeat so each run starts from the same
+backlog.
+"""
+
+import argparse
+import statistics
+import tempfile
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.inbox import _scrape
+from cift.store import Store
+from cift.timestamps import HALF_HOUR_SECONDS
+from cift.timestamps import compact_to_epoch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=4)
+    parser.add_argument("--max_inboxes", type=int, default=600)
+    parser.add_argument("--max_workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    first = compact_to_epoch("2024-01-12T0000Z")
+    slots = args.days * 48
+    scrapes = [_scrape(first + i * HALF_HOUR_SECONDS) for i in range(slots)]
+    after = datetime.fromtimestamp(first + (args.days + 1) * 86400, tz=timezone.utc)
+
+    for workers in args.max_workers:
+        timings = []
+        for _ in range(args.repeats):
+            with tempfile.TemporaryDirectory() as tmp:
+                with Store(Path(tmp) / "db") as store:
+                    for scrape in scrapes:
+                        store.write_inbox(scrape)
+                    started = perf_counter()
+                    while store.compact(
+                        now=after, max_inboxes=args.max_inboxes, max_workers=workers
+                    ).merged_inboxes:
+                        pass
+                    timings.append(perf_counter() - started)
+        total = statistics.median(timings)
+        print(
+            f"{slots} inboxes, {workers} worker(s): {total:.2f}s total,"
+            f" {total / slots * 1e3:.1f}ms per inbox (median of {args.repeats})"
+        )
+
+
+if __name__ == "__main__":
+    main()
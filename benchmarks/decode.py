@@ -0,0 +1,37 @@
+"""Backlog JSON decoding: str round trip versus the bytes decode layer.
+
+    python -m benchmarks.decode
+
+Decodes every real_day fixture file as the migration does. Install orjson to
+compare the fast backend; without it both rows use the stdlib.
+"""
+
+import json
+import timeit
+from pathlib import Path
+
+from cift.decode import DECODER
+from cift.decode import loads
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "real_day"
+
+
+def main() -> None:
+    files = sorted(FIXTURES.glob("*/*.json"))
+    megabytes = sum(path.stat().st_size for path in files) / 1e6
+
+    def text_then_parse() -> None:
+        for path in files:
+            json.loads(path.read_text())
+
+    def bytes_layer() -> None:
+        for path in files:
+            loads(path.read_bytes())
+
+    for label, run in (("read_text + json", text_then_parse), (DECODER, bytes_layer)):
+        seconds = min(timeit.repeat(run, number=5, repeat=5)) / 5
+        print(f"{label:>16}: {megabytes / seconds:6.1f} MB/s over {len(files)} files")
+
+
+if __name__ == "__main__":
+    main()
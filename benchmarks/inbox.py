@@ -0,0 +1,104 @@
+"""Inbox formats: bytes committed and merge time, database versus pack.
+
+    python -m benchmarks.inbox [--slots 48]
+
+Writes one day of full-horizon synthetic scrapes as each inbox format, commits
+them one by one to a scratch git repository as the ingest workflow does, and
+reports per inbox: the file size, what the repository grows by once git has
+packed and delta-compressed its objects, and how long compaction takes to merge
+it into the partitions. Synthetic scrapes repeat every window's values exactly,
+so the committed sizes flatter all formats next to real, revised forecasts.
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.standin import synthetic_payload
+from cift.parse import ENDPOINTS
+from cift.parse import Snapshot
+from cift.parse import parse_snapshot
+from cift.store import Store
+from cift.timestamps import HALF_HOUR_SECONDS
+from cift.timestamps import compact_to_epoch
+
+# (packed, compress)
+FORMATS = {
+    "database": (False, False),
+    "packed": (True, False),
+    "packed, compressed": (True, True),
+}
+
+
+def _scrape(slot_utc: int) -> list[Snapshot]:
+    return [
+        parse_snapshot(
+            endpoint,
+            json.loads(synthetic_payload(endpoint, slot_utc + 60)),
+            slot_utc,
+            slot_utc + 60,
+        )
+        for endpoint in ENDPOINTS
+    ]
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _committed_bytes(inboxes: list[Path], repo: Path) -> int:
+    """Size of the packed repository after committing each inbox in turn."""
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.email", "bench@example.invalid")
+    _git(repo, "config", "user.name", "bench")
+    for inbox in inboxes:
+        shutil.copy2(inbox, repo / inbox.name)
+        _git(repo, "add", inbox.name)
+        _git(repo, "commit", "-q", "-m", inbox.name)
+    _git(repo, "gc", "-q")
+    stats = dict(
+        line.split(": ") for line in _git(repo, "count-objects", "-v").splitlines()
+    )
+    return int(stats["size-pack"]) * 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slots", type=int, default=48)
+    args = parser.parse_args()
+
+    first = compact_to_epoch("2024-01-12T0000Z")
+    scrapes = [_scrape(first + i * HALF_HOUR_SECONDS) for i in range(args.slots)]
+    after = datetime.fromtimestamp(first + 2 * 86400, tz=timezone.utc)
+
+    print(f"{'format':<20} {'file':>9} {'committed':>10} {'merge':>9}")
+    for label, (packed, compress) in FORMATS.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = Store(Path(tmp) / "db")
+            inboxes = [
+                store.write_inbox(scrape, packed=packed, compress=compress)
+                for scrape in scrapes
+            ]
+            size = statistics.median(path.stat().st_size for path in inboxes)
+            committed = _committed_bytes(inboxes, Path(tmp) / "repo")
+            started = perf_counter()
+            store.compact(now=after)
+            merge = (perf_counter() - started) / len(inboxes)
+        print(
+            f"{label:<20} {size / 1024:>7.1f}KB {committed / len(inboxes) / 1024:>8.1f}KB"
+            f" {merge * 1e3:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
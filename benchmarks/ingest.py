@@ -0,0 +1,108 @@
+"""End-to-end ingest over HTTP against the local API stand-in.
+
+    python -m benchmarks.ingest [--synthetic] [--workers 1 5]
+
+Runs run_ingest with the real CarbonIntensityClient for every real_day slot
+(or, with --synthetic, six slots of full-horizon synthetic payloads) under each
+fault scenario, and reports per-scrape medians: wall time, the fetch phase, the
+inbox write, and retries. The write is the wall time left once the fetch and
+parse phase is over: the slowest endpoint when fetching concurrently, all of
+them in turn otherwise.
+"""
+
+import argparse
+import statistics
+import tempfile
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.standin import REAL_DAY
+from benchmarks.standin import Faults
+from benchmarks.standin import Payloads
+from benchmarks.standin import StandIn
+from benchmarks.standin import fixture_payloads
+from benchmarks.standin import slot_clock
+from benchmarks.standin import synthetic_payload
+from cift.client import CarbonIntensityClient
+from cift.client import RetryPolicy
+from cift.client import pooled_session
+from cift.ingest import IncompleteIngestError
+from cift.ingest import run_ingest
+from cift.store import Store
+from cift.timestamps import HALF_HOUR_SECONDS
+from cift.timestamps import compact_to_epoch
+
+SCENARIOS = {
+    "clean": Faults(),
+    "latency 100ms": Faults(latency_seconds=0.1),
+    "5xx burst x2": Faults(burst_5xx=2),
+    "slow drip": Faults(drip_bytes=1024, drip_interval_seconds=0.01),
+    "horizon 4 windows": Faults(horizon_windows=4),
+}
+
+# Short backoff so retry scenarios measure the client, not the sleep.
+RETRY = RetryPolicy(base_delay_seconds=0.05, max_delay_seconds=0.2)
+
+
+def _real_day_slots() -> list[int]:
+    stamps = sorted(path.stem for path in (REAL_DAY / "national_fw48h").glob("*.json"))
+    return [compact_to_epoch(stamp) - 60 for stamp in stamps]
+
+
+def _scrape(db_root: Path, slot_utc: int, base_url: str, workers: int) -> list[float]:
+    """One ingest: [wall, fetch phase, write, retries] seconds (retries a count)."""
+    client = CarbonIntensityClient(
+        session=pooled_session(),
+        retry=RETRY,
+        clock=slot_clock(slot_utc),
+        base_url=base_url,
+    )
+    now = datetime.fromtimestamp(slot_utc + 60, tz=timezone.utc)
+    started = perf_counter()
+    try:
+        run_ingest(db_root, now, client, max_workers=workers)
+    except IncompleteIngestError:
+        pass
+    wall = perf_counter() - started
+    metrics = Store(db_root).ingest_metrics()
+    phases = [m.fetch_seconds + (m.parse_seconds or 0.0) for m in metrics]
+    fetching = max(phases) if workers > 1 else sum(phases)
+    retries = sum(m.retries or 0 for m in metrics)
+    return [wall, fetching, wall - fetching, float(retries)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 5])
+    args = parser.parse_args()
+
+    payloads: Payloads
+    if args.synthetic:
+        payloads = synthetic_payload
+        first = compact_to_epoch("2024-01-12T0600Z")
+        slots = [first + i * HALF_HOUR_SECONDS for i in range(6)]
+    else:
+        payloads, slots = fixture_payloads(), _real_day_slots()
+
+    print(f"{'scenario':<18} {'workers':>7} {'wall':>8} {'fetch':>8} {'write':>8}")
+    for label, faults in SCENARIOS.items():
+        for workers in args.workers:
+            samples = []
+            with StandIn(payloads, faults) as api, tempfile.TemporaryDirectory() as tmp:
+                for slot_utc in slots:
+                    db_root = Path(tmp) / str(slot_utc)
+                    samples.append(_scrape(db_root, slot_utc, api.base_url, workers))
+            wall, fetching, write, retries = (
+                statistics.median(column) for column in zip(*samples, strict=True)
+            )
+            print(
+                f"{label:<18} {workers:>7} {wall * 1e3:>6.1f}ms {fetching * 1e3:>6.1f}ms"
+                f" {write * 1e3:>6.1f}ms  retries/scrape {retries:.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Batch snapshot parsing: throughput by process-pool size.
+
+    python -m benchmarks.parse
+
+Parses every real_day fixture, repeated to a few thousand payloads, through
+parse_snapshots as the JSON backlog staging does.
+"""
+
+import os
+from pathlib import Path
+from time import perf_counter
+
+from cift.parse import parse_snapshots
+from cift.timestamps import compact_to_epoch
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "real_day"
+
+
+def main() -> None:
+    items = [
+        (path.parent.name, path.read_bytes(), compact_to_epoch(path.stem) - 60)
+        for path in sorted(FIXTURES.glob("*/*.json"))
+    ] * 100
+    megabytes = sum(len(data) for _, data, _ in items) / 1e6
+    workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    for count in workers:
+        started = perf_counter()
+        parsed = sum(1 for _ in parse_snapshots(items, max_workers=count))
+        seconds = perf_counter() - started
+        print(
+            f"{count:>2} workers: {parsed / seconds:8.0f} payloads/s"
+            f" {megabytes / seconds:6.1f} MB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
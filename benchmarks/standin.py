@@ -0,0 +1,302 @@
+"""A local stand-in for the Carbon Intensity API, with latency and fault injection.
+
+Serves the five ingest routes of TEMPLATE_URLS over real HTTP, so the real
+CarbonIntensityClient (pooling, gzip, retries, deadlines) can be exercised and
+benchmarked without touching the API:
+
+    with StandIn(fixture_payloads(), Faults(burst_5xx=2)) as api:
+        client = CarbonIntensityClient(base_url=api.base_url, clock=slot_clock(slot))
+
+Bodies come from the real_day fixtures, keyed by query time, or are synthesised
+with full 48-hour and 24-hour horizons for any slot.
+"""
+
+import gzip
+import json
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+from typing import Callable
+
+from cift.api import BASE_URL
+from cift.api import DATETIME_FMT_STR
+from cift.api import REGION_IDS
+from cift.api import TEMPLATE_URLS
+from cift.parse import ENDPOINTS
+from cift.parse import FUELS
+from cift.timestamps import HALF_HOUR_SECONDS
+from cift.timestamps import to_epoch
+
+REAL_DAY = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "real_day"
+
+# (endpoint, query unix time) -> response body; KeyError means 404.
+Payloads = Callable[[str, int], bytes]
+
+# Single-region routes are served by slicing the bulk payload for the same query.
+_ONE_REGION = {
+    "one_region_fw48h": "regional_fw48h",
+    "one_region_pt24h": "regional_pt24h",
+}
+
+_ROUTES = [
+    (
+        endpoint,
+        re.compile(
+            re.escape(TEMPLATE_URLS[endpoint].removeprefix(BASE_URL)).replace(
+                re.escape("{}"), "([^/]+)"
+            )
+            + "$"
+        ),
+    )
+    for endpoint in (*ENDPOINTS, *_ONE_REGION)
+]
+
+
+@dataclass(frozen=True)
+class Faults:
+    """How the stand-in misbehaves. Every fault applies to every route.
+
+    `burst_5xx` answers the first N requests for each URL with a 503, so a client
+    needs N retries per endpoint. `horizon_windows` truncates each payload to its
+    first N windows. `missing_region` drops that region from the first window of
+    bulk regional payloads, which single-region routes still serve whole. A
+    positive `drip_bytes` writes the body in chunks of that size
+    with `drip_interval_seconds` between them; `latency_seconds` delays the headers.
+    """
+
+    latency_seconds: float = 0.0
+    burst_5xx: int = 0
+    horizon_windows: int | None = None
+    missing_region: int | None = None
+    drip_bytes: int = 0
+    drip_interval_seconds: float = 0.0
+    gzip: bool = True
+
+
+def fixture_payloads(directory: Path = REAL_DAY) -> Payloads:
+    """Serve `<directory>/<endpoint>/<query stamp>.json`, as the real_day capture."""
+
+    def payload(endpoint: str, query_utc: int) -> bytes:
+        stamp = datetime.fromtimestamp(query_utc, tz=timezone.utc)
+        path = directory / endpoint / f"{stamp:%Y-%m-%dT%H%MZ}.json"
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            raise KeyError(path.name) from None
+
+    return payload
+
+
+def _stamp(window_utc: int) -> str:
+    return datetime.fromtimestamp(window_utc, tz=timezone.utc).strftime(
+        DATETIME_FMT_STR
+    )
+
+
+def _mix(seed: int) -> list[dict[str, Any]]:
+    """Nine one-decimal percentages summing to 100, varying with `seed`."""
+    tenths = [(seed * (i + 3) * 37) % 120 for i in range(len(FUELS) - 1)]
+    tenths.append(1000 - sum(tenths))
+    return [
+        {"fuel": fuel, "perc": t / 10} for fuel, t in zip(FUELS, tenths, strict=True)
+    ]
+
+
+def _window(endpoint: str, window_utc: int, slot_utc: int) -> dict[str, Any]:
+    step = window_utc // HALF_HOUR_SECONDS
+    window: dict[str, Any] = {
+        "from": _stamp(window_utc),
+        "to": _stamp(window_utc + HALF_HOUR_SECONDS),
+    }
+    if endpoint == "national_generation_pt24h":
+        window["generationmix"] = _mix(step)
+    elif endpoint.startswith("national"):
+        actual = 150 + step % 90 if window_utc < slot_utc else None
+        window["intensity"] = {
+            "forecast": 150 + (step * 7) % 100,
+            "actual": actual,
+            "index": "moderate",
+        }
+    else:
+        window["regions"] = [
+            {
+                "regionid": region,
+                "intensity": {
+                    "forecast": 50 + (step * 7 + region * 13) % 250,
+                    "index": "moderate",
+                },
+                "generationmix": _mix(step + region),
+            }
+            for region in REGION_IDS
+        ]
+    return window
+
+
+@lru_cache(maxsize=64)
+def synthetic_payload(endpoint: str, query_utc: int) -> bytes:
+    """A full-horizon body for any slot: 96 windows forward, 48 back. Memoized, so
+    benchmarks time the client rather than the stand-in building payloads."""
+    slot_utc = query_utc - query_utc % HALF_HOUR_SECONDS
+    if endpoint.endswith("fw48h"):
+        first, count = slot_utc, 96
+    else:
+        first, count = slot_utc - 48 * HALF_HOUR_SECONDS, 48
+    windows = [
+        _window(endpoint, first + i * HALF_HOUR_SECONDS, slot_utc) for i in range(count)
+    ]
+    return json.dumps({"data": windows}).encode()
+
+
+def _route(path: str) -> tuple[str, int, int | None] | None:
+    """(endpoint, query unix time, region id or None) for a served route."""
+    for endpoint, pattern in _ROUTES:
+        match = pattern.match(path)
+        if match:
+            try:
+                query_utc = to_epoch(match.group(1))
+                region_id = int(match.group(2)) if endpoint in _ONE_REGION else None
+            except ValueError:
+                return None
+            return endpoint, query_utc, region_id
+    return None
+
+
+def _one_region(bulk: dict[str, Any], region_id: int) -> dict[str, Any]:
+    """The one_region_* shape: one region object wrapping its own windows."""
+    windows = []
+    for window in bulk["data"]:
+        (region,) = [r for r in window["regions"] if r["regionid"] == region_id]
+        windows.append(
+            {
+                "from": window["from"],
+                "to": window["to"],
+                "intensity": region["intensity"],
+                "generationmix": region["generationmix"],
+            }
+        )
+    return {"data": [{"regionid": region_id, "data": windows}]}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, payloads: Payloads, faults: Faults) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.payloads = payloads
+        self.faults = faults
+        self.hits: Counter[str] = Counter()
+        self.lock = threading.Lock()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; Nagle would hold the body back.
+    disable_nagle_algorithm = True
+    server: _Server
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server's naming
+        faults = self.server.faults
+        with self.server.lock:
+            self.server.hits[self.path] += 1
+            hit = self.server.hits[self.path]
+        if faults.latency_seconds:
+            time.sleep(faults.latency_seconds)
+        if hit <= faults.burst_5xx:
+            self._send(503, b'{"error": "stand-in burst"}')
+            return
+        route = _route(self.path)
+        try:
+            if route is None:
+                raise KeyError(self.path)
+            endpoint, query_utc, region_id = route
+            body = self.server.payloads(_ONE_REGION.get(endpoint, endpoint), query_utc)
+        except KeyError:
+            self._send(404, b"{}")
+            return
+        reshaped = region_id is not None or faults.missing_region is not None
+        if reshaped or faults.horizon_windows is not None:
+            payload = json.loads(body)
+            if faults.horizon_windows is not None:
+                payload["data"] = payload["data"][: faults.horizon_windows]
+            if region_id is not None:
+                payload = _one_region(payload, region_id)
+            elif faults.missing_region is not None and endpoint.startswith("regional"):
+                regions = payload["data"][0]["regions"]
+                regions[:] = [
+                    r for r in regions if r["regionid"] != faults.missing_region
+                ]
+            body = json.dumps(payload).encode()
+        self._send(200, body)
+
+    def _send(self, status: int, body: bytes) -> None:
+        faults = self.server.faults
+        compress = faults.gzip and "gzip" in self.headers.get("Accept-Encoding", "")
+        if compress:
+            body = gzip.compress(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if faults.drip_bytes <= 0:
+            self.wfile.write(body)
+            return
+        for start in range(0, len(body), faults.drip_bytes):
+            end = start + faults.drip_bytes
+            self.wfile.write(body[start:end])
+            self.wfile.flush()
+            time.sleep(faults.drip_interval_seconds)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StandIn:
+    """The stand-in API on an ephemeral localhost port, served from a thread."""
+
+    def __init__(self, payloads: Payloads, faults: Faults | None = None) -> None:
+        self._server = _Server(payloads, faults if faults is not None else Faults())
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="cift-standin", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def requests(self) -> int:
+        """Requests served so far, faults included."""
+        with self._server.lock:
+            return sum(self._server.hits.values())
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandIn":
+        return self
+
+    def __exit__(
+        self,
+        kind: type[BaseException] | None,
+        error: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def slot_clock(slot_utc: int) -> Callable[[], float]:
+    """A wall clock that reads one minute into `slot_utc` now and runs in real
+    time, so the client's slot deadline allows retries against old fixtures."""
+    offset = slot_utc + 60 - time.time()
+    return lambda: time.time() + offset
@@ -0,0 +1,57 @@
+"""Timestamp codec versus strptime, cold and memoized.
+
+    python -m benchmarks.timestamps
+
+Cold: every string distinct (first sight of a window). Warm: the migration's real
+pattern, where each window string recurs in ~96 forward and ~48 past captures.
+"""
+
+import timeit
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from cift.timestamps import _date_seconds
+from cift.timestamps import to_epoch
+
+
+def strptime_epoch(timestamp: str) -> int:
+    dt = datetime.strptime(timestamp, "%Y-%m-%dT%H:%MZ").replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def time_codec(stamps: list[str], cold: bool) -> float:
+    def codec() -> None:
+        if cold:
+            to_epoch.cache_clear()
+            _date_seconds.cache_clear()
+        for stamp in stamps:
+            to_epoch(stamp)
+
+    return min(timeit.repeat(codec, number=1))
+
+
+def time_strptime(stamps: list[str]) -> float:
+    return min(timeit.repeat(lambda: [strptime_epoch(s) for s in stamps], number=1))
+
+
+def main() -> None:
+    start = datetime(2023, 3, 1, tzinfo=timezone.utc)
+    distinct = [
+        (start + timedelta(minutes=30 * i)).strftime("%Y-%m-%dT%H:%MZ")
+        for i in range(20_000)
+    ]
+    recurring = [stamp for stamp in distinct[:500] for _ in range(40)]
+
+    for label, stamps in (("cold", distinct), ("warm", recurring)):
+        baseline = time_strptime(stamps)
+        fast = time_codec(stamps, cold=label == "cold")
+        per = 1e9 / len(stamps)
+        print(
+            f"{label}: strptime {baseline * per:7.0f} ns/op  codec {fast * per:6.0f}"
+            f" ns/op  speed-up x{baseline / fast:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -156,22 +156,25 @@ def run_analyse(
     )
     readme_path.write_text(text)
 
-    for stat_date, row in stats.iterrows():
-        store.record_stats(str(stat_date), row.to_dict())
     run_date = now.date().isoformat()
-    store.record_probabilities(
-        run_date,
-        [
-            (int(magnitude), float(row[0]), float(row[1]), float(row[2]))
-            for magnitude, row in zip(
-                probabilities.index, probabilities.to_numpy(), strict=True
-            )
-        ],
-    )
-    store.record_error_summary(run_date, absolute_summary)
+    with store.batch():
+        for stat_date, row in stats.iterrows():
+            store.record_stats(str(stat_date), row.to_dict())
+        store.record_probabilities(
+            run_date,
+            [
+                (int(magnitude), float(row[0]), float(row[1]), float(row[2]))
+                for magnitude, row in zip(
+                    probabilities.index, probabilities.to_numpy(), strict=True
+                )
+            ],
+        )
+        store.record_error_summary(run_date, absolute_summary)
 
+    health = horizon_health(store, now)
+    store.close()
     return AnalyseReport(
         charts=tuple(charts),
-        health=horizon_health(store, now),
+        health=health,
         stats_dates=tuple(str(index) for index in stats.index),
     )
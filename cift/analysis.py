@@ -3,7 +3,6 @@
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
-from datetime import timezone
 from typing import Iterable
 
 import numpy as np
@@ -11,20 +10,15 @@ import pandas as pd
 import scipy.stats as st
 from scipy.optimize import curve_fit
 
+from cift.health import LOOKBACK_HOURS
+from cift.health import horizon_alerts
+from cift.health import observed_windows
 from cift.store import Store
 
 FINAL_ACTUAL = ("intensity.actual.final", "")
 
 HOURS_OF_DATA = 24
 
-EXPECTED_WINDOWS = {
-    "national_fw48h": 96,
-    "national_pt24h": 48,
-    "regional_fw48h": 96,
-    "regional_pt24h": 48,
-    "national_generation_pt24h": 48,
-}
-
 
 def national_matrix(store: Store) -> pd.DataFrame:
     """The legacy summary shape, read from partitions plus unmerged inboxes."""
@@ -219,38 +213,22 @@ class HealthReport:
 
 
 def horizon_health(
-    store: Store, now: datetime, lookback_hours: int = 26
+    store: Store, now: datetime, lookback_hours: int = LOOKBACK_HOURS
 ) -> HealthReport:
     """Alert when snapshots observe far fewer windows than the endpoint should return:
     under 50% in any single capture alerts immediately; under 90% for six consecutive
     captures alerts as sustained; a full-horizon capture resets the streak."""
     cutoff = int(now.timestamp()) - lookback_hours * 3600
     by_endpoint: dict[str, list[tuple[int, int]]] = {}
-    for slot, endpoint, first_utc, last_utc in store.capture_records():
+    for slot, endpoint, first_utc, last_utc in store.capture_records(since_utc=cutoff):
         if slot >= cutoff:
-            observed = (last_utc - first_utc) // 1800 + 1
+            observed = observed_windows(first_utc, last_utc)
             by_endpoint.setdefault(endpoint, []).append((slot, observed))
 
     alerts = []
     for endpoint, records in sorted(by_endpoint.items()):
-        expected = EXPECTED_WINDOWS[endpoint]
         streak = 0
         for slot, observed in sorted(records):
-            ratio = observed / expected
-            when = datetime.fromtimestamp(slot, tz=timezone.utc).strftime(
-                "%Y-%m-%dT%H:%MZ"
-            )
-            if ratio < 0.5:
-                alerts.append(
-                    f"{endpoint} at {when} observed only {observed}/{expected} windows"
-                )
-            if ratio < 0.9:
-                streak += 1
-                if streak == 6:
-                    alerts.append(
-                        f"{endpoint} sustained truncation: six consecutive short"
-                        f" captures ending {when}"
-                    )
-            else:
-                streak = 0
+            found, streak = horizon_alerts(endpoint, slot, observed, streak)
+            alerts.extend(found)
     return HealthReport(alerts=tuple(alerts))
@@ -31,15 +31,67 @@ def get_parser():
         "ingest", help="Snapshot all endpoints into one inbox database."
     )
     parser_ingest.add_argument("--db_root", default="data/db", type=Path)
+    parser_ingest.add_argument(
+        "--max_workers", default=5, type=int, help="Endpoints fetched at once."
+    )
+    parser_ingest.add_argument(
+        "--delta",
+        action="store_true",
+        help="Store only regional/generation rows changed since the last capture.",
+    )
+    parser_ingest.add_argument(
+        "--packed",
+        action="store_true",
+        help="Write the inbox as delta-encoded columns instead of a database.",
+    )
+    parser_ingest.add_argument(
+        "--compress",
+        action="store_true",
+        help="With --packed, compress the pack (zstd if installed, else zlib).",
+    )
+    parser_ingest.add_argument(
+        "--catch_up",
+        "--catch-up",
+        action="store_true",
+        help="Instead, recover pt24h data for slots missed in the last 24 hours.",
+    )
+    parser_ingest.add_argument(
+        "--requests_per_second",
+        default=2.0,
+        type=float,
+        help="Catch-up request rate limit.",
+    )
     parser_ingest.add_argument("--debug", action="store_true")
 
+    parser_serve = subparsers.add_parser(
+        "serve-ingest", help="Run ingest every slot at slot + 1 minute until stopped."
+    )
+    parser_serve.add_argument("--db_root", default="data/db", type=Path)
+    parser_serve.add_argument("--health_file", default="ingest_health.json", type=Path)
+    parser_serve.add_argument("--offset_seconds", default=60.0, type=float)
+    parser_serve.add_argument("--max_workers", default=5, type=int)
+    parser_serve.add_argument("--delta", action="store_true")
+    parser_serve.add_argument("--packed", action="store_true")
+    parser_serve.add_argument("--compress", action="store_true")
+    parser_serve.add_argument("--debug", action="store_true")
+
     parser_compact = subparsers.add_parser(
         "compact", help="Fold complete days of inboxes into the partitions."
     )
     parser_compact.add_argument("--db_root", default="data/db", type=Path)
     parser_compact.add_argument("--max_inboxes", default=None, type=int)
+    parser_compact.add_argument(
+        "--max_workers", default=1, type=int, help="Partitions written at once."
+    )
     parser_compact.add_argument("--debug", action="store_true")
 
+    parser_report = subparsers.add_parser(
+        "ingest-report", help="p50/p95 scrape telemetry per day and endpoint."
+    )
+    parser_report.add_argument("--db_root", default="data/db", type=Path)
+    parser_report.add_argument("--days", default=14, type=int)
+    parser_report.add_argument("--debug", action="store_true")
+
     parser_analyse = subparsers.add_parser(
         "analyse", help="Rebuild charts, README tables and stored statistics."
     )
@@ -64,28 +116,116 @@ def get_parser():
 
 def _cmd_ingest(args: argparse.Namespace) -> None:
     from cift.client import CarbonIntensityClient
+    from cift.ingest import IncompleteIngestError
     from cift.ingest import run_ingest
 
-    path = run_ingest(
+    if args.catch_up:
+        _catch_up(args)
+        return
+
+    try:
+        path = run_ingest(
+            db_root=args.db_root,
+            now=datetime.now(tz=timezone.utc),
+            client=CarbonIntensityClient(),
+            max_workers=args.max_workers,
+            delta=args.delta,
+            on_alert=_print_alert,
+            packed=args.packed,
+            compress=args.compress,
+        )
+    except IncompleteIngestError as error:
+        # The partial inbox is on disk and must still be committed; exit non-zero
+        # so the failure alerting fires anyway.
+        print(f"inbox={error.path}")
+        for endpoint, reason in sorted(error.failures.items()):
+            print(f"INGEST-FAILED: {endpoint}: {reason}")
+        raise SystemExit(1) from error
+    print(f"inbox={path}")
+
+
+def _print_alert(alert: str) -> None:
+    # Same prefix as `analyse`, which the workflows grep for.
+    print(f"HEALTH-ALERT: {alert}", flush=True)
+
+
+def _catch_up(args: argparse.Namespace) -> None:
+    from cift.client import CarbonIntensityClient
+    from cift.ingest import run_catch_up
+
+    report = run_catch_up(
         db_root=args.db_root,
         now=datetime.now(tz=timezone.utc),
-        client=CarbonIntensityClient(),
+        client_factory=CarbonIntensityClient,
+        max_workers=args.max_workers,
+        requests_per_second=args.requests_per_second,
+        packed=args.packed,
+        compress=args.compress,
     )
-    print(f"inbox={path}")
+    for path in report.inboxes:
+        print(f"inbox={path}")
+    for slot_utc, endpoint, reason in report.failures:
+        slot = datetime.fromtimestamp(slot_utc, tz=timezone.utc)
+        print(f"CATCH-UP-FAILED: {slot:%Y-%m-%dT%H:%MZ} {endpoint}: {reason}")
+    if report.failures:
+        raise SystemExit(1)
+
+
+def _cmd_serve_ingest(args: argparse.Namespace) -> None:
+    import asyncio
+    import signal
+
+    from cift.client import CarbonIntensityClient
+    from cift.serve import serve_ingest
+
+    async def serve() -> int:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        return await serve_ingest(
+            db_root=args.db_root,
+            client_factory=CarbonIntensityClient,
+            health_path=args.health_file,
+            stop=stop,
+            offset_seconds=args.offset_seconds,
+            max_workers=args.max_workers,
+            delta=args.delta,
+            packed=args.packed,
+            compress=args.compress,
+        )
+
+    slots = asyncio.run(serve())
+    print(f"stopped after {slots} slots")
 
 
 def _cmd_compact(args: argparse.Namespace) -> None:
     from cift.store import Store
 
-    report = Store(args.db_root).compact(
-        now=datetime.now(tz=timezone.utc), max_inboxes=args.max_inboxes
-    )
+    with Store(args.db_root) as store:
+        report = store.compact(
+            now=datetime.now(tz=timezone.utc),
+            max_inboxes=args.max_inboxes,
+            max_workers=args.max_workers,
+        )
     print(
         f"merged={report.merged_inboxes} remaining={report.remaining_inboxes}"
         f" quarantined={','.join(report.quarantined) or 'none'}"
     )
 
 
+def _cmd_ingest_report(args: argparse.Namespace) -> None:
+    from cift.store import Store
+    from cift.telemetry import format_trends
+    from cift.telemetry import ingest_trends
+
+    since = datetime.now(tz=timezone.utc).timestamp() - args.days * 86400
+    with Store(args.db_root) as store:
+        trends = ingest_trends(store.ingest_metrics(since_utc=int(since)), int(since))
+    for line in format_trends(trends):
+        print(line)
+
+
 def _cmd_analyse(args: argparse.Namespace) -> None:
     from cift.analyse import run_analyse
 
@@ -134,7 +274,9 @@ def _cmd_migrate(args: argparse.Namespace) -> None:
 
 NEW_COMMANDS = {
     "ingest": _cmd_ingest,
+    "serve-ingest": _cmd_serve_ingest,
     "compact": _cmd_compact,
+    "ingest-report": _cmd_ingest_report,
     "analyse": _cmd_analyse,
     "migrate": _cmd_migrate,
 }
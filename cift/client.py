@@ -1,15 +1,28 @@
 """HTTP adapter for the NESO Carbon Intensity API."""
 
+import hashlib
+import random
+import threading
 import time
+import zlib
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
+from typing import Callable
+from typing import Collection
 from typing import Protocol
 from typing import cast
+from typing import runtime_checkable
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from cift.api import BASE_URL
 from cift.api import DATETIME_FMT_STR
 from cift.api import TEMPLATE_URLS
+from cift.decode import loads
+from cift.parse import ENDPOINTS
+from cift.parse import floor_to_slot
 
 
 class Client(Protocol):
@@ -18,37 +31,296 @@ class Client(Protocol):
     def fetch(self, endpoint: str, at: datetime) -> dict[str, Any]: ...
 
 
+def fingerprint(body: bytes) -> str:
+    """Identity of a raw response body: equal fingerprints mean equal bytes."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+@runtime_checkable
+class RawClient(Protocol):
+    """A client that can skip decoding bodies it has already seen."""
+
+    def fetch_raw(
+        self, endpoint: str, at: datetime, known: Collection[str] = ()
+    ) -> tuple[str, dict[str, Any] | None]: ...
+
+
+@runtime_checkable
+class RegionClient(Protocol):
+    """A client that can fetch one region's horizon (the one_region_* endpoints)."""
+
+    def fetch_region(
+        self, endpoint: str, at: datetime, region_id: int
+    ) -> dict[str, Any]: ...
+
+
 class Session(Protocol):
     """The slice of requests.Session the client uses; tests substitute a fake."""
 
-    def get(self, url: str, timeout: float) -> Any: ...
+    def get(self, url: str, *, timeout: float, stream: bool) -> Any: ...
+
+
+# Only encodings `read_body` can undo are offered, whatever urllib3 supports.
+ACCEPT_ENCODING = "gzip, deflate"
+
+_CHUNK_BYTES = 64 * 1024
+
+POOL_SIZE = len(ENDPOINTS)
+
+
+def pooled_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """A keep-alive session with one pooled connection per concurrently fetched
+    endpoint, so a scrape pays TCP and TLS setup once per connection, not per call.
+
+    Retries are the client's job (they must respect the slot deadline), so the
+    adapter never retries by itself.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {"Accept": "application/json", "Accept-Encoding": ACCEPT_ENCODING}
+    )
+    return session
+
+
+@dataclass(frozen=True)
+class Transfer:
+    """What one response cost: bytes on the wire versus decoded, and its timing."""
+
+    wire_bytes: int
+    body_bytes: int
+    ttfb_seconds: float
+    seconds: float
+    encoding: str = "identity"
+
+
+def read_body(response: Any, requested: float) -> tuple[bytes, Transfer]:
+    """Stream the raw body, counting wire bytes and decompressing chunk by chunk.
+
+    `requested` is the perf_counter reading taken before the request was sent; with
+    a streamed request the headers have arrived by the time this is called.
+    """
+    first_byte = time.perf_counter()
+    encoding = response.headers.get("Content-Encoding", "identity").lower().strip()
+    decoder = None
+    if encoding in ("gzip", "deflate"):
+        # 32 + MAX_WBITS detects either a gzip or a zlib header automatically.
+        decoder = zlib.decompressobj(32 + zlib.MAX_WBITS)
+    elif encoding != "identity":
+        raise requests.exceptions.ContentDecodingError(
+            f"unsupported Content-Encoding {encoding!r}", response=response
+        )
+    wire = 0
+    parts = []
+    try:
+        for chunk in response.raw.stream(_CHUNK_BYTES, decode_content=False):
+            wire += len(chunk)
+            parts.append(decoder.decompress(chunk) if decoder else chunk)
+        if decoder:
+            parts.append(decoder.flush())
+    except zlib.error as error:
+        raise requests.exceptions.ContentDecodingError(
+            f"corrupt {encoding} body: {error}", response=response
+        ) from error
+    body = b"".join(parts)
+    finished = time.perf_counter()
+    return body, Transfer(
+        wire_bytes=wire,
+        body_bytes=len(body),
+        ttfb_seconds=first_byte - requested,
+        seconds=finished - requested,
+        encoding=encoding,
+    )
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff against one deadline per capture slot.
+
+    Every endpoint fetched for a slot retries against the same deadline, measured
+    from the slot start, so a scrape's retries share one time budget and give up
+    with `reserve_seconds` left to parse and write whatever did arrive. A missed
+    slot is permanent (ADR-001), so retrying stops on the clock, not on a count.
+    """
+
+    base_delay_seconds: float = 2.0
+    max_delay_seconds: float = 60.0
+    slot_deadline_seconds: float = 20 * 60
+    reserve_seconds: float = 60.0
+    max_attempts: int | None = None
+
+    def deadline(self, at: datetime) -> float:
+        """The unix time after which no fetch for `at`'s slot may still be running."""
+        return floor_to_slot(at) + self.slot_deadline_seconds - self.reserve_seconds
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        """Equal-jitter backoff before attempt `attempt + 1`: half fixed, half random."""
+        cap = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** (attempt - 1))
+        return rng.uniform(cap / 2, cap)
+
+
+@dataclass(frozen=True)
+class Attempt:
+    """One HTTP attempt's timing, kept so the retry policy can be tuned from data;
+    successful attempts also carry their Transfer for bandwidth benchmarking."""
+
+    endpoint: str
+    attempt: int
+    started_utc: float
+    seconds: float
+    error: str | None = None
+    transfer: Transfer | None = None
+
+
+@runtime_checkable
+class AttemptLog(Protocol):
+    """A client that keeps per-attempt records, which ingest turns into telemetry."""
+
+    def attempts_for(self, endpoint: str) -> list[Attempt]: ...
 
 
 class CarbonIntensityClient:
-    """Fetch one endpoint's JSON for the window containing `at`, with one retry."""
+    """Fetch one endpoint's JSON for the window containing `at`, retrying to a deadline.
+
+    `base_url` replaces the API's origin, e.g. to point at a local stand-in.
+    """
 
     def __init__(
         self,
         timeout_seconds: float = 30.0,
         session: Session | None = None,
-        retry_delay_seconds: float = 2.0,
+        retry: RetryPolicy | None = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+        base_url: str = BASE_URL,
     ) -> None:
+        self.base_url = base_url.rstrip("/")
         self.timeout_seconds = timeout_seconds
         self.session: Session = (
-            session if session is not None else cast(Session, requests.Session())
+            session if session is not None else cast(Session, pooled_session())
         )
-        self.retry_delay_seconds = retry_delay_seconds
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng if rng is not None else random.Random()
+        self.attempts: list[Attempt] = []
+        self._lock = threading.Lock()
 
     def fetch(self, endpoint: str, at: datetime) -> dict[str, Any]:
-        url = TEMPLATE_URLS[endpoint].format(at.strftime(DATETIME_FMT_STR))
-        for attempt in (1, 2):
+        _, payload = self.fetch_raw(endpoint, at)
+        # Nothing is known, so every body is decoded.
+        return cast(dict[str, Any], payload)
+
+    def fetch_raw(
+        self, endpoint: str, at: datetime, known: Collection[str] = ()
+    ) -> tuple[str, dict[str, Any] | None]:
+        """(fingerprint, payload) of the body; the payload is None, and the body is
+        never decoded, when its fingerprint is in `known`."""
+        return self._fetch(endpoint, self._url(endpoint, at), at, known, False)
+
+    def fetch_region(
+        self, endpoint: str, at: datetime, region_id: int
+    ) -> dict[str, Any]:
+        """One region's payload from a one_region_* endpoint.
+
+        This is a fallback that runs after the bulk response already failed, so
+        unlike `fetch` even its first attempt must fit within the slot deadline.
+        """
+        url = self._url(endpoint, at, region_id)
+        _, payload = self._fetch(endpoint, url, at, (), True)
+        return cast(dict[str, Any], payload)
+
+    def _url(self, endpoint: str, at: datetime, *ids: int) -> str:
+        path = TEMPLATE_URLS[endpoint].removeprefix(BASE_URL)
+        return self.base_url + path.format(at.strftime(DATETIME_FMT_STR), *ids)
+
+    def _fetch(
+        self,
+        endpoint: str,
+        url: str,
+        at: datetime,
+        known: Collection[str],
+        bounded: bool,
+    ) -> tuple[str, dict[str, Any] | None]:
+        deadline = self.retry.deadline(at)
+        attempt = 0
+        while True:
+            attempt += 1
+            started = self.clock()
+            # The first attempt always runs unless `bounded`; later ones never
+            # outlast the deadline.
+            timeout = self.timeout_seconds
+            if attempt > 1 or bounded:
+                timeout = min(timeout, deadline - started)
+            if bounded and timeout < 1.0:
+                raise requests.exceptions.Timeout(
+                    f"{endpoint}: no time left before the slot deadline"
+                )
+            requested = time.perf_counter()
             try:
-                response = self.session.get(url, timeout=self.timeout_seconds)
-                response.raise_for_status()
-                payload: dict[str, Any] = response.json()
-                return payload
-            except requests.RequestException:
-                if attempt == 2:
+                response = self.session.get(url, timeout=timeout, stream=True)
+                try:
+                    response.raise_for_status()
+                    body, transfer = read_body(response, requested)
+                finally:
+                    response.close()
+                identity = fingerprint(body)
+                payload = None if identity in known else _decode(body, response)
+            except requests.RequestException as error:
+                self._record(endpoint, attempt, started, repr(error), None)
+                pause = self.retry.delay(attempt, self.rng)
+                out_of_attempts = (
+                    self.retry.max_attempts is not None
+                    and attempt >= self.retry.max_attempts
+                )
+                # Give up unless a useful attempt (at least one second) still fits.
+                if out_of_attempts or self.clock() + pause + 1.0 > deadline:
                     raise
-                time.sleep(self.retry_delay_seconds)
-        raise AssertionError("unreachable")
+                self.sleep(pause)
+                continue
+            self._record(endpoint, attempt, started, None, transfer)
+            return identity, payload
+
+    def attempts_for(self, endpoint: str) -> list[Attempt]:
+        """Every attempt so far at one endpoint, in the order they finished."""
+        with self._lock:
+            return [a for a in self.attempts if a.endpoint == endpoint]
+
+    def transfers(self) -> list[tuple[str, Transfer]]:
+        """(endpoint, Transfer) for every successful attempt so far."""
+        with self._lock:
+            return [(a.endpoint, a.transfer) for a in self.attempts if a.transfer]
+
+    def _record(
+        self,
+        endpoint: str,
+        attempt: int,
+        started: float,
+        error: str | None,
+        transfer: Transfer | None,
+    ) -> None:
+        with self._lock:
+            self.attempts.append(
+                Attempt(
+                    endpoint,
+                    attempt,
+                    started,
+                    self.clock() - started,
+                    error,
+                    transfer,
+                )
+            )
+
+
+def _decode(body: bytes, response: Any) -> dict[str, Any]:
+    """Parse a JSON body; a truncated or garbled one is retryable like any HTTP error."""
+    try:
+        payload: dict[str, Any] = loads(body)
+    except ValueError as error:
+        raise requests.exceptions.InvalidJSONError(
+            f"undecodable JSON body: {error}", response=response
+        ) from error
+    return payload
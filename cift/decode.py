@@ -0,0 +1,55 @@
+"""Decode JSON straight from bytes, with orjson when it is installed.
+
+Ingest and migration both hold raw response or file bytes; decoding those
+directly skips building an intermediate str, and orjson (an optional extra) is
+several times faster than the stdlib on API-sized payloads. Either backend gives
+the same values and rejects the same inputs, so captures never depend on which
+one happened to be installed.
+"""
+
+import json
+from typing import Any
+from typing import Callable
+from typing import NoReturn
+
+
+def _reject_constant(name: str) -> NoReturn:
+    # orjson has no NaN/Infinity literals; the stdlib must not accept them either.
+    raise json.JSONDecodeError(f"non-standard JSON constant {name}", name, 0)
+
+
+# Strict stdlib decoder shared with the streaming window parser.
+STDLIB_DECODER = json.JSONDecoder(parse_constant=_reject_constant)
+
+
+def _stdlib_loads(data: bytes) -> Any:
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError as error:
+        raise json.JSONDecodeError(f"invalid UTF-8: {error.reason}", "", 0) from error
+    return STDLIB_DECODER.decode(text)
+
+
+def _optional_decoder() -> tuple[str, Callable[[bytes], Any]] | None:
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return "orjson", orjson.loads
+
+
+_fast = _optional_decoder()
+
+# Name of the backend `loads` uses, for logs and benchmarks.
+DECODER = _fast[0] if _fast else "json"
+
+
+def loads(data: bytes) -> Any:
+    """Decode one UTF-8 JSON document.
+
+    Raises json.JSONDecodeError (orjson's error subclasses it) for anything
+    malformed, including invalid UTF-8, a byte-order mark, and NaN or Infinity.
+    """
+    if _fast is not None:
+        return _fast[1](data)
+    return _stdlib_loads(data)
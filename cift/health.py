@@ -0,0 +1,58 @@
+"""Horizon health thresholds, shared by the daily report and the ingest-time check.
+
+An endpoint that silently starts returning short horizons is the failure mode
+nothing else notices. One capture under half its expected windows alerts at
+once; six consecutive captures under 90% alert as sustained truncation, and a
+full-horizon capture resets the streak. Stdlib only: ingest runs in the minimal
+scraping environment.
+"""
+
+from datetime import datetime
+from datetime import timezone
+
+from cift.timestamps import HALF_HOUR_SECONDS
+
+EXPECTED_WINDOWS = {
+    "national_fw48h": 96,
+    "national_pt24h": 48,
+    "regional_fw48h": 96,
+    "regional_pt24h": 48,
+    "national_generation_pt24h": 48,
+}
+
+SINGLE_CAPTURE_RATIO = 0.5
+SUSTAINED_RATIO = 0.9
+SUSTAINED_CAPTURES = 6
+
+# How far back a streak may reach; the daily report looks back this far too.
+LOOKBACK_HOURS = 26
+
+
+def observed_windows(first_utc: int, last_utc: int) -> int:
+    return (last_utc - first_utc) // HALF_HOUR_SECONDS + 1
+
+
+def horizon_alerts(
+    endpoint: str, capture_utc: int, observed: int, streak: int
+) -> tuple[list[str], int]:
+    """Alerts for one capture of `observed` windows, given the streak of short
+    captures before it; returns them with the streak after it."""
+    expected = EXPECTED_WINDOWS[endpoint]
+    ratio = observed / expected
+    when = datetime.fromtimestamp(capture_utc, tz=timezone.utc).strftime(
+        "%Y-%m-%dT%H:%MZ"
+    )
+    alerts = []
+    if ratio < SINGLE_CAPTURE_RATIO:
+        alerts.append(
+            f"{endpoint} at {when} observed only {observed}/{expected} windows"
+        )
+    if ratio >= SUSTAINED_RATIO:
+        return alerts, 0
+    streak += 1
+    if streak == SUSTAINED_CAPTURES:
+        alerts.append(
+            f"{endpoint} sustained truncation: six consecutive short"
+            f" captures ending {when}"
+        )
+    return alerts, streak
@@ -1,22 +1,110 @@
 """Fetch all endpoints for the current half-hour and record them as one inbox database."""
 
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from dataclasses import replace
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
 from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Sequence
 
+import requests
+
+from cift.api import REGION_IDS
+from cift.client import POOL_SIZE
+from cift.client import AttemptLog
 from cift.client import Client
+from cift.client import RawClient
+from cift.client import RegionClient
+from cift.health import LOOKBACK_HOURS
+from cift.health import horizon_alerts
+from cift.health import observed_windows
 from cift.parse import ENDPOINTS
+from cift.parse import MalformedSnapshotError
+from cift.parse import Snapshot
 from cift.parse import floor_to_slot
+from cift.parse import horizon_fits
+from cift.parse import merge_region_payloads
 from cift.parse import parse_snapshot
+from cift.store import IngestMetrics
+from cift.store import PayloadRecord
 from cift.store import Store
+from cift.timestamps import HALF_HOUR_SECONDS
+
+# Bulk regional endpoints and the single-region routes that can stand in for them.
+_ONE_REGION = {
+    "regional_fw48h": "one_region_fw48h",
+    "regional_pt24h": "one_region_pt24h",
+}
+
+
+# Only past horizons can be re-fetched for an earlier slot; a forecast, once
+# superseded, is gone.
+CATCH_UP_ENDPOINTS = tuple(e for e in ENDPOINTS if e.endswith("pt24h"))
+
+# A pt24h horizon reaches 24 hours back, so so can catch-up.
+CATCH_UP_SLOTS = 48
+
+
+class IncompleteIngestError(Exception):
+    """Some endpoints failed; the rest were still recorded, because a slot is never
+    re-observable and a partial inbox beats a permanent gap (ADR-001)."""
+
+    def __init__(self, path: Path, failures: dict[str, str]) -> None:
+        super().__init__(path, failures)
+        self.path = path
+        self.failures = failures
 
+    def __str__(self) -> str:
+        missing = "; ".join(f"{name}: {why}" for name, why in self.failures.items())
+        return f"{self.path.name} is missing {missing}"
 
-def run_ingest(db_root: Path, now: datetime, client: Client) -> Path:
+
+def run_ingest(
+    db_root: Path,
+    now: datetime,
+    client: Client,
+    max_workers: int = 1,
+    delta: bool = False,
+    on_alert: Callable[[str], None] | None = None,
+    packed: bool = False,
+    compress: bool = False,
+) -> Path:
     """Snapshot every endpoint at `now`'s half-hour slot into a single inbox file.
 
     The API returns the window *before* an exact half-hour boundary, so the
     query time is the slot plus one minute (see README: Dates and times).
+
+    With `max_workers` above 1 the endpoints are fetched concurrently and each
+    response is parsed as it arrives; the inbox is still written only once every
+    endpoint has parsed, so a scrape takes about as long as its slowest endpoint.
+
+    An endpoint that stays unreachable or malformed is left out: the others are
+    written and IncompleteIngestError names what is missing. Only when nothing at
+    all arrived is the first endpoint's own error raised, with no inbox written.
+
+    Every endpoint, failed or not, gets an `ingest_metrics` row in the inbox.
+    With `delta`, regional and generation rows unchanged since the previous
+    capture are left out of the inbox (see Store.write_inbox); with `packed` the
+    inbox is written as a pack, compressed with `compress`.
+
+    A client that can return raw fingerprints (RawClient) lets an endpoint whose
+    body is byte-identical to the previous slot's skip decoding and parsing
+    entirely: the inbox records a reference to that capture instead of rows.
+
+    A malformed bulk regional response is retried region by region when the
+    client supports it (RegionClient); the assembled capture's `source` is
+    "live_per_region".
+
+    Every parsed horizon is checked against the daily horizon_health thresholds
+    as it is stored (check_horizons); alerts go to `on_alert`.
     """
     slot_utc = floor_to_slot(now)
     store = Store(db_root)
@@ -27,10 +115,386 @@ def run_ingest(db_root: Path, now: datetime, client: Client) -> Path:
     query_at = datetime.fromtimestamp(slot_utc, tz=timezone.utc) + timedelta(minutes=1)
     observed_utc = int(now.timestamp())
 
-    snapshots = [
-        parse_snapshot(
-            endpoint, client.fetch(endpoint, query_at), slot_utc, observed_utc
+    previous = store.recent_payloads(slot_utc - HALF_HOUR_SECONDS)
+    parsed, payloads, failures, metrics = _fetch_and_parse(
+        client, query_at, slot_utc, observed_utc, max_workers, previous
+    )
+    if not parsed:
+        raise next(failures[endpoint] for endpoint in ENDPOINTS)
+    path = store.write_inbox(
+        [parsed[endpoint] for endpoint in ENDPOINTS if endpoint in parsed],
+        metrics,
+        delta=delta,
+        payloads=payloads,
+        packed=packed,
+        compress=compress,
+    )
+    alerts = check_horizons(store, list(parsed.values()))
+    if on_alert is not None:
+        for alert in alerts:
+            on_alert(alert)
+    if failures:
+        raise IncompleteIngestError(
+            path,
+            {
+                endpoint: f"{type(error).__name__}: {error}"
+                for endpoint, error in failures.items()
+            },
+        )
+    return path
+
+
+def check_horizons(store: Store, snapshots: Sequence[Snapshot]) -> list[str]:
+    """horizon_health's thresholds for one scrape. Each endpoint's run of short
+    captures before it is recounted from the captures of the lookback, which the
+    inboxes and partitions already record, so ingest keeps no state of its own
+    and only ever adds its inbox.
+
+    A capture older than one already recorded for its endpoint (a late run) is
+    skipped: the newer capture was checked when it arrived.
+    """
+    if not snapshots:
+        return []
+    lookback = LOOKBACK_HOURS * 3600
+    since_utc = min(snapshot.capture_utc for snapshot in snapshots) - lookback
+    history: dict[str, list[tuple[int, int]]] = {}
+    for slot, endpoint, first_utc, last_utc in store.capture_records(
+        since_utc=since_utc
+    ):
+        history.setdefault(endpoint, []).append(
+            (slot, observed_windows(first_utc, last_utc))
+        )
+    alerts = []
+    for snapshot in snapshots:
+        endpoint, capture_utc = snapshot.endpoint, snapshot.capture_utc
+        records = history.get(endpoint, [])
+        if any(slot > capture_utc for slot, _ in records):
+            continue
+        streak = 0
+        for slot, observed in records:
+            if capture_utc - lookback <= slot < capture_utc:
+                _, streak = horizon_alerts(endpoint, slot, observed, streak)
+        observed = observed_windows(snapshot.window_first_utc, snapshot.window_last_utc)
+        found, _ = horizon_alerts(endpoint, capture_utc, observed, streak)
+        alerts.extend(found)
+    return alerts
+
+
+def _fetch_and_parse(
+    client: Client,
+    query_at: datetime,
+    slot_utc: int,
+    observed_utc: int,
+    max_workers: int,
+    previous: dict[str, tuple[PayloadRecord, int, int]],
+) -> tuple[
+    dict[str, Snapshot], list[PayloadRecord], dict[str, Exception], list[IngestMetrics]
+]:
+    """Fetch every endpoint on a bounded pool. API and validation failures are
+    collected per endpoint; anything else is a bug and cancels the rest."""
+    parsed: dict[str, Snapshot] = {}
+    payloads: dict[str, PayloadRecord] = {}
+    failures: dict[str, Exception] = {}
+    fetch_seconds: dict[str, float] = {}
+    parse_seconds: dict[str, float] = {}
+    # A repeated body is only reusable if its horizon is still valid for this
+    # slot: a stale fw48h body starts before it and must be parsed (and rejected).
+    known = {
+        endpoint: record.fingerprint
+        for endpoint, (record, first, last) in previous.items()
+        if horizon_fits(endpoint, slot_utc, first, last)
+    }
+
+    def timed_fetch(endpoint: str) -> tuple[str | None, dict[str, Any] | None]:
+        started = time.perf_counter()
+        try:
+            if isinstance(client, RawClient):
+                repeat = [known[endpoint]] if endpoint in known else []
+                return client.fetch_raw(endpoint, query_at, repeat)
+            return None, client.fetch(endpoint, query_at)
+        finally:
+            fetch_seconds[endpoint] = time.perf_counter() - started
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(ENDPOINTS))),
+        thread_name_prefix="cift-ingest",
+    ) as executor:
+        futures: dict[Future[tuple[str | None, dict[str, Any] | None]], str] = {
+            executor.submit(timed_fetch, endpoint): endpoint for endpoint in ENDPOINTS
+        }
+        try:
+            for future in as_completed(futures):
+                endpoint = futures[future]
+                try:
+                    identity, payload = future.result()
+                    started = time.perf_counter()
+                    reference = None
+                    if payload is None:
+                        record, first, last = previous[endpoint]
+                        reference = record.reference_utc
+                        if reference is None:
+                            reference = record.capture_utc
+                        parsed[endpoint] = Snapshot(
+                            endpoint, slot_utc, observed_utc, first, last, (), (), ()
+                        )
+                    else:
+                        parsed[endpoint] = parse_snapshot(
+                            endpoint, payload, slot_utc, observed_utc
+                        )
+                    parse_seconds[endpoint] = time.perf_counter() - started
+                    if identity is not None:
+                        payloads[endpoint] = PayloadRecord(
+                            slot_utc, endpoint, identity, reference
+                        )
+                except (requests.RequestException, MalformedSnapshotError) as error:
+                    failures[endpoint] = error
+        except BaseException:
+            # Queued fetches are dropped; in-flight ones finish before re-raising.
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    if isinstance(client, RegionClient):
+        for endpoint, one_region in _ONE_REGION.items():
+            bulk_error = failures.get(endpoint)
+            if not isinstance(bulk_error, MalformedSnapshotError):
+                continue
+            started = time.perf_counter()
+            try:
+                parsed[endpoint] = _fetch_regions(
+                    client, endpoint, one_region, query_at, slot_utc, observed_utc
+                )
+                del failures[endpoint]
+            except (requests.RequestException, MalformedSnapshotError) as fallback:
+                failures[endpoint] = MalformedSnapshotError(
+                    f"{bulk_error}; per-region fallback failed:"
+                    f" {type(fallback).__name__}: {fallback}"
+                )
+            fetch_seconds[endpoint] += time.perf_counter() - started
+
+    metrics = [
+        _metrics(
+            client,
+            endpoint,
+            slot_utc,
+            observed_utc,
+            fetch_seconds[endpoint],
+            parse_seconds.get(endpoint),
+            parsed.get(endpoint),
+            failures.get(endpoint),
         )
         for endpoint in ENDPOINTS
     ]
-    return store.write_inbox(snapshots)
+    ordered = [payloads[endpoint] for endpoint in ENDPOINTS if endpoint in payloads]
+    return parsed, ordered, failures, metrics
+
+
+def _fetch_regions(
+    client: RegionClient,
+    endpoint: str,
+    one_region: str,
+    query_at: datetime,
+    slot_utc: int,
+    observed_utc: int,
+) -> Snapshot:
+    """Assemble `endpoint`'s snapshot from its 18 single-region responses, fetched
+    on a pool no wider than the client's connection pool."""
+    with ThreadPoolExecutor(
+        max_workers=POOL_SIZE, thread_name_prefix="cift-regions"
+    ) as executor:
+        futures = {
+            region_id: executor.submit(
+                client.fetch_region, one_region, query_at, region_id
+            )
+            for region_id in REGION_IDS
+        }
+        try:
+            payloads = {region_id: f.result() for region_id, f in futures.items()}
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+    payload = merge_region_payloads(endpoint, payloads)
+    snapshot = parse_snapshot(endpoint, payload, slot_utc, observed_utc)
+    return replace(snapshot, source="live_per_region")
+
+
+def _metrics(
+    client: Client,
+    endpoint: str,
+    slot_utc: int,
+    observed_utc: int,
+    fetch_seconds: float,
+    parse_seconds: float | None,
+    snapshot: Snapshot | None,
+    error: Exception | None,
+) -> IngestMetrics:
+    """One endpoint's telemetry; retry and byte counts need a client that logs attempts."""
+    retries = payload_bytes = wire_bytes = None
+    if isinstance(client, AttemptLog):
+        attempts = client.attempts_for(endpoint)
+        retries = max(len(attempts) - 1, 0)
+        transfer = attempts[-1].transfer if attempts else None
+        if transfer is not None:
+            payload_bytes, wire_bytes = transfer.body_bytes, transfer.wire_bytes
+    rows = 0
+    if snapshot is not None:
+        rows = (
+            len(snapshot.national) + len(snapshot.regional) + len(snapshot.generation)
+        )
+    return IngestMetrics(
+        capture_utc=slot_utc,
+        endpoint=endpoint,
+        observed_utc=observed_utc,
+        fetch_seconds=fetch_seconds,
+        retries=retries,
+        payload_bytes=payload_bytes,
+        wire_bytes=wire_bytes,
+        parse_seconds=parse_seconds,
+        row_count=rows,
+        error=None if error is None else f"{type(error).__name__}: {error}",
+    )
+
+
+@dataclass(frozen=True)
+class CatchUpReport:
+    """What one catch-up run recovered, and which fetches still failed."""
+
+    inboxes: tuple[Path, ...]
+    failures: tuple[tuple[int, str, str], ...] = ()  # (slot, endpoint, reason)
+
+
+class _RateLimit:
+    """Space request starts at least 1 / `per_second` apart, across threads."""
+
+    def __init__(self, per_second: float) -> None:
+        self.interval = 1.0 / per_second
+        self.next_start = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            start = max(self.next_start, time.monotonic())
+            self.next_start = start + self.interval
+        time.sleep(max(0.0, start - time.monotonic()))
+
+
+def missed_slots(store: Store, now: datetime) -> list[int]:
+    """Slots of the last 24 hours (before `now`'s) with no capture at all.
+
+    Slots at or before the newest compacted capture are left out: compaction
+    would quarantine an inbox that old rather than rewrite the change-log.
+    """
+    slot_utc = floor_to_slot(now)
+    first_utc = slot_utc - (CATCH_UP_SLOTS - 1) * HALF_HOUR_SECONDS
+    captured = {slot for slot, *_ in store.capture_records(since_utc=first_utc)}
+    merged = max((info.capture_last_utc or 0 for info in store.partitions()), default=0)
+    return [
+        slot
+        for slot in range(first_utc, slot_utc, HALF_HOUR_SECONDS)
+        if slot > merged
+        and slot not in captured
+        and not store.inbox_path(slot).exists()
+    ]
+
+
+def run_catch_up(
+    db_root: Path,
+    now: datetime,
+    client_factory: Callable[[], Client],
+    max_workers: int = 5,
+    requests_per_second: float = 2.0,
+    clock: Callable[[], float] = time.time,
+    packed: bool = False,
+    compress: bool = False,
+) -> CatchUpReport:
+    """Recover the pt24h endpoints of every missed slot in the last 24 hours.
+
+    Each missed slot is queried as its own scrape would have been (slot plus one
+    minute), on a bounded pool whose requests are spaced by `requests_per_second`.
+    Every slot that got anything back gets its own inbox, with captures marked
+    `source` 'catch_up' and the real `observed_utc`. The forward horizon of a
+    missed slot is unrecoverable and stays missing.
+
+    Each slot has its own client, so attempt telemetry stays per slot. A client's
+    retry deadline belongs to the live slot, long past here, so a failed fetch is
+    not retried; running catch-up again retries whatever is still missing.
+    """
+    store = Store(db_root)
+    slots = missed_slots(store, now)
+    clients = {slot: client_factory() for slot in slots}
+    limit = _RateLimit(requests_per_second)
+
+    def fetch(
+        slot_utc: int, endpoint: str
+    ) -> tuple[Snapshot | None, IngestMetrics, Exception | None]:
+        client = clients[slot_utc]
+        query_at = datetime.fromtimestamp(slot_utc, tz=timezone.utc) + timedelta(
+            minutes=1
+        )
+        snapshot: Snapshot | None = None
+        error: Exception | None = None
+        parse_seconds = None
+        limit.wait()
+        started = time.perf_counter()
+        try:
+            payload = client.fetch(endpoint, query_at)
+        except requests.RequestException as failure:
+            payload, error = None, failure
+        fetch_seconds = time.perf_counter() - started
+        # When the data was really seen, not when its slot was.
+        observed_utc = int(clock())
+        if payload is not None:
+            try:
+                snapshot = replace(
+                    parse_snapshot(endpoint, payload, slot_utc, observed_utc),
+                    source="catch_up",
+                )
+            except MalformedSnapshotError as failure:
+                error = failure
+            parse_seconds = time.perf_counter() - started - fetch_seconds
+        metrics = _metrics(
+            client,
+            endpoint,
+            slot_utc,
+            observed_utc,
+            fetch_seconds,
+            parse_seconds,
+            snapshot,
+            error,
+        )
+        return snapshot, metrics, error
+
+    results: dict[
+        tuple[int, str], tuple[Snapshot | None, IngestMetrics, Exception | None]
+    ]
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_workers), thread_name_prefix="cift-catch-up"
+    ) as executor:
+        futures = {
+            (slot, endpoint): executor.submit(fetch, slot, endpoint)
+            for slot in slots
+            for endpoint in CATCH_UP_ENDPOINTS
+        }
+        try:
+            results = {key: future.result() for key, future in futures.items()}
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    inboxes = []
+    failures = []
+    for slot in slots:
+        outcomes = [results[slot, endpoint] for endpoint in CATCH_UP_ENDPOINTS]
+        snapshots = [snapshot for snapshot, _, _ in outcomes if snapshot is not None]
+        for endpoint, (_, _, error) in zip(CATCH_UP_ENDPOINTS, outcomes, strict=True):
+            if error is not None:
+                failures.append((slot, endpoint, f"{type(error).__name__}: {error}"))
+        if snapshots:
+            inboxes.append(
+                store.write_inbox(
+                    snapshots,
+                    [metrics for _, metrics, _ in outcomes],
+                    packed=packed,
+                    compress=compress,
+                )
+            )
+    return CatchUpReport(inboxes=tuple(inboxes), failures=tuple(failures))
@@ -15,13 +15,19 @@ from pathlib import Path
 from typing import Any
 from typing import Iterable
 
+from cift.decode import loads
 from cift.parse import FUELS
-from cift.parse import HALF_HOUR_SECONDS
-from cift.parse import MalformedSnapshotError
+from cift.parse import GENERATION_COLUMNS
+from cift.parse import NATIONAL_COLUMNS
+from cift.parse import REGIONAL_COLUMNS
+from cift.parse import Columns
+from cift.parse import Rejected
 from cift.parse import Snapshot
-from cift.parse import parse_snapshot
-from cift.parse import to_epoch
+from cift.parse import parse_snapshots
 from cift.store import Store
+from cift.timestamps import HALF_HOUR_SECONDS
+from cift.timestamps import compact_to_epoch
+from cift.timestamps import to_epoch
 
 _STAGING_DDL = """
 CREATE TABLE IF NOT EXISTS candidates (
@@ -95,8 +101,7 @@ class Staging:
 
 def _slot_from_filename(path: Path) -> int:
     """Legacy filenames carry the query time (slot + 1 minute); floor to the slot."""
-    stamp = datetime.strptime(path.stem, "%Y-%m-%dT%H%MZ").replace(tzinfo=timezone.utc)
-    epoch = int(stamp.timestamp())
+    epoch = compact_to_epoch(path.stem)
     return epoch - epoch % HALF_HOUR_SECONDS
 
 
@@ -120,20 +125,34 @@ def _candidate_rows(source: str, snapshot: Snapshot) -> list[tuple[object, ...]]
 
 
 def stage_json_backlog(
-    staging: Staging, files: Iterable[Path], endpoint: str
+    staging: Staging,
+    files: Iterable[Path],
+    endpoint: str,
+    max_workers: int | None = None,
 ) -> StageReport:
     """Stage raw API JSON through the same parser live ingestion uses. Files the
-    live parser would reject become documented exclusions, never silent skips."""
+    live parser would reject become documented exclusions, never silent skips.
+
+    Parsing fans out to `max_workers` processes (all cores by default) while this
+    process reads files and is the only writer.
+    """
     staged = 0
     excluded: list[tuple[str, str]] = []
+    paths = list(files)
+    slots = [_slot_from_filename(path) for path in paths]
+    items = (
+        (endpoint, path.read_bytes(), slot)
+        for path, slot in zip(paths, slots, strict=True)
+    )
+    results = parse_snapshots(items, max_workers=max_workers)
     connection = staging.connect()
     with connection:
-        for path in files:
-            slot = _slot_from_filename(path)
+        for path, slot, snapshot in zip(paths, slots, results, strict=True):
+            if isinstance(snapshot, Rejected):
+                excluded.append((path.name, snapshot.reason))
+                continue
             connection.execute("SAVEPOINT stage_file")
             try:
-                payload = json.loads(path.read_text())
-                snapshot = parse_snapshot(endpoint, payload, slot, slot)
                 connection.executemany(
                     _CANDIDATE_INSERT, _candidate_rows("json_backlog", snapshot)
                 )
@@ -148,13 +167,7 @@ def stage_json_backlog(
                         None,  # the true fetch minute was never persisted historically
                     ),
                 )
-            except (
-                json.JSONDecodeError,
-                MalformedSnapshotError,
-                KeyError,
-                ValueError,
-                sqlite3.IntegrityError,
-            ) as error:
+            except sqlite3.IntegrityError as error:
                 connection.execute("ROLLBACK TO stage_file")
                 connection.execute("RELEASE stage_file")
                 excluded.append((path.name, f"{type(error).__name__}: {error}"))
@@ -438,7 +451,11 @@ def emit(
     batch_slots: int = 500,
 ) -> int:
     """Replay the resolved stream through the production write path, oldest slot
-    first, compacting in bounded batches. Returns the number of captures emitted."""
+    first, compacting in bounded batches. Returns the number of captures emitted.
+
+    Sealed partitions are closed only by the final compaction: `compact_now` is
+    past the whole backlog, so closing after each batch would drop and rebuild
+    the tails of the partitions the next batch still writes to."""
     connection = staging.connect()
     meta = {
         (capture_utc, endpoint): (source, first, last, observed)
@@ -478,7 +495,7 @@ def emit(
         emitted += len(snapshots)
         pending_slots += 1
         if pending_slots >= batch_slots:
-            store.compact(now=compact_now)
+            store.compact(now=compact_now, close_sealed=False)
             pending_slots = 0
             print(f"[migrate] emitted {emitted} captures...", flush=True)
     connection.close()
@@ -495,9 +512,9 @@ def _snapshot_from_rows(
 ) -> Snapshot:
     """Assemble one capture's Snapshot from its streamed resolved rows."""
     source, first, last, observed = meta[(slot, endpoint)]
-    national: list[tuple[int, int, int | None, int | None]] = []
-    regional: list[tuple[int | None, ...]] = []
-    generation: list[tuple[int | None, ...]] = []
+    national = Columns(NATIONAL_COLUMNS)
+    regional = Columns(REGIONAL_COLUMNS)
+    generation = Columns(GENERATION_COLUMNS)
     for (
         _slot,
         _endpoint,
@@ -519,9 +536,9 @@ def _snapshot_from_rows(
         observed_utc=None if observed is None else int(observed),
         window_first_utc=int(first),
         window_last_utc=int(last),
-        national=tuple(national),
-        regional=tuple(regional),
-        generation=tuple(generation),
+        national=national,
+        regional=regional,
+        generation=generation,
         source=str(source),
         gaps=tuple(gaps_by_capture.get((slot, endpoint), ())),
     )
@@ -904,7 +921,7 @@ def reextract_sample(staging: Staging, files: Iterable[Path], endpoint: str) ->
     for path in files:
         slot = _slot_from_filename(path)
         try:
-            payload = json.loads(path.read_text())
+            payload = loads(path.read_bytes())
         except (json.JSONDecodeError, OSError):
             (staged_rows,) = connection.execute(
                 "SELECT COUNT(*) FROM candidates WHERE source = 'json_backlog'"
@@ -1087,7 +1104,10 @@ def run_migration(
         reconstruction=reconstruction,
         reextraction_mismatches=mismatched_reextractions,
         provenance_mismatches=verify_provenance(staging, store),
-        leftover_inboxes=len(list(store.inbox_dir.glob("**/*.sqlite"))),
+        leftover_inboxes=sum(
+            len(list(store.inbox_dir.glob(f"**/snap_*{suffix}")))
+            for suffix in (".sqlite", ".pack")
+        ),
         golden=golden,
         reference_counts=reference_counts,
     )
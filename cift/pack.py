@@ -0,0 +1,169 @@
+"""Packed inboxes: an inbox database's tables as sorted, delta-encoded columns.
+
+An inbox database costs ~131 KB per scrape, and every scrape commits a new,
+unrelated binary blob. A packed inbox holds the same rows column by column, in
+key order: every integer column is its first value, then the differences
+between consecutive values at the narrowest fixed width (1, 2, 4 or 8 bytes,
+little-endian) that holds them all. Successive scrapes repeat each other's
+horizons shifted by one window, so packs are small and git's delta compression
+finds the shared runs; fixed widths also decode at C speed through `array`.
+NULLs are listed by row, and columns that are not integers (endpoints,
+sources, fingerprints, timings) are few and short, so they go in the header.
+
+Optionally the body is compressed: with zstd when `zstandard` is installed,
+else zlib. That shrinks a single file further but hides the shared runs from
+git, so the uncompressed pack is the one to commit.
+
+Layout: a `CIFTPACK1 <codec>` line, then (compressed together when a codec is
+set) a 4-byte header length, the JSON header and the delta columns, table by
+table in header order.
+"""
+
+import json
+import sqlite3
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from itertools import pairwise
+from typing import Any
+from typing import Callable
+from typing import Collection
+
+MAGIC = b"CIFTPACK1"
+
+_LENGTH = struct.Struct(">I")
+
+# Narrowest first: (array typecode, smallest and largest delta it holds).
+_WIDTHS = [
+    (code, -(2 ** (bits - 1)), 2 ** (bits - 1) - 1)
+    for code, bits in (("b", 8), ("h", 16), ("i", 32), ("q", 64))
+]
+
+
+class PackFormatError(Exception):
+    """The file is not a packed inbox, or needs a codec that is not installed."""
+
+
+def _codecs() -> dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    codecs: dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+        "none": (bytes, bytes),
+        "zlib": (lambda data: zlib.compress(data, 9), zlib.decompress),
+    }
+    try:
+        import zstandard
+    except ImportError:
+        return codecs
+    codecs["zstd"] = (
+        zstandard.ZstdCompressor(level=19).compress,
+        zstandard.ZstdDecompressor().decompress,
+    )
+    return codecs
+
+
+_CODECS = _codecs()
+
+# What `pack_inbox(compress=True)` uses: zstd when installed, else the stdlib's zlib.
+COMPRESSION = "zstd" if "zstd" in _CODECS else "zlib"
+
+
+def _encode_column(values: list[Any], body: bytearray) -> dict[str, Any] | None:
+    """Append an integer column's deltas to `body` and return its header entry;
+    None (nothing appended) when the column is not integers or is all NULL."""
+    present = [value for value in values if value is not None]
+    if not present or any(type(value) is not int for value in present):
+        return None
+    deltas = [b - a for a, b in pairwise(present)]
+    low, high = min(deltas, default=0), max(deltas, default=0)
+    fitting = [code for code, lo, hi in _WIDTHS if lo <= low and high <= hi]
+    if not fitting:
+        return None
+    packed = array(fitting[0], deltas)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    body += packed.tobytes()
+    nulls = [index for index, value in enumerate(values) if value is None]
+    return {"type": fitting[0], "first": present[0], "nulls": nulls}
+
+
+def _decode_column(column: dict[str, Any], chunk: bytes) -> list[Any]:
+    deltas = array(column["type"], chunk)
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    values: list[Any] = list(accumulate(deltas, initial=column["first"]))
+    for index in column["nulls"]:
+        values.insert(index, None)
+    return values
+
+
+def _chunk_bytes(column: dict[str, Any], rows: int) -> int:
+    if "json" in column:
+        return 0
+    present = rows - len(column["nulls"])
+    return (present - 1) * array(column["type"]).itemsize
+
+
+def pack_inbox(connection: sqlite3.Connection, compress: bool = False) -> bytes:
+    """Every table of an inbox database, packed."""
+    tables: dict[str, Any] = {}
+    body = bytearray()
+    for (table,) in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+    ).fetchall():
+        # WITHOUT ROWID tables scan in primary key order.
+        cursor = connection.execute(f"SELECT * FROM {table}")
+        width = len(cursor.description)
+        rows = cursor.fetchall()
+        columns = []
+        for index in range(width):
+            values = [row[index] for row in rows]
+            columns.append(_encode_column(values, body) or {"json": values})
+        tables[table] = {"rows": len(rows), "columns": columns}
+    encoded = json.dumps({"tables": tables}, separators=(",", ":")).encode()
+    payload = _LENGTH.pack(len(encoded)) + encoded + bytes(body)
+    codec = COMPRESSION if compress else "none"
+    compressor, _ = _CODECS[codec]
+    return MAGIC + b" " + codec.encode() + b"\n" + compressor(payload)
+
+
+def unpack_inbox(
+    data: bytes,
+    connection: sqlite3.Connection,
+    tables: Collection[str] | None = None,
+) -> None:
+    """Insert a pack's rows into `connection`, whose tables must already exist;
+    with `tables`, only those (the rest are skipped without decoding)."""
+    first_line, _, rest = data.partition(b"\n")
+    magic, _, codec = first_line.decode("ascii", "replace").partition(" ")
+    if magic.encode() != MAGIC:
+        raise PackFormatError("not a packed inbox")
+    if codec not in _CODECS:
+        raise PackFormatError(
+            f"packed with {codec!r}, which is not installed (pip install zstandard)"
+        )
+    _, decompress = _CODECS[codec]
+    payload = decompress(rest)
+    (length,) = _LENGTH.unpack_from(payload)
+    start = _LENGTH.size
+    position = start + length
+    header = json.loads(payload[start:position])
+    for table, layout in header["tables"].items():
+        rows = layout["rows"]
+        if tables is not None and table not in tables:
+            position += sum(_chunk_bytes(column, rows) for column in layout["columns"])
+            continue
+        columns = []
+        for column in layout["columns"]:
+            if "json" in column:
+                columns.append(column["json"])
+                continue
+            end = position + _chunk_bytes(column, rows)
+            columns.append(_decode_column(column, payload[position:end]))
+            position = end
+        if rows:
+            placeholders = ", ".join("?" * len(columns))
+            connection.executemany(
+                f"INSERT INTO {table} VALUES ({placeholders})",
+                zip(*columns, strict=True),
+            )
@@ -1,9 +1,31 @@
 """Turn raw API payloads into storage-ready observation rows. Pure: no I/O, no clock."""
 
+import codecs
+import json
+import math
+import multiprocessing
+import os
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
-from datetime import timezone
+from itertools import islice
 from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+from typing import overload
+
+from cift.decode import DECODER
+from cift.decode import STDLIB_DECODER
+from cift.decode import loads
+from cift.timestamps import HALF_HOUR_SECONDS
+from cift.timestamps import HalfHourRun
+from cift.timestamps import WindowSequenceError
 
 ENDPOINTS = (
     "national_fw48h",
@@ -25,14 +47,6 @@ FUELS = (
     "wind",
 )
 
-HALF_HOUR_SECONDS = 1800
-
-
-def to_epoch(timestamp: str) -> int:
-    """Convert an API timestamp like '2023-03-22T11:30Z' to unix seconds."""
-    dt = datetime.strptime(timestamp, "%Y-%m-%dT%H:%MZ").replace(tzinfo=timezone.utc)
-    return int(dt.timestamp())
-
 
 def floor_to_slot(dt: datetime) -> int:
     """Round a datetime down to its half-hour capture slot, as unix seconds."""
@@ -40,18 +54,126 @@ def floor_to_slot(dt: datetime) -> int:
     return epoch - epoch % HALF_HOUR_SECONDS
 
 
+Row = tuple[int | None, ...]
+
+# Typecodes per column: 64-bit times (past 2038), 32-bit ids and values.
+NATIONAL_COLUMNS = "qqii"
+REGIONAL_COLUMNS = "qiqi" + "i" * len(FUELS)
+GENERATION_COLUMNS = "qq" + "i" * len(FUELS)
+
+
+class Columns(Sequence[Row]):
+    """Observation rows stored column-major: one typed array per column, plus a
+    validity mask for any column that has ever held NULL.
+
+    A regional horizon is ~1,700 rows of 13 values; as arrays that is ~90 KB
+    instead of ~1,700 tuples of boxed ints. Indexing and iteration give the same
+    tuples the row-tuple representation held, so it drops in wherever rows are
+    read, and iteration feeds executemany straight from the arrays.
+    """
+
+    __slots__ = ("typecodes", "_arrays", "_nulls")
+
+    def __init__(self, typecodes: str, rows: Iterable[Row] = ()) -> None:
+        self.typecodes = typecodes
+        self._arrays = [array(code) for code in typecodes]
+        self._nulls: list[bytearray | None] = [None] * len(typecodes)
+        for row in rows:
+            self.append(row)
+
+    def append(self, row: Row) -> None:
+        if len(row) != len(self._arrays):
+            raise ValueError(f"expected {len(self._arrays)} columns, got {len(row)}")
+        if None not in row:
+            for column, value in zip(self._arrays, row, strict=True):
+                column.append(value)  # type: ignore[arg-type]
+            for mask in self._nulls:
+                if mask is not None:
+                    mask.append(0)
+            return
+        size = len(self)
+        for index, value in enumerate(row):
+            mask = self._nulls[index]
+            if value is None and mask is None:
+                mask = self._nulls[index] = bytearray(size)
+            self._arrays[index].append(0 if value is None else value)
+            if mask is not None:
+                mask.append(value is None)
+
+    def column(self, index: int) -> array[int]:
+        """The raw values of one column; NULL positions hold 0 (see `nulls`)."""
+        return self._arrays[index]
+
+    def nulls(self, index: int) -> bytearray | None:
+        """One byte per row, 1 where the column is NULL; None if it has no NULLs."""
+        return self._nulls[index]
+
+    def _column_values(self, index: int) -> Iterable[int | None]:
+        mask = self._nulls[index]
+        values = self._arrays[index]
+        if mask is None:
+            return values
+        return (
+            None if null else value for value, null in zip(values, mask, strict=True)
+        )
+
+    def __len__(self) -> int:
+        return len(self._arrays[0])
+
+    def __iter__(self) -> Iterator[Row]:
+        columns = [self._column_values(i) for i in range(len(self._arrays))]
+        return zip(*columns, strict=True)
+
+    @overload
+    def __getitem__(self, index: int) -> Row: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "Sequence[Row]": ...
+
+    def __getitem__(self, index: int | slice) -> "Row | Sequence[Row]":
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        return tuple(
+            (
+                None
+                if (mask := self._nulls[i]) is not None and mask[index]
+                else column[index]
+            )
+            for i, column in enumerate(self._arrays)
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other, strict=True)
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Columns({self.typecodes!r}, {len(self)} rows)"
+
+
 @dataclass(frozen=True)
 class Snapshot:
-    """One endpoint's parsed response at one capture slot."""
+    """One endpoint's parsed response at one capture slot.
+
+    Rows are any sequence of tuples; the parsers produce Columns.
+    """
 
     endpoint: str
     capture_utc: int
     observed_utc: int | None
     window_first_utc: int
     window_last_utc: int
-    national: tuple[tuple[int, int, int | None, int | None], ...]
-    regional: tuple[tuple[int | None, ...], ...]
-    generation: tuple[tuple[int | None, ...], ...]
+    national: Sequence[Row]
+    regional: Sequence[Row]
+    generation: Sequence[Row]
     # Migration provenance; live ingestion always uses the defaults.
     source: str = "live"
     gaps: tuple[tuple[int, int], ...] = ()  # (window_utc, region_id 0 = all)
@@ -70,24 +192,25 @@ def _fuel_tenths(endpoint: str, generationmix: list[dict[str, Any]]) -> tuple[in
     percs = {entry["fuel"]: entry["perc"] for entry in generationmix}
     tenths = []
     for fuel in FUELS:
-        scaled = percs[fuel] * 10
-        if abs(scaled - round(scaled)) > 1e-9:
+        scaled = _one_decimal_tenths(percs[fuel])
+        if scaled is None:
             raise MalformedSnapshotError(
                 f"{endpoint}: {fuel} percentage {percs[fuel]} has more than one decimal"
             )
-        tenths.append(round(scaled))
+        tenths.append(scaled)
     return tuple(tenths)
 
 
-def _validate_horizon(endpoint: str, window_epochs: list[int]) -> None:
-    if not window_epochs:
-        raise MalformedSnapshotError(f"{endpoint}: no windows in response")
-    for previous, current in zip(window_epochs, window_epochs[1:], strict=False):
-        if current - previous != HALF_HOUR_SECONDS:
-            raise MalformedSnapshotError(
-                f"{endpoint}: windows are not contiguous half-hours"
-                f" ({previous} -> {current})"
-            )
+def _one_decimal_tenths(value: Any) -> int | None:
+    """A JSON number with at most one decimal place (within 1e-9 of one, so a
+    float off in its last bit still counts), in tenths; else None."""
+    if type(value) is int:
+        return value * 10
+    if type(value) is not float or not math.isfinite(value):
+        return None
+    scaled = value * 10
+    tenths = round(scaled)
+    return tenths if abs(scaled - tenths) <= 1e-9 else None
 
 
 def _validate_regions(endpoint: str, window: dict[str, Any]) -> None:
@@ -98,46 +221,65 @@ def _validate_regions(endpoint: str, window: dict[str, Any]) -> None:
         )
 
 
-def _validate_horizon_side(
-    endpoint: str, window_epochs: list[int], capture_utc: int
-) -> None:
-    """fw48h horizons start at the capture slot; pt24h horizons end before it.
+def horizon_fits(
+    endpoint: str, capture_utc: int, first_utc: int, last_utc: int
+) -> bool:
+    """Whether a horizon obeys the capture-relative rule the parser enforces:
+    fw48h starts at or after the capture slot, pt24h ends before it."""
+    if endpoint.endswith("fw48h"):
+        return first_utc >= capture_utc
+    return last_utc < capture_utc
+
+
+class _SnapshotBuilder:
+    """Validate and flatten one endpoint's windows one at a time, in payload order.
 
-    This disjointness is what lets the fact tables omit an endpoint column: the
-    same (window, capture) key can never be observed by both endpoint families.
+    Both the whole-payload and the streaming parser feed this, so they share one
+    definition of the completeness invariant and reject exactly the same payloads.
+    fw48h horizons start at the capture slot; pt24h horizons end before it. This
+    disjointness is what lets the fact tables omit an endpoint column: the same
+    (window, capture) key can never be observed by both endpoint families.
     """
-    if endpoint.endswith("fw48h"):
-        if window_epochs[0] < capture_utc:
+
+    def __init__(
+        self, endpoint: str, capture_utc: int, observed_utc: int | None
+    ) -> None:
+        self.endpoint = endpoint
+        self.capture_utc = capture_utc
+        self.observed_utc = observed_utc
+        self.forward = endpoint.endswith("fw48h")
+        self.run = HalfHourRun()
+        self.national = Columns(NATIONAL_COLUMNS)
+        self.regional = Columns(REGIONAL_COLUMNS)
+        self.generation = Columns(GENERATION_COLUMNS)
+
+    def add(self, window: dict[str, Any]) -> None:
+        endpoint, capture_utc = self.endpoint, self.capture_utc
+        first = self.run.first is None
+        try:
+            window_utc = self.run.push(window["from"])
+        except WindowSequenceError as error:
+            raise MalformedSnapshotError(f"{endpoint}: {error}") from error
+        if first and self.forward and window_utc < capture_utc:
             raise MalformedSnapshotError(
                 f"{endpoint}: forward horizon starts before its capture slot"
             )
-    elif window_epochs[-1] >= capture_utc:
-        raise MalformedSnapshotError(
-            f"{endpoint}: past horizon reaches into its own capture slot"
-        )
-
-
-def parse_snapshot(
-    endpoint: str, payload: dict[str, Any], capture_utc: int, observed_utc: int | None
-) -> Snapshot:
-    """Parse one endpoint payload into rows keyed by window and capture slot.
+        if not self.forward and window_utc >= capture_utc:
+            raise MalformedSnapshotError(
+                f"{endpoint}: past horizon reaches into its own capture slot"
+            )
+        try:
+            self._append(window_utc, window)
+        except (TypeError, OverflowError) as error:
+            # The integer columns take nothing else: a float or string value.
+            raise MalformedSnapshotError(
+                f"{endpoint}: window {window['from']}: {error}"
+            ) from error
 
-    Raises MalformedSnapshotError unless the response satisfies the completeness
-    invariant: a contiguous half-hour horizon, all 18 regions, all 9 fuels, and
-    one-decimal fuel percentages (what reconstruction relies on — see ADR-001).
-    """
-    windows = payload["data"]
-    window_epochs = [to_epoch(w["from"]) for w in windows]
-    _validate_horizon(endpoint, window_epochs)
-    _validate_horizon_side(endpoint, window_epochs, capture_utc)
-    national: list[tuple[int, int, int | None, int | None]] = []
-    regional: list[tuple[int | None, ...]] = []
-    generation: list[tuple[int | None, ...]] = []
-
-    for window in windows:
-        window_utc = to_epoch(window["from"])
+    def _append(self, window_utc: int, window: dict[str, Any]) -> None:
+        endpoint, capture_utc = self.endpoint, self.capture_utc
         if endpoint == "national_generation_pt24h":
-            generation.append(
+            self.generation.append(
                 (
                     window_utc,
                     capture_utc,
@@ -146,7 +288,7 @@ def parse_snapshot(
             )
         elif endpoint.startswith("national"):
             intensity = window["intensity"]
-            national.append(
+            self.national.append(
                 (
                     window_utc,
                     capture_utc,
@@ -157,7 +299,7 @@ def parse_snapshot(
         else:
             _validate_regions(endpoint, window)
             for region in window["regions"]:
-                regional.append(
+                self.regional.append(
                     (
                         window_utc,
                         region["regionid"],
@@ -167,14 +309,305 @@ def parse_snapshot(
                     )
                 )
 
-    window_epochs = [to_epoch(w["from"]) for w in windows]
-    return Snapshot(
-        endpoint=endpoint,
-        capture_utc=capture_utc,
-        observed_utc=observed_utc,
-        window_first_utc=min(window_epochs),
-        window_last_utc=max(window_epochs),
-        national=tuple(national),
-        regional=tuple(regional),
-        generation=tuple(generation),
-    )
+    def finish(self) -> Snapshot:
+        first_utc, last_utc = self.run.first, self.run.last
+        if first_utc is None or last_utc is None:
+            raise MalformedSnapshotError(f"{self.endpoint}: no windows in response")
+        return Snapshot(
+            endpoint=self.endpoint,
+            capture_utc=self.capture_utc,
+            observed_utc=self.observed_utc,
+            window_first_utc=first_utc,
+            window_last_utc=last_utc,
+            national=self.national,
+            regional=self.regional,
+            generation=self.generation,
+        )
+
+
+@contextmanager
+def _shape_checked(endpoint: str) -> Iterator[None]:
+    """Report a payload of the wrong shape (no "data", a window without "from",
+    a region that is not an object...) as malformed, like any invalid response."""
+    try:
+        yield
+    except json.JSONDecodeError:
+        raise
+    except (KeyError, TypeError, ValueError) as error:
+        raise MalformedSnapshotError(
+            f"{endpoint}: unexpected payload shape: {type(error).__name__}: {error}"
+        ) from error
+
+
+def parse_snapshot(
+    endpoint: str, payload: dict[str, Any], capture_utc: int, observed_utc: int | None
+) -> Snapshot:
+    """Parse one endpoint payload into rows keyed by window and capture slot.
+
+    Raises MalformedSnapshotError unless the response satisfies the completeness
+    invariant: a contiguous half-hour horizon, all 18 regions, all 9 fuels, and
+    one-decimal fuel percentages (what reconstruction relies on — see ADR-001).
+    """
+    builder = _SnapshotBuilder(endpoint, capture_utc, observed_utc)
+    with _shape_checked(endpoint):
+        for window in payload["data"]:
+            builder.add(window)
+    return builder.finish()
+
+
+def merge_region_payloads(
+    endpoint: str, payloads: Mapping[int, dict[str, Any]]
+) -> dict[str, Any]:
+    """Rebuild a bulk `endpoint` payload from one_region_* responses by region id,
+    so parse_snapshot validates the result exactly like a bulk response.
+
+    Raises MalformedSnapshotError if a response is for another region or the
+    regions' horizons disagree.
+    """
+    horizons = {}
+    for region_id, payload in payloads.items():
+        region = payload["data"]
+        # The API wraps the region in a one-element list on some routes.
+        if isinstance(region, list):
+            if len(region) != 1:
+                raise MalformedSnapshotError(
+                    f"{endpoint}: region {region_id} response holds {len(region)} regions"
+                )
+            region = region[0]
+        if region["regionid"] != region_id:
+            raise MalformedSnapshotError(
+                f"{endpoint}: asked for region {region_id}, got {region['regionid']}"
+            )
+        horizons[region_id] = region["data"]
+
+    starts = {tuple(w["from"] for w in windows) for windows in horizons.values()}
+    if len(starts) > 1:
+        raise MalformedSnapshotError(f"{endpoint}: single-region horizons disagree")
+    windows = []
+    for position, start in enumerate(next(iter(starts), ())):
+        windows.append(
+            {
+                "from": start,
+                "regions": [
+                    {
+                        "regionid": region_id,
+                        "intensity": horizon[position]["intensity"],
+                        "generationmix": horizon[position]["generationmix"],
+                    }
+                    for region_id, horizon in sorted(horizons.items())
+                ],
+            }
+        )
+    return {"data": windows}
+
+
+_WHITESPACE = " \t\n\r"
+
+
+class _WindowStream:
+    """Yield the elements of a payload's top-level "data" array as each one's text
+    has fully arrived, decoding only that element: at most one window is ever held
+    as Python objects, and the C decoder still does the per-element work."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.chunks = iter(chunks)
+        self.text = codecs.getincrementaldecoder("utf-8")()
+        self.decoder = STDLIB_DECODER
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self) -> bool:
+        """Append at least as much input again as is unconsumed, so a value that
+        straddles chunks is re-decoded a bounded number of times."""
+        if self.eof:
+            return False
+        pos = self.pos
+        pending = [self.buffer[pos:]]
+        wanted = max(len(pending[0]), 1)
+        received = 0
+        while received < wanted:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.eof = True
+                pending.append(self.text.decode(b"", final=True))
+                break
+            text = self.text.decode(chunk)
+            pending.append(text)
+            received += len(text)
+        self.buffer = "".join(pending)
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """The next non-whitespace character, reading more input as needed."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._more():
+                raise json.JSONDecodeError("unexpected end of payload", self.buffer, 0)
+
+    def _expect(self, token: str) -> None:
+        if self._peek() != token:
+            raise json.JSONDecodeError(f"expected {token!r}", self.buffer, self.pos)
+        self.pos += 1
+
+    def _value(self) -> Any:
+        """Decode one complete JSON value, waiting for more bytes if it is cut off."""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            # A number at the buffer's end may continue in the next chunk.
+            if end == len(self.buffer) and not self.eof and self._more():
+                continue
+            self.pos = end
+            return value
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        self._expect("{")
+        found = False
+        if self._peek() != "}":
+            while True:
+                key = self._value()
+                self._expect(":")
+                if key == "data" and not found and self._peek() == "[":
+                    found = True
+                    self.pos += 1
+                    if self._peek() == "]":
+                        self.pos += 1
+                    else:
+                        while True:
+                            yield self._value()
+                            if self._peek() == "]":
+                                self.pos += 1
+                                break
+                            self._expect(",")
+                else:
+                    self._value()
+                if self._peek() == "}":
+                    break
+                self._expect(",")
+        self.pos += 1
+        if self._peek_end():
+            raise json.JSONDecodeError(
+                "extra data after payload", self.buffer, self.pos
+            )
+        if not found:
+            raise KeyError("data")
+
+    def _peek_end(self) -> bool:
+        """Whether anything but whitespace follows the payload."""
+        try:
+            self._peek()
+        except json.JSONDecodeError:
+            return False
+        return True
+
+
+def parse_snapshot_stream(
+    endpoint: str,
+    chunks: Iterable[bytes],
+    capture_utc: int,
+    observed_utc: int | None,
+) -> Snapshot:
+    """parse_snapshot over raw UTF-8 JSON arriving in chunks, never building the DOM.
+
+    Rows are emitted window by window as the bytes arrive and a defect stops the
+    read at the offending window. The result, and which payloads are rejected, are
+    identical to parse_snapshot(cift.decode.loads(b"".join(chunks))).
+    """
+    builder = _SnapshotBuilder(endpoint, capture_utc, observed_utc)
+    with _shape_checked(endpoint):
+        for window in _WindowStream(chunks):
+            builder.add(window)
+    return builder.finish()
+
+
+@dataclass(frozen=True)
+class Rejected:
+    """A payload parse_snapshots could not parse, and why ("ErrorType: message")."""
+
+    reason: str
+
+
+# What makes one payload unparseable rather than the batch broken.
+_PAYLOAD_ERRORS = (
+    json.JSONDecodeError,
+    MalformedSnapshotError,
+    KeyError,
+    TypeError,
+    ValueError,
+)
+
+
+def _parse_payload(endpoint: str, data: bytes, capture_utc: int) -> Snapshot:
+    if DECODER == "json":
+        # The stdlib decodes no faster whole, and streaming holds one window.
+        return parse_snapshot_stream(endpoint, (data,), capture_utc, None)
+    payload = loads(data)
+    if not isinstance(payload, dict):
+        raise MalformedSnapshotError(f"{endpoint}: payload is not a JSON object")
+    return parse_snapshot(endpoint, payload, capture_utc, None)
+
+
+def _parse_chunk(items: Sequence[tuple[str, bytes, int]]) -> list[Snapshot | Rejected]:
+    results: list[Snapshot | Rejected] = []
+    for endpoint, data, capture_utc in items:
+        try:
+            results.append(_parse_payload(endpoint, data, capture_utc))
+        except _PAYLOAD_ERRORS as error:
+            results.append(Rejected(f"{type(error).__name__}: {error}"))
+    return results
+
+
+def parse_snapshots(
+    items: Iterable[tuple[str, bytes, int]],
+    max_workers: int | None = None,
+    chunksize: int = 16,
+) -> Iterator[Snapshot | Rejected]:
+    """Parse (endpoint, raw JSON bytes, capture slot) items on a process pool.
+
+    Yields one result per item, in input order: the Snapshot, or Rejected for a
+    payload parse_snapshot would refuse, so one consumer can write them all.
+    Items go to the workers `chunksize` at a time and at most two chunks per
+    worker are in flight, so memory stays bounded however long `items` is.
+    Historical payloads have no observed time; snapshots carry None.
+
+    With `max_workers` of 1 everything is parsed in this process.
+    """
+    chunks = _chunked(items, chunksize)
+    if max_workers == 1:
+        for chunk in chunks:
+            yield from _parse_chunk(chunk)
+        return
+    workers = max_workers or os.cpu_count() or 1
+    # Callers may have threads running (ingest's fetch pool, the server), and
+    # forking a multi-threaded process can copy a lock held mid-operation.
+    context = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        in_flight: deque[Future[list[Snapshot | Rejected]]] = deque()
+        try:
+            for chunk in chunks:
+                in_flight.append(executor.submit(_parse_chunk, chunk))
+                if len(in_flight) >= 2 * workers:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+
+
+def _chunked(
+    items: Iterable[tuple[str, bytes, int]], size: int
+) -> Iterator[list[tuple[str, bytes, int]]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
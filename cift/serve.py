@@ -0,0 +1,130 @@
+"""Long-running ingest: scrape every half-hour slot at slot + 1 minute from one host.
+
+GitHub's cron fires 10+ minutes late or not at all at busy times; a daemon on our
+own host can hit each slot to the second. Each firing is the same `run_ingest`
+the workflow calls, so inboxes, first-wins publishing and `observed_utc` (which
+now measures how tight the timing really is) are unchanged.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Awaitable
+from typing import Callable
+
+from cift.client import Client
+from cift.ingest import IncompleteIngestError
+from cift.ingest import run_ingest
+from cift.parse import HALF_HOUR_SECONDS
+from cift.parse import floor_to_slot
+
+log = logging.getLogger(__name__)
+
+# Sleeps are re-aimed at the wall clock at least this often, so NTP steps and
+# event-loop timer drift cannot accumulate into a late firing.
+MAX_SLEEP_SECONDS = 60.0
+
+
+def next_fire_utc(
+    now_utc: float, offset_seconds: float, last_slot: int | None
+) -> float:
+    """When to fire next: this slot's offset if it is still to come or has not been
+    scraped yet, otherwise the next slot's."""
+    slot = floor_to_slot(datetime.fromtimestamp(now_utc, tz=timezone.utc))
+    if last_slot is not None and slot <= last_slot:
+        slot = last_slot + HALF_HOUR_SECONDS
+    return slot + offset_seconds
+
+
+def write_health(path: Path, slot: int, inbox: Path, observed_utc: float) -> None:
+    """Atomically record the last successfully scraped slot for external monitors."""
+    record = {
+        "last_success_slot": datetime.fromtimestamp(slot, tz=timezone.utc).strftime(
+            "%Y-%m-%dT%H:%MZ"
+        ),
+        "last_success_slot_utc": slot,
+        "observed_utc": round(observed_utc, 3),
+        "seconds_after_slot": round(observed_utc - slot, 3),
+        "inbox": str(inbox),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scratch = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    scratch.write_text(json.dumps(record, indent=2) + "\n")
+    os.replace(scratch, path)
+
+
+def _log_alert(alert: str) -> None:
+    log.warning("horizon alert", extra={"alert": alert})
+
+
+async def serve_ingest(
+    db_root: Path,
+    client_factory: Callable[[], Client],
+    health_path: Path,
+    stop: asyncio.Event,
+    offset_seconds: float = 60.0,
+    max_workers: int = 5,
+    clock: Callable[[], float] = time.time,
+    sleep: Callable[[float], Awaitable[None]] | None = None,
+    max_slots: int | None = None,
+    delta: bool = False,
+    packed: bool = False,
+    compress: bool = False,
+) -> int:
+    """Scrape every slot until `stop` is set; returns how many slots were attempted.
+
+    A scrape already running when `stop` is set finishes and is recorded before the
+    loop exits, so a shutdown never abandons a half-written inbox. Each slot gets a
+    fresh client: retry timings and deadlines are per scrape.
+    """
+
+    async def stoppable_sleep(seconds: float) -> None:
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=seconds)
+        except TimeoutError:
+            pass
+
+    pause = sleep if sleep is not None else stoppable_sleep
+    last_slot: int | None = None
+    attempted = 0
+    while not stop.is_set() and (max_slots is None or attempted < max_slots):
+        fire_at = next_fire_utc(clock(), offset_seconds, last_slot)
+        while not stop.is_set() and (remaining := fire_at - clock()) > 0:
+            await pause(min(remaining, MAX_SLEEP_SECONDS))
+        if stop.is_set():
+            break
+
+        fired = clock()
+        now = datetime.fromtimestamp(fired, tz=timezone.utc)
+        slot = floor_to_slot(now)
+        last_slot = slot
+        attempted += 1
+        try:
+            inbox = await asyncio.to_thread(
+                run_ingest,
+                db_root,
+                now,
+                client_factory(),
+                max_workers,
+                delta=delta,
+                on_alert=_log_alert,
+                packed=packed,
+                compress=compress,
+            )
+        except IncompleteIngestError as error:
+            log.error("partial scrape", extra={"slot": slot, "error": str(error)})
+            continue
+        except Exception:  # one bad slot must never stop the daemon
+            log.exception("scrape failed", extra={"slot": slot})
+            continue
+        write_health(health_path, slot, inbox, fired)
+        log.info(
+            "scraped",
+            extra={"slot": slot, "inbox": str(inbox), "late_seconds": fired - slot},
+        )
+    return attempted
@@ -2,22 +2,37 @@
 
 Layout under a db root (see docs/adr-001-sqlite.md):
     inbox/snap_<slot>.sqlite          one full snapshot per scrape, merged then deleted
+    inbox/snap_<slot>.pack            the same, packed (see cift.pack)
     <YYYY>/national_<YYYY-MM>.sqlite  full-fidelity national trajectories
     <YYYY>/regional_<YYYY-MM>{a,b}.sqlite
     <YYYY>/generation_<YYYY>.sqlite
+    catalog.sqlite                    what each partition holds, kept by compaction
 """
 
+import hashlib
 import os
 import sqlite3
+import struct
 import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import astuple
 from dataclasses import dataclass
+from dataclasses import replace
 from datetime import datetime
+from datetime import timedelta
 from datetime import timezone
 from pathlib import Path
 from typing import Any
+from typing import Collection
 from typing import Iterable
+from typing import Iterator
 from typing import Sequence
 
+from cift.pack import pack_inbox
+from cift.pack import unpack_inbox
 from cift.parse import Snapshot
 
 SCHEMA_VERSION = 1
@@ -40,6 +55,58 @@ class CompactReport:
     quarantined: tuple[str, ...] = ()
 
 
+@dataclass(frozen=True)
+class PartitionInfo:
+    """What one partition holds, as the catalog records it: its data table's
+    window range and row count, the range of captures it has rows for, its
+    size, change counter and BLAKE2b fingerprint when it was described, and
+    whether it still keeps tail tables (is not yet closed)."""
+
+    path: Path
+    kind: str
+    window_first_utc: int | None
+    window_last_utc: int | None
+    row_count: int
+    capture_first_utc: int | None
+    capture_last_utc: int | None
+    page_count: int
+    change_counter: int
+    fingerprint: str
+    has_tails: bool
+
+
+@dataclass(frozen=True)
+class PayloadRecord:
+    """The fingerprint of one endpoint's raw payload at one capture. With
+    `reference_utc` set, the payload was byte-identical to that earlier capture's
+    and shares its rows instead of storing copies."""
+
+    capture_utc: int
+    endpoint: str
+    fingerprint: str
+    reference_utc: int | None = None
+
+
+@dataclass(frozen=True)
+class IngestMetrics:
+    """How one endpoint's scrape went, recorded alongside the rows it produced.
+
+    `retries`, `payload_bytes` and `wire_bytes` are None when the client does not
+    keep per-attempt records; a failed endpoint has an `error` and no rows.
+    """
+
+    capture_utc: int
+    endpoint: str
+    observed_utc: int
+    fetch_seconds: float
+    retries: int | None = None
+    payload_bytes: int | None = None
+    wire_bytes: int | None = None
+    parse_seconds: float | None = None
+    row_count: int = 0
+    error: str | None = None
+
+
 _PRAGMAS = """
 PRAGMA page_size = 4096;
 PRAGMA journal_mode = DELETE;
@@ -95,6 +162,20 @@ CREATE TABLE IF NOT EXISTS capture_gaps (
     region_id   INTEGER NOT NULL DEFAULT 0,
     PRIMARY KEY (capture_utc, endpoint, window_utc, region_id)
 ) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ingest_metrics (
+    capture_utc   INTEGER NOT NULL,
+    endpoint      TEXT    NOT NULL,
+    observed_utc  INTEGER NOT NULL,
+    fetch_seconds REAL    NOT NULL,
+    retries       INTEGER,
+    payload_bytes INTEGER,
+    wire_bytes    INTEGER,
+    parse_seconds REAL,
+    row_count     INTEGER NOT NULL,
+    error         TEXT,
+    PRIMARY KEY (capture_utc, endpoint)
+) WITHOUT ROWID;
 """
 
 # Merging replays are idempotent, so partition inserts ignore duplicates; building
@@ -110,6 +191,9 @@ _INSERT = {
     ),
     "captures": "INSERT OR IGNORE INTO captures VALUES (?, ?, ?, ?, ?, ?)",
     "capture_gaps": "INSERT OR IGNORE INTO capture_gaps VALUES (?, ?, ?, ?)",
+    "ingest_metrics": (
+        "INSERT OR IGNORE INTO ingest_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
 }
 
 _INSERT_STRICT = {
@@ -130,26 +214,170 @@ _CHANGE_LOGGED = {
 }
 
 
+# Fact tables with the endpoint kind whose captures cover them, and the number of
+# leading key columns (the capture column always follows the key).
+_TABLE_KINDS = {
+    "national_intensity": "national",
+    "regional_intensity": "regional",
+    "generation_mix": "generation",
+}
+_KEY_WIDTH = {"national_intensity": 1, "regional_intensity": 2, "generation_mix": 1}
+
+# The change-logged ones are what a delta inbox may store sparsely.
+_DELTA_KINDS = {table: _TABLE_KINDS[table] for table in _CHANGE_LOGGED}
+
+_DELTA_DDL = """
+CREATE TABLE IF NOT EXISTS delta_bases (
+    table_name       TEXT    NOT NULL PRIMARY KEY,
+    base_capture_utc INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Raw payload fingerprints per endpoint; a non-NULL reference_utc means the payload
+# was byte-identical to that earlier capture's, so no rows were stored for it.
+_PAYLOADS_DDL = """
+CREATE TABLE IF NOT EXISTS payload_fingerprints (
+    capture_utc   INTEGER NOT NULL,
+    endpoint      TEXT    NOT NULL,
+    fingerprint   TEXT    NOT NULL,
+    reference_utc INTEGER,
+    PRIMARY KEY (capture_utc, endpoint)
+) WITHOUT ROWID;
+"""
+
+
+class BaseCaptureMissingError(Exception):
+    """The earlier capture a delta or reference inbox builds on is nowhere to be
+    found, so the inbox cannot be expanded."""
+
+
+def _kind(endpoint: str) -> str:
+    return "generation" if "generation" in endpoint else endpoint.split("_")[0]
+
+
+def _has_table(connection: sqlite3.Connection, table: str) -> bool:
+    found = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return found is not None
+
+
+def _stores_in_full(inbox: sqlite3.Connection, table: str) -> bool:
+    """Whether an inbox holds every row of `table` it covers, so reading it needs
+    no other capture: not a delta of it, and no endpoint of it a reference."""
+    if (
+        _has_table(inbox, "delta_bases")
+        and inbox.execute(
+            "SELECT 1 FROM delta_bases WHERE table_name = ?", (table,)
+        ).fetchone()
+    ):
+        return False
+    if not _has_table(inbox, "payload_fingerprints"):
+        return True
+    kind = _TABLE_KINDS[table]
+    return not any(
+        _kind(endpoint) == kind
+        for (endpoint,) in inbox.execute(
+            "SELECT endpoint FROM payload_fingerprints WHERE reference_utc IS NOT NULL"
+        )
+    )
+
+
+def _covered(
+    key: tuple[Any, ...],
+    coverage: Sequence[tuple[int, int]],
+    gaps: set[tuple[int, int]],
+) -> bool:
+    """Whether a capture with these window ranges and gaps observed `key`."""
+    window, region = key[0], key[1] if len(key) > 1 else 0
+    if (window, 0) in gaps or (window, region) in gaps:
+        return False
+    return any(first <= window <= last for first, last in coverage)
+
+
+def _overlaps(
+    first: int | None, last: int | None, lo: int | None, hi: int | None
+) -> bool:
+    """Whether first..last meets lo..hi, either end of which may be open; an
+    empty range (None) meets only an unbounded one."""
+    if lo is None and hi is None:
+        return True
+    if first is None or last is None:
+        return False
+    return (lo is None or last >= lo) and (hi is None or first <= hi)
+
+
+# Each change-logged table's tail: every key's latest stored row, kept in the
+# partition and updated in the merge transaction, so a merge reads one row per
+# key instead of grouping the whole change-log. It is derived and rebuilt when
+# missing (an older partition); a partition that can take no more merges drops
+# it when it closes.
+_TAILS = {
+    "regional_intensity": "latest_regional_intensity",
+    "generation_mix": "latest_generation_mix",
+}
+
+_TAIL_DDL = {
+    "regional_intensity": f"""
+CREATE TABLE latest_regional_intensity (
+    window_utc  INTEGER NOT NULL,
+    region_id   INTEGER NOT NULL,
+    capture_utc INTEGER NOT NULL,
+    forecast    INTEGER,
+    {_FUEL_COLUMNS},
+    PRIMARY KEY (window_utc, region_id)
+) WITHOUT ROWID
+""",
+    "generation_mix": f"""
+CREATE TABLE latest_generation_mix (
+    window_utc  INTEGER NOT NULL,
+    capture_utc INTEGER NOT NULL,
+    {_FUEL_COLUMNS},
+    PRIMARY KEY (window_utc)
+) WITHOUT ROWID
+""",
+}
+
+
+def _column_names(connection: sqlite3.Connection, table: str) -> list[str]:
+    columns = connection.execute(f"SELECT * FROM {table} LIMIT 0").description
+    return [column[0] for column in columns]
+
+
 def _changed_rows_only(
     target: sqlite3.Connection, table: str, rows: list[tuple[Any, ...]]
 ) -> list[tuple[Any, ...]]:
     """Keep only rows whose values differ from the latest stored capture for their key."""
     key_width, capture_index = _CHANGE_LOGGED[table]
     values_start = capture_index + 1
+    tail_table = _TAILS[table]
+    names = _column_names(target, table)
+    key_names = ", ".join(names[:key_width])
+    value_names = ", ".join(names[values_start:])
+    if not _has_table(target, tail_table):
+        # DDL joins the merge transaction: execute, not executescript.
+        target.execute(_TAIL_DDL[table])
+        target.execute(
+            f"INSERT INTO {tail_table} SELECT {key_names}, MAX(capture_utc),"
+            f" {value_names} FROM {table} GROUP BY {key_names}"
+        )
 
     lo = min(row[0] for row in rows)
     hi = max(row[0] for row in rows)
-    tail: dict[tuple[Any, ...], tuple[Any, ...]] = {}
-    columns = target.execute(f"SELECT * FROM {table} LIMIT 0").description
-    names = [column[0] for column in columns]
-    key_names = ", ".join(names[:key_width])
-    value_names = ", ".join(names[values_start:])
-    for stored in target.execute(
-        f"SELECT {key_names}, {value_names}, MAX(capture_utc) FROM {table}"
-        f" WHERE window_utc BETWEEN ? AND ? GROUP BY {key_names}",
-        (lo, hi),
-    ):
-        tail[stored[:key_width]] = stored[key_width:-1]
+    before = min(row[capture_index] for row in rows)
+    stored = target.execute(
+        f"SELECT * FROM {tail_table} WHERE window_utc BETWEEN ? AND ?", (lo, hi)
+    ).fetchall()
+    if any(row[capture_index] >= before for row in stored):
+        # Captures this merge brings are stored already (an interrupted batch):
+        # decide against the change-log as it stood before them, so it merges
+        # again to the same rows.
+        stored = target.execute(
+            f"SELECT {key_names}, MAX(capture_utc), {value_names} FROM {table}"
+            f" WHERE window_utc BETWEEN ? AND ? AND capture_utc < ? GROUP BY {key_names}",
+            (lo, hi, before),
+        ).fetchall()
+    tail = {row[:key_width]: row[values_start:] for row in stored}
 
     kept = []
     for row in sorted(rows, key=lambda r: r[capture_index]):
@@ -160,6 +388,27 @@ def _changed_rows_only(
     return kept
 
 
+def _has_tails(connection: sqlite3.Connection) -> bool:
+    return any(_has_table(connection, tail) for tail in _TAILS.values())
+
+
+def _record_tail(
+    target: sqlite3.Connection, table: str, kept: list[tuple[Any, ...]]
+) -> None:
+    """Advance the tail past rows just inserted by `_changed_rows_only`."""
+    key_width, capture_index = _CHANGE_LOGGED[table]
+    tail_table = _TAILS[table]
+    names = _column_names(target, table)
+    latest = {row[:key_width]: row for row in kept}  # kept is in capture order
+    updates = ", ".join(f"{name} = excluded.{name}" for name in names[key_width:])
+    target.executemany(
+        f"INSERT INTO {tail_table} VALUES ({', '.join('?' * len(names))})"
+        f" ON CONFLICT ({', '.join(names[:key_width])}) DO UPDATE SET {updates}"
+        f" WHERE excluded.capture_utc > {tail_table}.capture_utc",
+        latest.values(),
+    )
+
+
 def _slot_name(capture_utc: int) -> str:
     dt = datetime.fromtimestamp(capture_utc, tz=timezone.utc)
     return dt.strftime("%Y-%m-%dT%H%MZ")
@@ -177,6 +426,23 @@ STATS_COLUMNS = (
     "pc_err_ci95_hi",
 )
 
+# One row per partition, keyed by its path under the db root.
+_CATALOG_DDL = """
+CREATE TABLE IF NOT EXISTS partitions (
+    name              TEXT    PRIMARY KEY,
+    kind              TEXT    NOT NULL,
+    window_first_utc  INTEGER,
+    window_last_utc   INTEGER,
+    row_count         INTEGER NOT NULL,
+    capture_first_utc INTEGER,
+    capture_last_utc  INTEGER,
+    page_count        INTEGER NOT NULL,
+    change_counter    INTEGER NOT NULL,
+    fingerprint       TEXT    NOT NULL,
+    has_tails         INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
 _ANALYSIS_DDL = """
 CREATE TABLE IF NOT EXISTS stats_history (
     stat_date       TEXT PRIMARY KEY,
@@ -229,9 +495,30 @@ class ReferenceDataMissingError(Exception):
     """reference.sqlite has no data for the request; the migration seeds it."""
 
 
-def _open(path: Path, ddl: str = _DDL) -> sqlite3.Connection:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    connection = sqlite3.connect(path)
+def _inode(path: Path) -> int | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    # An empty file is one SQLite has only just created.
+    return stat.st_ino if stat.st_size else None
+
+
+def _open(
+    path: Path, ddl: str = _DDL, prepared: dict[tuple[Path, str], int] | None = None
+) -> sqlite3.Connection:
+    """A read-write connection, the schema brought up to date first. `prepared`
+    records, by (path, DDL), the inode of each file already brought up to date;
+    one found there is not checked again, and a file replaced since is."""
+    known = {} if prepared is None else prepared
+    inode = _inode(path)
+    is_prepared = inode is not None and known.get((path, ddl)) == inode
+    if not is_prepared:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    # Cached connections may be closed by a garbage collection on another thread.
+    connection = sqlite3.connect(path, check_same_thread=False)
+    if is_prepared:
+        return connection
     (version,) = connection.execute("PRAGMA user_version").fetchone()
     if version > SCHEMA_VERSION:
         connection.close()
@@ -240,52 +527,378 @@ def _open(path: Path, ddl: str = _DDL) -> sqlite3.Connection:
         )
     connection.executescript(_PRAGMAS + ddl)
     connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    inode = _inode(path)
+    if inode is not None:
+        known[(path, ddl)] = inode
+    return connection
+
+
+def _close_all(connections: dict[Path, sqlite3.Connection]) -> None:
+    while connections:
+        _, connection = connections.popitem()
+        connection.close()
+
+
+# Readers: a partition is at most 85 MiB, so all of it maps; the page cache
+# holds what has been decoded from the map.
+_READER_PRAGMAS = """
+PRAGMA query_only = ON;
+PRAGMA cache_size = -65536;
+PRAGMA mmap_size = 134217728;
+"""
+
+# A partition ending this long before both now and the oldest unmerged inbox can
+# gain no more rows: a capture's windows reach a day into its past, and catch-up
+# writes slots up to a day old; one more day is slack.
+_SEALED_AFTER_SECONDS = 3 * 86400
+
+
+def _open_reader(path: Path, immutable: bool = False) -> sqlite3.Connection | None:
+    """A read-only connection that writes nothing to the file or beside it;
+    `immutable` also skips locking, for files nothing will write again. None for
+    a file not yet at the current schema, which only `_open` brings up to it."""
+    uri = path.resolve().as_uri() + (
+        "?mode=ro&immutable=1" if immutable else "?mode=ro"
+    )
+    connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    (version,) = connection.execute("PRAGMA user_version").fetchone()
+    if version != SCHEMA_VERSION:
+        connection.close()
+        if version > SCHEMA_VERSION:
+            raise SchemaVersionError(
+                f"{path.name} has schema version {version}; this code supports {SCHEMA_VERSION}"
+            )
+        return None
+    connection.executescript(_READER_PRAGMAS)
+    return connection
+
+
+# The database header's file change counter and page count: every commit in
+# rollback-journal mode bumps the first, so together they tell whether a file
+# has changed since it was catalogued without opening it.
+_HEADER = struct.Struct(">24xII")
+
+
+def _header(path: Path) -> tuple[int, int]:
+    with path.open("rb") as file:
+        change_counter, page_count = _HEADER.unpack(file.read(_HEADER.size))
+    return change_counter, page_count
+
+
+def _partition_end(path: Path) -> int | None:
+    """Where a partition's windows end (exclusive); None for other files."""
+    kind, _, period = path.stem.partition("_")
+    if kind == "generation":
+        start = datetime(int(period), 1, 1, tzinfo=timezone.utc)
+        return int(start.replace(year=start.year + 1).timestamp())
+    if kind not in ("national", "regional"):
+        return None
+    month = datetime.strptime(period[:7], "%Y-%m").replace(tzinfo=timezone.utc)
+    if period.endswith("a"):
+        return int(month.replace(day=16).timestamp())
+    following = month.replace(day=28) + timedelta(days=4)
+    return int(following.replace(day=1).timestamp())
+
+
+# An inbox is a database or a pack; a slot is published in one format only.
+_INBOX_SUFFIXES = (".sqlite", ".pack")
+
+
+def _inbox_files(directory: Path) -> list[Path]:
+    """The inboxes in `directory`, either format, oldest slot first."""
+    paths = [
+        path for suffix in _INBOX_SUFFIXES for path in directory.glob(f"snap_*{suffix}")
+    ]
+    return sorted(paths, key=lambda path: path.stem)
+
+
+def _inbox_slot(path: Path) -> int:
+    """The capture slot an inbox file is named for."""
+    named = datetime.strptime(path.stem, "snap_%Y-%m-%dT%H%MZ")
+    return int(named.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _open_inbox(
+    path: Path, tables: Collection[str] | None = None
+) -> sqlite3.Connection:
+    """An inbox to read: a packed one is unpacked into an in-memory database,
+    with only `tables` filled when given."""
+    if path.suffix != ".pack":
+        return sqlite3.connect(path)
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(_DDL + _DELTA_DDL + _PAYLOADS_DDL)
+    with connection:
+        unpack_inbox(path.read_bytes(), connection, tables)
     return connection
 
 
 class Store:
-    """All storage policy: inbox writing, partition routing, compaction, reads."""
+    """All storage policy: inbox writing, partition routing, compaction, reads.
+
+    Partitions and the analysis, reference and catalog databases are opened once
+    and kept in a bounded least-recently-used cache; `close()` (or leaving a
+    `with Store(...)` block) closes them, as does garbage collection. Inboxes
+    come and go, so they are never cached. A Store is used by one thread at a
+    time.
+    """
 
     # 85 MiB: well under GitHub's 100 MB hard limit; a breach means the sizing
     # assumptions in docs/adr-001-sqlite.md no longer hold and needs a human.
-    def __init__(self, db_root: Path, partition_size_limit: int = 85 * 2**20) -> None:
+    def __init__(
+        self,
+        db_root: Path,
+        partition_size_limit: int = 85 * 2**20,
+        max_connections: int = 32,
+    ) -> None:
         self.db_root = Path(db_root)
         self.inbox_dir = self.db_root / "inbox"
         self.partition_size_limit = partition_size_limit
+        self.max_connections = max_connections
+        self._connections: OrderedDict[Path, sqlite3.Connection] = OrderedDict()
+        self._readers: OrderedDict[Path, sqlite3.Connection] = OrderedDict()
+        self._batch: set[Path] | None = None
+        # Files this Store has brought up to the schema; see `_open`.
+        self._prepared: dict[tuple[Path, str], int] = {}
+        weakref.finalize(self, _close_all, self._connections)
+        weakref.finalize(self, _close_all, self._readers)
+
+    def __enter__(self) -> "Store":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close every cached connection; the Store reopens files as needed."""
+        _close_all(self._connections)
+        _close_all(self._readers)
+
+    def _cache(
+        self,
+        cache: OrderedDict[Path, sqlite3.Connection],
+        path: Path,
+        connection: sqlite3.Connection,
+    ) -> sqlite3.Connection:
+        """Keep `connection` in `cache`; beyond `max_connections` the least
+        recently used idle one is closed."""
+        cache[path] = connection
+        while len(cache) > self.max_connections:
+            idle = next((old for old, c in cache.items() if not c.in_transaction), path)
+            if idle == path:
+                break
+            cache.pop(idle).close()
+        return connection
+
+    def _connection(self, path: Path, ddl: str = _DDL) -> sqlite3.Connection:
+        """The cached connection to a partition or side database, opened on first
+        use."""
+        connection = self._connections.get(path)
+        if connection is not None:
+            self._connections.move_to_end(path)
+            return connection
+        reader = self._readers.pop(path, None)
+        if reader is not None:
+            reader.close()  # it may be immutable, and the file is about to change
+        return self._cache(self._connections, path, _open(path, ddl, self._prepared))
+
+    def _reader(self, path: Path) -> sqlite3.Connection:
+        """The cached read-only connection to a partition, immutable once sealed;
+        a partition this Store has written to is read through its writer."""
+        if path in self._connections:
+            return self._connection(path)
+        connection = self._readers.get(path)
+        if connection is not None:
+            self._readers.move_to_end(path)
+            return connection
+        reader = _open_reader(path)
+        if reader is None:
+            return self._connection(path)
+        if self._sealed(path) and not _has_tails(reader):
+            # Sealed and closed: nothing will write to it again.
+            reader.close()
+            reader = _open_reader(path, immutable=True) or self._connection(path)
+        return self._cache(self._readers, path, reader)
+
+    def _sealed(self, path: Path, now_utc: int | None = None) -> bool:
+        end = _partition_end(path)
+        if end is None:
+            return False
+        horizon = now_utc or int(datetime.now(timezone.utc).timestamp())
+        pending = _inbox_files(self.inbox_dir) if self.inbox_dir.exists() else []
+        if pending:
+            horizon = min(horizon, _inbox_slot(pending[0]))
+        return end <= horizon - _SEALED_AFTER_SECONDS
+
+    @contextmanager
+    def _writing(self, path: Path, ddl: str) -> Iterator[sqlite3.Connection]:
+        """A cached connection to write through, committed on leaving the block —
+        or, inside `batch()`, when the batch ends."""
+        connection = self._connection(path, ddl)
+        if self._batch is None:
+            with connection:
+                yield connection
+            return
+        self._batch.add(path)
+        yield connection
+
+    @contextmanager
+    def _reading(
+        self, path: Path, tables: Collection[str] | None = None
+    ) -> Iterator[sqlite3.Connection]:
+        """A partition's cached reader, or an inbox (database or pack, only
+        `tables` of the latter) opened just for the block."""
+        if path.parent != self.inbox_dir:
+            yield self._reader(path)
+            return
+        if path.suffix == ".pack":
+            connection = _open_inbox(path, tables)
+        else:
+            # A published inbox is never written again.
+            connection = _open_reader(path, immutable=True) or _open(path)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group record_* writes: each database they touch commits once, when the
+        block ends, and nothing is committed if it raises."""
+        if self._batch is not None:
+            yield  # already inside a batch, which commits for us
+            return
+        self._batch = set()
+        try:
+            yield
+        except BaseException:
+            for path in self._batch:
+                self._connections[path].rollback()
+            raise
+        else:
+            for path in self._batch:
+                self._connections[path].commit()
+        finally:
+            self._batch = None
 
     # -- ingest side ---------------------------------------------------------
 
-    def inbox_path(self, capture_utc: int) -> Path:
-        """Where the inbox for a capture slot lives; existence means first-wins."""
-        return self.inbox_dir / f"snap_{_slot_name(capture_utc)}.sqlite"
+    def inbox_path(self, capture_utc: int, packed: bool = False) -> Path:
+        """Where the inbox for a capture slot lives; existence means first-wins.
 
-    def write_inbox(self, snapshots: Sequence[Snapshot]) -> Path:
-        """Write one scrape's snapshots (all endpoints) as a single inbox database.
+        A slot already published in either format is that inbox; otherwise the
+        path an inbox written `packed` (or not) would be published at.
+        """
+        stem = f"snap_{_slot_name(capture_utc)}"
+        for suffix in _INBOX_SUFFIXES:
+            path = self.inbox_dir / f"{stem}{suffix}"
+            if path.exists():
+                return path
+        return self.inbox_dir / f"{stem}{'.pack' if packed else '.sqlite'}"
+
+    def write_inbox(
+        self,
+        snapshots: Sequence[Snapshot],
+        metrics: Sequence[IngestMetrics] = (),
+        delta: bool = False,
+        payloads: Sequence[PayloadRecord] = (),
+        packed: bool = False,
+        compress: bool = False,
+    ) -> Path:
+        """Write one scrape's snapshots (all endpoints) as a single inbox database,
+        with the scrape's per-endpoint telemetry and raw payload fingerprints.
 
         Written under a writer-unique temporary name and published with an atomic
         no-clobber link: a crash can never leave a partial inbox, and two racing
         writers for the same slot both succeed with exactly one of them published.
+
+        With `delta`, regional and generation rows equal to the newest earlier
+        capture stored in full's (the base, recorded in `delta_bases`) are left
+        out; compaction expands them back before the change-log sees them, so the
+        partitions are identical either way. A table that would keep more than
+        half its rows is stored in full instead, as the base for the next deltas:
+        a base is always read directly, never through a chain of deltas.
+        Captures and national rows are always complete.
+
+        A payload recorded with a `reference_utc` repeated that capture's byte for
+        byte: its snapshot carries coverage but no rows, and readers of the inbox
+        (compaction, national_rows) copy the referenced capture's rows instead.
+
+        With `packed`, the same tables are written as a pack (cift.pack) instead
+        of a database, compressed with `compress`; every reader takes either.
         """
-        path = self.inbox_path(snapshots[0].capture_utc)
+        capture_utc = snapshots[0].capture_utc
+        bases: dict[str, int] = {}
+        if delta:
+            snapshots, bases = self._delta_snapshots(capture_utc, snapshots)
+        path = self.inbox_path(capture_utc, packed)
         scratch = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
-        connection = _open(scratch)
+        # Without a base (nothing earlier stored) a delta inbox is simply full.
+        ddl = _DDL + (_DELTA_DDL if bases else "") + (_PAYLOADS_DDL if payloads else "")
+        if packed:
+            self.inbox_dir.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(":memory:")
+            connection.executescript(ddl)
+        else:
+            connection = _open(scratch, ddl=ddl)
         try:
             with connection:
                 self._insert_snapshot_rows(connection, snapshots)
+                if bases:
+                    connection.executemany(
+                        "INSERT INTO delta_bases VALUES (?, ?)", bases.items()
+                    )
+                if payloads:
+                    connection.executemany(
+                        "INSERT INTO payload_fingerprints VALUES (?, ?, ?, ?)",
+                        [astuple(payload) for payload in payloads],
+                    )
+                connection.executemany(
+                    _INSERT_STRICT["ingest_metrics"],
+                    [astuple(metric) for metric in metrics],
+                )
+            if packed:
+                scratch.write_bytes(pack_inbox(connection, compress))
         except sqlite3.IntegrityError as error:
             connection.close()
             scratch.unlink(missing_ok=True)
             raise ConflictingObservationsError(
                 "two endpoints supplied the same (window, capture) observation in"
-                f" slot {_slot_name(snapshots[0].capture_utc)}: {error}"
+                f" slot {_slot_name(capture_utc)}: {error}"
             ) from error
         connection.close()
         try:
-            os.link(scratch, path)
+            # The link is the atomic no-clobber step; the check only spots a
+            # slot already published in the other format.
+            if self.inbox_path(capture_utc, packed) == path:
+                os.link(scratch, path)
         except FileExistsError:
             pass  # another writer published this slot first; first wins
         scratch.unlink()
-        return path
+        return self.inbox_path(capture_utc, packed)
+
+    def recent_payloads(
+        self, capture_utc: int
+    ) -> dict[str, tuple[PayloadRecord, int, int]]:
+        """Per endpoint, the fingerprint an unmerged inbox recorded for `capture_utc`
+        and that capture's window coverage; empty once the inbox is compacted."""
+        path = self.inbox_path(capture_utc)
+        if not path.exists():
+            return {}
+        connection = _open_inbox(path, ("payload_fingerprints", "captures"))
+        try:
+            if not _has_table(connection, "payload_fingerprints"):
+                return {}
+            return {
+                row[1]: (PayloadRecord(*row[:4]), row[4], row[5])
+                for row in connection.execute(
+                    "SELECT p.capture_utc, p.endpoint, p.fingerprint, p.reference_utc,"
+                    " c.window_first_utc, c.window_last_utc"
+                    " FROM payload_fingerprints p JOIN captures c"
+                    " USING (capture_utc, endpoint)"
+                )
+            }
+        finally:
+            connection.close()
 
     def _insert_snapshot_rows(
         self, connection: sqlite3.Connection, snapshots: Iterable[Snapshot]
@@ -312,64 +925,325 @@ class Store:
                 ),
             )
 
+    # -- delta inboxes ---------------------------------------------------------
+
+    def _delta_snapshots(
+        self, capture_utc: int, snapshots: Sequence[Snapshot]
+    ) -> tuple[list[Snapshot], dict[str, int]]:
+        """Drop change-logged rows that repeat the base capture's value, for each
+        table where that leaves out at least half of them."""
+        sparse = list(snapshots)
+        bases: dict[str, int] = {}
+        for table, kind in _DELTA_KINDS.items():
+            windows = [row[0] for s in sparse for row in getattr(s, kind)]
+            if not windows:
+                continue
+            lo, hi = min(windows), max(windows)
+            base = self._latest_capture_before(table, capture_utc, lo, hi)
+            if base is None:
+                continue
+            previous = self._capture_values(table, base, lo, hi)
+            key_width, capture_index = _CHANGE_LOGGED[table]
+            values_start = capture_index + 1
+            changed = [
+                [
+                    row
+                    for row in getattr(snapshot, kind)
+                    if previous.get(tuple(row[:key_width])) != tuple(row[values_start:])
+                ]
+                for snapshot in sparse
+            ]
+            if 2 * sum(map(len, changed)) > len(windows):
+                continue  # stored in full: the next deltas' base
+            for index, snapshot in enumerate(sparse):
+                if kind == "regional":
+                    sparse[index] = replace(snapshot, regional=changed[index])
+                else:
+                    sparse[index] = replace(snapshot, generation=changed[index])
+            bases[table] = base
+        return sparse, bases
+
+    def _latest_capture_before(
+        self, table: str, capture_utc: int, lo: int, hi: int
+    ) -> int | None:
+        """The newest capture before `capture_utc` holding `table` in full: in a
+        partition, or an inbox that neither deltas it nor copies it by reference."""
+        kind = _TABLE_KINDS[table]
+        slots = []
+        for path in self._inbox_paths():
+            connection = _open_inbox(
+                path, ("captures", "delta_bases", "payload_fingerprints")
+            )
+            try:
+                if _stores_in_full(connection, table):
+                    slots += [
+                        slot
+                        for slot, endpoint in connection.execute(
+                            "SELECT capture_utc, endpoint FROM captures"
+                            " WHERE capture_utc < ?",
+                            (capture_utc,),
+                        )
+                        if _kind(endpoint) == kind
+                    ]
+            finally:
+                connection.close()
+        for path in self.partitions_overlapping(kind, lo, hi):
+            if path.exists():
+                (slot,) = (
+                    self._reader(path)
+                    .execute(
+                        "SELECT MAX(capture_utc) FROM captures WHERE capture_utc < ?",
+                        (capture_utc,),
+                    )
+                    .fetchone()
+                )
+                slots += [] if slot is None else [slot]
+        return max(slots, default=None)
+
+    def _inbox_paths(self) -> list[Path]:
+        """Unmerged and quarantined inboxes; a quarantined one may still be a base."""
+        if not self.inbox_dir.exists():
+            return []
+        return _inbox_files(self.inbox_dir) + _inbox_files(
+            self.inbox_dir / "quarantine"
+        )
+
+    def _capture_values(
+        self, table: str, capture_utc: int, lo: int, hi: int
+    ) -> dict[tuple[Any, ...], tuple[Any, ...]]:
+        """What one capture observed in a fact table for windows lo..hi, as
+        {key: values}: from its inbox (expanded), else the partitions."""
+        key_width = _KEY_WIDTH[table]
+        values_start = key_width + 1
+        stem = f"snap_{_slot_name(capture_utc)}"
+        for path in self._inbox_paths():
+            if path.stem == stem:
+                source = _open_inbox(path)
+                try:
+                    rows = self._expanded_rows(source, table, lo, hi)
+                finally:
+                    source.close()
+                return {row[:key_width]: row[values_start:] for row in rows}
+
+        kind = _TABLE_KINDS[table]
+        keys = ", ".join(("window_utc", "region_id")[:key_width])
+        covered = False
+        values: dict[tuple[Any, ...], tuple[Any, ...]] = {}
+        for path in self.partitions_overlapping(kind, lo, hi):
+            if not path.exists():
+                continue
+            connection = self._reader(path)
+            coverage = [
+                (first, last)
+                for endpoint, first, last in connection.execute(
+                    "SELECT endpoint, window_first_utc, window_last_utc FROM captures"
+                    " WHERE capture_utc = ?",
+                    (capture_utc,),
+                )
+                if _kind(endpoint) == kind
+            ]
+            gaps = set(
+                connection.execute(
+                    "SELECT window_utc, region_id FROM capture_gaps"
+                    " WHERE capture_utc = ?",
+                    (capture_utc,),
+                )
+            )
+            # The latest row at or before a covering capture is what it saw (in a
+            # full-fidelity table that is simply its own row).
+            for row in connection.execute(
+                f"SELECT *, MAX(capture_utc) FROM {table}"
+                f" WHERE window_utc BETWEEN ? AND ? AND capture_utc <= ? GROUP BY {keys}",
+                (lo, hi, capture_utc),
+            ):
+                if _covered(row[:key_width], coverage, gaps):
+                    values[row[:key_width]] = row[values_start:-1]
+            covered = covered or bool(coverage)
+        if not covered:
+            raise BaseCaptureMissingError(
+                f"base capture {_slot_name(capture_utc)} is in no inbox or partition"
+            )
+        return values
+
+    def _expanded_rows(
+        self,
+        source: sqlite3.Connection,
+        table: str,
+        lo: int | None = None,
+        hi: int | None = None,
+    ) -> list[tuple[Any, ...]]:
+        """An inbox table's full rows (windows lo..hi, default all), as a plain
+        full inbox would hold them: rows of an endpoint recorded as a reference are
+        copied from its source capture, and a delta's omitted rows are refilled
+        from its base wherever the inbox itself recorded coverage."""
+        kind = _TABLE_KINDS[table]
+        key_width = _KEY_WIDTH[table]
+        (slot,) = source.execute("SELECT MIN(capture_utc) FROM captures").fetchone()
+        coverage = {
+            endpoint: (first, last)
+            for endpoint, first, last in source.execute(
+                "SELECT endpoint, window_first_utc, window_last_utc FROM captures"
+            )
+            if _kind(endpoint) == kind
+        }
+        if lo is None or hi is None:
+            lo = min((first for first, _last in coverage.values()), default=0)
+            hi = max((last for _first, last in coverage.values()), default=-1)
+        rows: list[tuple[Any, ...]] = source.execute(
+            f"SELECT * FROM {table} WHERE window_utc BETWEEN ? AND ?", (lo, hi)
+        ).fetchall()
+        if not coverage:
+            return rows
+        gaps = set(source.execute("SELECT window_utc, region_id FROM capture_gaps"))
+        present = {row[:key_width] for row in rows}
+
+        def refill(base: int, ranges: list[tuple[int, int]]) -> None:
+            first = max(lo, min(first for first, _last in ranges))
+            last = min(hi, max(last for _first, last in ranges))
+            if first > last:
+                return
+            for key, values in self._capture_values(table, base, first, last).items():
+                if key not in present and _covered(key, ranges, gaps):
+                    rows.append((*key, slot, *values))
+                    present.add(key)
+
+        if _has_table(source, "payload_fingerprints"):
+            for endpoint, reference in source.execute(
+                "SELECT endpoint, reference_utc FROM payload_fingerprints"
+                " WHERE reference_utc IS NOT NULL"
+            ).fetchall():
+                if endpoint in coverage:
+                    refill(reference, [coverage[endpoint]])
+        if _has_table(source, "delta_bases"):
+            base = source.execute(
+                "SELECT base_capture_utc FROM delta_bases WHERE table_name = ?",
+                (table,),
+            ).fetchone()
+            if base is not None:
+                refill(base[0], list(coverage.values()))
+        return rows
+
     # -- compaction ----------------------------------------------------------
 
-    def compact(self, now: datetime, max_inboxes: int | None = None) -> CompactReport:
+    def compact(
+        self,
+        now: datetime,
+        max_inboxes: int | None = None,
+        max_workers: int = 1,
+        close_sealed: bool = True,
+    ) -> CompactReport:
         """Fold complete days of inbox files into the window partitions, then delete them.
 
-        Processes oldest slots first and stops cleanly after `max_inboxes`, so a
-        backlog is recoverable in bounded, resumable batches.
+        Processes oldest slots first, a capture day at a time: each day's inboxes
+        are read and staged together and every partition they touch is written
+        in one transaction, all of them committed only once each is within the
+        size limit. Stops cleanly after `max_inboxes`, so a backlog is
+        recoverable in bounded, resumable batches. With `max_workers` above 1
+        the partitions of a day are written concurrently, one thread each.
+        `close_sealed=False` leaves sealed partitions open, for a caller that
+        compacts again straight away and closes them on its last pass.
         """
         day_start = int(
             now.astimezone(timezone.utc)
             .replace(hour=0, minute=0, second=0, microsecond=0)
             .timestamp()
         )
+        inboxes = _inbox_files(self.inbox_dir) if self.inbox_dir.exists() else []
+        # The newest capture merged into each partition, kept current as inboxes
+        # are staged: the out-of-order check is then a lookup, not a query per file.
+        newest = self._watermarks({_inbox_slot(path) for path in inboxes})
         merged = 0
         quarantined: list[str] = []
-        for inbox_path in sorted(self.inbox_dir.glob("snap_*.sqlite")):
-            if max_inboxes is not None and merged >= max_inboxes:
+        batch: list[Path] = []
+        staged: dict[Path, dict[str, list[tuple[Any, ...]]]] = {}
+        for inbox_path in inboxes:
+            if max_inboxes is not None and merged + len(batch) >= max_inboxes:
                 break
-            source = sqlite3.connect(inbox_path)
-            (slot,) = source.execute("SELECT MIN(capture_utc) FROM captures").fetchone()
+            slot = _inbox_slot(inbox_path)
             if slot >= day_start:
+                break
+            if batch and slot // 86400 != _inbox_slot(batch[0]) // 86400:
+                merged += self._commit_batch(batch, staged, max_workers)
+                batch, staged = [], {}
+            source = _open_inbox(inbox_path)
+            try:
+                late = self._arrived_after_later_captures(source, slot, newest)
+                rows = {} if late else self._stage_inbox(source)
+            except BaseCaptureMissingError:
+                late = True
+            finally:
                 source.close()
-                continue
-            if self._arrived_after_later_captures(source, slot):
-                source.close()
+            if late:
                 self._quarantine(inbox_path)
                 quarantined.append(inbox_path.name)
                 continue
-            try:
-                self._merge_inbox(source)
-            finally:
-                source.close()
-            inbox_path.unlink()
-            merged += 1
-        remaining = len(list(self.inbox_dir.glob("snap_*.sqlite")))
+            for path, tables in rows.items():
+                into = staged.setdefault(path, {})
+                for table, table_rows in tables.items():
+                    into.setdefault(table, []).extend(table_rows)
+                if "captures" in tables:
+                    newest[path] = max(newest.get(path, slot), slot)
+            batch.append(inbox_path)
+        if batch:
+            merged += self._commit_batch(batch, staged, max_workers)
+        if close_sealed:
+            self._close_sealed(int(now.timestamp()))
+        remaining = len(_inbox_files(self.inbox_dir))
         return CompactReport(
             merged_inboxes=merged,
             remaining_inboxes=remaining,
             quarantined=tuple(quarantined),
         )
 
+    def _close_sealed(self, now_utc: int) -> None:
+        """Close partitions no merge can reach any more: drop their tails and
+        VACUUM them, the one time a partition file is rewritten whole. Only those
+        the catalog lists with tails are considered, and it is left up to date."""
+        closed = False
+        for info in self.refresh_catalog():
+            if not info.has_tails or not self._sealed(info.path, now_utc):
+                continue
+            connection = self._connection(info.path)
+            with connection:
+                for tail in _TAILS.values():
+                    connection.execute(f"DROP TABLE IF EXISTS {tail}")
+            connection.execute("VACUUM")
+            closed = True
+        if closed:
+            self.refresh_catalog()
+
+    def _watermarks(self, pending: set[int]) -> dict[Path, int]:
+        """The newest merged capture in each partition, from the catalog.
+
+        A partition whose newest capture is still a pending inbox's was part of
+        a batch interrupted before its inboxes were deleted; those captures do
+        not count, so the batch merges again (identically) instead of being
+        quarantined.
+        """
+        newest = {}
+        for info in self.refresh_catalog():
+            last = info.capture_last_utc
+            if last in pending:
+                captures = self._reader(info.path).execute(
+                    "SELECT DISTINCT capture_utc FROM captures ORDER BY capture_utc DESC"
+                )
+                last = next((c for (c,) in captures if c not in pending), None)
+            if last is not None:
+                newest[info.path] = last
+        return newest
+
     def _arrived_after_later_captures(
-        self, source: sqlite3.Connection, slot: int
+        self, source: sqlite3.Connection, slot: int, newest: dict[Path, int]
     ) -> bool:
-        """An inbox older than already-merged captures would corrupt the change-log."""
+        """An inbox older than already-merged captures would corrupt the change-log.
+
+        `newest` is the newest capture merged or staged into each partition so far.
+        """
         for endpoint, first, last in source.execute(
             "SELECT endpoint, window_first_utc, window_last_utc FROM captures"
         ).fetchall():
-            kind = "generation" if "generation" in endpoint else endpoint.split("_")[0]
-            for path in self.partitions_overlapping(kind, first, last):
-                if not path.exists():
-                    continue
-                target = _open(path)
-                (newest,) = target.execute(
-                    "SELECT MAX(capture_utc) FROM captures"
-                ).fetchone()
-                target.close()
-                if newest is not None and slot < newest:
+            for path in self.partitions_overlapping(_kind(endpoint), first, last):
+                if slot < newest.get(path, slot):
                     return True
         return False
 
@@ -378,51 +1252,110 @@ class Store:
         quarantine_dir.mkdir(parents=True, exist_ok=True)
         inbox_path.rename(quarantine_dir / inbox_path.name)
 
-    def _merge_inbox(self, source: sqlite3.Connection) -> list[Path]:
+    def _stage_inbox(
+        self, source: sqlite3.Connection
+    ) -> dict[Path, dict[str, list[tuple[Any, ...]]]]:
+        """One inbox's rows, expanded, by destination partition and table."""
         by_partition: dict[Path, dict[str, list[tuple[Any, ...]]]] = {}
-
-        def stage(path: Path, table: str, row: tuple[Any, ...]) -> None:
-            by_partition.setdefault(path, {}).setdefault(table, []).append(row)
-
-        for table, kind in (
-            ("national_intensity", "national"),
-            ("regional_intensity", "regional"),
-            ("generation_mix", "generation"),
-        ):
-            for row in source.execute(f"SELECT * FROM {table} ORDER BY capture_utc"):
-                stage(self._partition_path(kind, window_utc=row[0]), table, row)
+        # Partitions split on UTC midnights, so a window's day routes it.
+        routes: dict[tuple[str, int], dict[str, list[tuple[Any, ...]]]] = {}
+
+        def stage(kind: str, window_utc: int, table: str) -> list[tuple[Any, ...]]:
+            tables = routes.get((kind, window_utc // 86400))
+            if tables is None:
+                path = self._partition_path(kind, window_utc)
+                tables = routes[(kind, window_utc // 86400)] = by_partition.setdefault(
+                    path, {}
+                )
+            return tables.setdefault(table, [])
+
+        for table, kind in _TABLE_KINDS.items():
+            for row in self._expanded_rows(source, table):
+                stage(kind, row[0], table).append(row)
 
         for capture in source.execute("SELECT * FROM captures").fetchall():
-            endpoint = capture[1]
-            kind = "generation" if "generation" in endpoint else endpoint.split("_")[0]
+            kind = _kind(capture[1])
             for path in self.partitions_overlapping(kind, capture[2], capture[3]):
-                stage(path, "captures", capture)
+                by_partition.setdefault(path, {}).setdefault("captures", []).append(
+                    capture
+                )
 
         for gap in source.execute("SELECT * FROM capture_gaps").fetchall():
-            endpoint = gap[1]
-            kind = "generation" if "generation" in endpoint else endpoint.split("_")[0]
-            stage(self._partition_path(kind, window_utc=gap[2]), "capture_gaps", gap)
-
-        for path, tables in by_partition.items():
-            target = _open(path)
-            try:
-                with target:
-                    for table, rows in tables.items():
-                        if table in _CHANGE_LOGGED:
-                            rows = _changed_rows_only(target, table, rows)
-                        target.executemany(_INSERT[table], rows)
-                    # Projected size is checked inside the transaction so an
-                    # oversized partition rolls back instead of being committed.
-                    (pages,) = target.execute("PRAGMA page_count").fetchone()
-                    projected = pages * 4096
-                    if projected > self.partition_size_limit:
-                        raise PartitionSizeError(
-                            f"{path.name} would be {projected} bytes, over the"
-                            f" {self.partition_size_limit} byte limit"
+            stage(_kind(gap[1]), gap[2], "capture_gaps").append(gap)
+
+        # Telemetry is keyed by capture, not window: it lands in the partition of
+        # its endpoint's kind that covers the capture slot itself.
+        metrics = []
+        # Inboxes written before telemetry existed have no table.
+        if _has_table(source, "ingest_metrics"):
+            metrics = source.execute("SELECT * FROM ingest_metrics").fetchall()
+        for metric in metrics:
+            stage(_kind(metric[1]), metric[0], "ingest_metrics").append(metric)
+        return by_partition
+
+    def _commit_batch(
+        self,
+        batch: list[Path],
+        staged: dict[Path, dict[str, list[tuple[Any, ...]]]],
+        max_workers: int = 1,
+    ) -> int:
+        """Write staged rows, one transaction per partition (on up to
+        `max_workers` threads), and delete the inboxes they came from once every
+        partition has committed."""
+        targets = {}
+        try:
+            for path in staged:
+                # Begun now, so the connection cache cannot close it as idle.
+                targets[path] = self._connection(path)
+                targets[path].execute("BEGIN IMMEDIATE")
+            if max_workers > 1 and len(staged) > 1:
+                with ThreadPoolExecutor(
+                    max_workers=min(max_workers, len(staged)),
+                    thread_name_prefix="cift-compact",
+                ) as executor:
+                    futures = [
+                        executor.submit(
+                            self._write_partition, path, targets[path], tables
                         )
-            finally:
-                target.close()
-        return list(by_partition)
+                        for path, tables in staged.items()
+                    ]
+                for future in futures:
+                    future.result()
+            else:
+                for path, tables in staged.items():
+                    self._write_partition(path, targets[path], tables)
+        except BaseException:
+            # Every writer has finished: the executor waits for them on exit.
+            for target in targets.values():
+                target.rollback()
+            raise
+        for target in targets.values():
+            target.commit()
+        for inbox_path in batch:
+            inbox_path.unlink()
+        return len(batch)
+
+    def _write_partition(
+        self,
+        path: Path,
+        target: sqlite3.Connection,
+        tables: dict[str, list[tuple[Any, ...]]],
+    ) -> None:
+        """Insert one partition's staged rows into its open transaction."""
+        for table, rows in tables.items():
+            if table in _CHANGE_LOGGED:
+                rows = _changed_rows_only(target, table, rows)
+                _record_tail(target, table, rows)
+            target.executemany(_INSERT[table], rows)
+        # Projected size is checked inside the transaction so an oversized
+        # partition rolls back instead of being committed.
+        (pages,) = target.execute("PRAGMA page_count").fetchone()
+        projected = pages * 4096
+        if projected > self.partition_size_limit:
+            raise PartitionSizeError(
+                f"{path.name} would be {projected} bytes, over the"
+                f" {self.partition_size_limit} byte limit"
+            )
 
     # -- partition routing ---------------------------------------------------
 
@@ -451,54 +1384,179 @@ class Store:
             paths.append(last_path)
         return paths
 
+    # -- catalog ---------------------------------------------------------------
+
+    @property
+    def catalog_path(self) -> Path:
+        return self.db_root / "catalog.sqlite"
+
+    def _partition_files(self) -> list[Path]:
+        return sorted(self.db_root.glob("[0-9][0-9][0-9][0-9]/*.sqlite"))
+
+    def _catalogued(self) -> dict[Path, PartitionInfo]:
+        if not self.catalog_path.exists():
+            return {}
+        rows = self._reader(self.catalog_path).execute("SELECT * FROM partitions")
+        return {
+            self.db_root / name: PartitionInfo(self.db_root / name, *rest)
+            for name, *rest in rows
+        }
+
+    def _describe(self, path: Path) -> PartitionInfo:
+        """Open a partition and summarise it for the catalog."""
+        kind = path.stem.partition("_")[0]
+        (table,) = [name for name, of in _TABLE_KINDS.items() if of == kind]
+        connection = self._reader(path)
+        window_first, window_last, row_count = connection.execute(
+            f"SELECT MIN(window_utc), MAX(window_utc), COUNT(*) FROM {table}"
+        ).fetchone()
+        capture_first, capture_last = connection.execute(
+            "SELECT MIN(capture_utc), MAX(capture_utc) FROM captures"
+        ).fetchone()
+        change_counter, page_count = _header(path)
+        return PartitionInfo(
+            path,
+            kind,
+            window_first,
+            window_last,
+            row_count,
+            capture_first,
+            capture_last,
+            page_count,
+            change_counter,
+            hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest(),
+            _has_tails(connection),
+        )
+
+    def _still_current(
+        self, catalogued: dict[Path, PartitionInfo], path: Path
+    ) -> PartitionInfo | None:
+        """The catalogued entry for `path`, unless the file has changed since."""
+        info = catalogued.get(path)
+        if info is None or (info.change_counter, info.page_count) != _header(path):
+            return None
+        return info
+
+    def partitions(self, kind: str | None = None) -> list[PartitionInfo]:
+        """Every partition (of `kind`) on disk, from the catalog without opening
+        them; one missing from it or changed since is described afresh."""
+        catalogued = self._catalogued()
+        return [
+            self._still_current(catalogued, path) or self._describe(path)
+            for path in self._partition_files()
+            if kind is None or path.stem.startswith(f"{kind}_")
+        ]
+
+    def refresh_catalog(self) -> list[PartitionInfo]:
+        """Bring catalog.sqlite up to date: describe every partition that is new
+        or has changed since it was recorded, and forget those that are gone.
+        Returns every partition's entry."""
+        catalogued = self._catalogued()
+        files = self._partition_files()
+        current = {path: self._still_current(catalogued, path) for path in files}
+        stale = [path for path, info in current.items() if info is None]
+        gone = set(catalogued) - set(files)
+        described = [self._describe(path) for path in stale]
+        entries = [info for info in current.values() if info is not None] + described
+        if not stale and not gone:
+            return sorted(entries, key=lambda info: info.path)
+        with self._writing(self.catalog_path, _CATALOG_DDL) as connection:
+            connection.executemany(
+                "DELETE FROM partitions WHERE name = ?",
+                [(path.relative_to(self.db_root).as_posix(),) for path in gone],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO partitions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (info.path.relative_to(self.db_root).as_posix(), *astuple(info)[1:])
+                    for info in described
+                ],
+            )
+        return sorted(entries, key=lambda info: info.path)
+
     # -- reads ----------------------------------------------------------------
 
     def capture_records(
-        self, include_inbox: bool = True
+        self, include_inbox: bool = True, since_utc: int | None = None
     ) -> list[tuple[int, str, int, int]]:
-        """(slot, endpoint, first_window, last_window) for every recorded capture."""
-        paths = sorted(self.db_root.glob("[0-9][0-9][0-9][0-9]/*.sqlite"))
+        """(slot, endpoint, first_window, last_window) for every recorded capture;
+        with `since_utc`, those from then on (partitions whose captures all
+        predate it, per the catalog, and older inboxes are not opened)."""
+        paths = [
+            info.path
+            for info in self.partitions()
+            if since_utc is None
+            or (
+                info.capture_last_utc is not None and info.capture_last_utc >= since_utc
+            )
+        ]
         if include_inbox and self.inbox_dir.exists():
-            paths += sorted(self.inbox_dir.glob("snap_*.sqlite"))
+            # An inbox holds the one capture it is named for.
+            paths += [
+                path
+                for path in _inbox_files(self.inbox_dir)
+                if since_utc is None or _inbox_slot(path) >= since_utc
+            ]
         seen: dict[tuple[int, str], tuple[int, str, int, int]] = {}
         for path in paths:
-            connection = _open(path)
-            for row in connection.execute(
-                "SELECT capture_utc, endpoint, window_first_utc, window_last_utc"
-                " FROM captures"
-            ):
-                seen.setdefault((row[0], row[1]), row)
-            connection.close()
+            with self._reading(path, ("captures",)) as connection:
+                for row in connection.execute(
+                    "SELECT capture_utc, endpoint, window_first_utc, window_last_utc"
+                    " FROM captures WHERE capture_utc >= ?",
+                    (since_utc or 0,),
+                ):
+                    seen.setdefault((row[0], row[1]), row)
         return sorted(seen.values())
 
+    def ingest_metrics(
+        self, include_inbox: bool = True, since_utc: int | None = None
+    ) -> list[IngestMetrics]:
+        """Every recorded endpoint scrape's telemetry, oldest capture first; with
+        `since_utc`, at least that from then on."""
+        # Telemetry lands in the partition covering its capture slot.
+        paths = [
+            path
+            for path in self._partition_files()
+            if since_utc is None or (_partition_end(path) or 0) > since_utc
+        ]
+        if include_inbox and self.inbox_dir.exists():
+            paths += _inbox_files(self.inbox_dir)
+        seen: dict[tuple[int, str], IngestMetrics] = {}
+        for path in paths:
+            with self._reading(path, ("ingest_metrics",)) as connection:
+                for row in connection.execute("SELECT * FROM ingest_metrics"):
+                    seen.setdefault((row[0], row[1]), IngestMetrics(*row))
+        return [seen[key] for key in sorted(seen)]
+
     # -- derived statistics ----------------------------------------------------
 
     def record_stats(self, stat_date: str, values: dict[str, float]) -> None:
         """Upsert one day's error statistics into analysis.sqlite."""
-        connection = _open(self.db_root / "analysis.sqlite", ddl=_ANALYSIS_DDL)
-        with connection:
+        with self._writing(
+            self.db_root / "analysis.sqlite", _ANALYSIS_DDL
+        ) as connection:
             connection.execute(
                 "INSERT OR REPLACE INTO stats_history VALUES"
                 " (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
                 (stat_date, *[values[column] for column in STATS_COLUMNS]),
             )
-        connection.close()
 
     def record_probabilities(
         self, run_date: str, rows: Sequence[tuple[int, float, float, float]]
     ) -> None:
         """Store the error-magnitude probability table for this run."""
-        connection = _open(self.db_root / "analysis.sqlite", ddl=_ANALYSIS_DDL)
-        with connection:
+        with self._writing(
+            self.db_root / "analysis.sqlite", _ANALYSIS_DDL
+        ) as connection:
             connection.executemany(
                 "INSERT OR REPLACE INTO error_probabilities VALUES (?, ?, ?, ?, ?)",
                 [(run_date, *row) for row in rows],
             )
-        connection.close()
 
     def record_error_summary(self, run_date: str, values: dict[str, float]) -> None:
-        connection = _open(self.db_root / "analysis.sqlite", ddl=_ANALYSIS_DDL)
-        with connection:
+        with self._writing(
+            self.db_root / "analysis.sqlite", _ANALYSIS_DDL
+        ) as connection:
             connection.execute(
                 "INSERT OR REPLACE INTO all_data_error_summary VALUES (?, ?, ?, ?, ?, ?)",
                 (
@@ -510,38 +1568,37 @@ class Store:
                     values["sem"],
                 ),
             )
-        connection.close()
 
     def record_reference_bands(
         self, rows: Sequence[tuple[int, int, str, int, int | None]]
     ) -> None:
         """Seed CI index bands: (year, position, band, lo, hi) with hi NULL open-ended."""
-        connection = _open(self.db_root / "reference.sqlite", ddl=_REFERENCE_DDL)
-        with connection:
+        with self._writing(
+            self.db_root / "reference.sqlite", _REFERENCE_DDL
+        ) as connection:
             connection.executemany(
                 "INSERT OR REPLACE INTO ci_index_bands VALUES (?, ?, ?, ?, ?)", rows
             )
-        connection.close()
 
     def record_band_error_scales(
         self, rows: Sequence[tuple[int, str, float, float]]
     ) -> None:
-        connection = _open(self.db_root / "reference.sqlite", ddl=_REFERENCE_DDL)
-        with connection:
+        with self._writing(
+            self.db_root / "reference.sqlite", _REFERENCE_DDL
+        ) as connection:
             connection.executemany(
                 "INSERT OR REPLACE INTO ci_band_error_scales VALUES (?, ?, ?, ?)", rows
             )
-        connection.close()
 
     def record_ngeso_history(
         self, rows: Sequence[tuple[int, int | None, int | None, str]]
     ) -> None:
-        connection = _open(self.db_root / "reference.sqlite", ddl=_REFERENCE_DDL)
-        with connection:
+        with self._writing(
+            self.db_root / "reference.sqlite", _REFERENCE_DDL
+        ) as connection:
             connection.executemany(
                 "INSERT OR REPLACE INTO ngeso_history VALUES (?, ?, ?, ?)", rows
             )
-        connection.close()
 
     def reference_bands(self, year: int) -> tuple[list[str], list[int]]:
         """Band labels and lower bounds for a year, for the chart colourmap."""
@@ -550,44 +1607,156 @@ class Store:
             raise ReferenceDataMissingError(
                 "reference.sqlite does not exist; run the migration importer first"
             )
-        connection = _open(path, ddl=_REFERENCE_DDL)
+        connection = self._connection(path, _REFERENCE_DDL)
         rows = connection.execute(
             "SELECT band, lo FROM ci_index_bands WHERE year = ? ORDER BY position",
             (year,),
         ).fetchall()
-        connection.close()
         if not rows:
             raise ReferenceDataMissingError(f"no CI index bands stored for {year}")
         return [band for band, _lo in rows], [lo for _band, lo in rows]
 
     def stats_history(self) -> list[dict[str, Any]]:
-        connection = _open(self.db_root / "analysis.sqlite", ddl=_ANALYSIS_DDL)
-        rows = connection.execute(
-            "SELECT * FROM stats_history ORDER BY stat_date"
-        ).fetchall()
-        connection.close()
+        path = self.db_root / "analysis.sqlite"
+        if not path.exists():
+            return []
+        rows = (
+            self._reader(path)
+            .execute("SELECT * FROM stats_history ORDER BY stat_date")
+            .fetchall()
+        )
         return [
             dict(zip(("stat_date", *STATS_COLUMNS), row, strict=True)) for row in rows
         ]
 
     def national_rows(
-        self, include_inbox: bool = True
+        self,
+        include_inbox: bool = True,
+        window_from: int | None = None,
+        window_to: int | None = None,
+        capture_from: int | None = None,
+        capture_to: int | None = None,
     ) -> list[tuple[int, int, int | None, int | None]]:
         """Every stored (window, capture, forecast, actual) row, partitions plus
-        unmerged inboxes — the read set for analysis, never mutating either."""
-        paths = sorted(self.db_root.glob("*/national_*.sqlite"))
-        if include_inbox and self.inbox_dir.exists():
-            paths += sorted(self.inbox_dir.glob("snap_*.sqlite"))
-        rows: list[tuple[int, int, int | None, int | None]] = []
-        for path in paths:
-            connection = _open(path)
-            rows.extend(
-                connection.execute(
-                    "SELECT window_utc, capture_utc, forecast, actual"
-                    " FROM national_intensity"
-                ).fetchall()
-            )
-            connection.close()
+        unmerged inboxes — the read set for analysis, never mutating either.
+        The bounds (epoch seconds, inclusive, each optional) limit the windows
+        and captures read; see `_fact_rows`."""
+        return self._fact_rows(
+            "national_intensity",
+            include_inbox,
+            window_from,
+            window_to,
+            capture_from,
+            capture_to,
+        )
+
+    def regional_rows(
+        self,
+        include_inbox: bool = True,
+        window_from: int | None = None,
+        window_to: int | None = None,
+        capture_from: int | None = None,
+        capture_to: int | None = None,
+    ) -> list[tuple[Any, ...]]:
+        """Stored (window, region, capture, forecast, *mix) rows as `national_rows`
+        reads them: a partition's change-log holds only the rows that changed,
+        an unmerged inbox every row its capture observed."""
+        return self._fact_rows(
+            "regional_intensity",
+            include_inbox,
+            window_from,
+            window_to,
+            capture_from,
+            capture_to,
+        )
+
+    def generation_rows(
+        self,
+        include_inbox: bool = True,
+        window_from: int | None = None,
+        window_to: int | None = None,
+        capture_from: int | None = None,
+        capture_to: int | None = None,
+    ) -> list[tuple[Any, ...]]:
+        """Stored (window, capture, *mix) rows, change-logged like `regional_rows`."""
+        return self._fact_rows(
+            "generation_mix",
+            include_inbox,
+            window_from,
+            window_to,
+            capture_from,
+            capture_to,
+        )
+
+    def _fact_rows(
+        self,
+        table: str,
+        include_inbox: bool,
+        window_from: int | None,
+        window_to: int | None,
+        capture_from: int | None,
+        capture_to: int | None,
+    ) -> list[tuple[Any, ...]]:
+        """A fact table's rows within the bounds. Only partitions whose catalogued
+        window and capture ranges meet them are opened, and only inboxes whose
+        slot (their one capture) and recorded coverage do; the bounds are then
+        applied in SQL."""
+        kind = _TABLE_KINDS[table]
+        clauses, parameters = [], []
+        for column, lo, hi in (
+            ("window_utc", window_from, window_to),
+            ("capture_utc", capture_from, capture_to),
+        ):
+            if lo is not None:
+                clauses.append(f"{column} >= ?")
+                parameters.append(lo)
+            if hi is not None:
+                clauses.append(f"{column} <= ?")
+                parameters.append(hi)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        rows: list[tuple[Any, ...]] = []
+        for info in self.partitions(kind):
+            if _overlaps(
+                info.window_first_utc, info.window_last_utc, window_from, window_to
+            ) and _overlaps(
+                info.capture_first_utc, info.capture_last_utc, capture_from, capture_to
+            ):
+                rows.extend(
+                    self._reader(info.path).execute(
+                        f"SELECT * FROM {table}{where}", parameters
+                    )
+                )
+        if not include_inbox or not self.inbox_dir.exists():
+            return rows
+        bounded = window_from is not None or window_to is not None
+        for path in _inbox_files(self.inbox_dir):
+            slot = _inbox_slot(path)
+            if not _overlaps(slot, slot, capture_from, capture_to):
+                continue
+            lo = hi = None
+            if bounded:
+                with self._reading(path, ("captures",)) as connection:
+                    coverage = [
+                        (first, last)
+                        for endpoint, first, last in connection.execute(
+                            "SELECT endpoint, window_first_utc, window_last_utc"
+                            " FROM captures"
+                        )
+                        if _kind(endpoint) == kind
+                    ]
+                if not any(
+                    _overlaps(first, last, window_from, window_to)
+                    for first, last in coverage
+                ):
+                    continue
+                lo = min(first for first, _last in coverage)
+                hi = max(last for _first, last in coverage)
+                lo = lo if window_from is None else max(lo, window_from)
+                hi = hi if window_to is None else min(hi, window_to)
+            with self._reading(path) as connection:
+                # Inboxes may share rows with an earlier capture (a reference).
+                rows.extend(self._expanded_rows(connection, table, lo, hi))
         return rows
 
     def regional_trajectory(
@@ -603,7 +1772,7 @@ class Store:
         path = self._partition_path("regional", window_utc)
         if not path.exists():
             return []
-        connection = _open(path)
+        connection = self._reader(path)
         slots = [
             slot
             for (slot,) in connection.execute(
@@ -626,7 +1795,6 @@ class Store:
             " WHERE window_utc = ? AND region_id = ? ORDER BY capture_utc",
             (window_utc, region_id),
         ).fetchall()
-        connection.close()
 
         trajectory = []
         index = -1
@@ -649,13 +1817,15 @@ class Store:
         path = self._partition_path("national", window_utc)
         if not path.exists():
             return []
-        connection = _open(path)
-        rows = connection.execute(
-            "SELECT capture_utc, forecast, actual FROM national_intensity"
-            " WHERE window_utc = ? ORDER BY capture_utc",
-            (window_utc,),
-        ).fetchall()
-        connection.close()
+        rows = (
+            self._reader(path)
+            .execute(
+                "SELECT capture_utc, forecast, actual FROM national_intensity"
+                " WHERE window_utc = ? ORDER BY capture_utc",
+                (window_utc,),
+            )
+            .fetchall()
+        )
         return [
             (datetime.fromtimestamp(capture, tz=timezone.utc), forecast, actual)
             for capture, forecast, actual in rows
@@ -0,0 +1,114 @@
+"""Ingest telemetry trends: per day and endpoint, what scraping cost at p50 and p95.
+
+Reads the `ingest_metrics` rows every inbox records (folded into the partitions by
+compaction), so API slowdowns and late runners show up before a slot is lost.
+Stdlib only: the report runs in the minimal scraping environment.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+from itertools import groupby
+from typing import Iterable
+from typing import Sequence
+
+from cift.store import IngestMetrics
+
+
+@dataclass(frozen=True)
+class EndpointTrend:
+    """One UTC day of one endpoint's scrapes. Lateness is observed_utc minus the
+    slot start, i.e. how long after the slot the runner actually fired."""
+
+    day: str
+    endpoint: str
+    scrapes: int
+    failures: int
+    retries: int
+    fetch_p50: float
+    fetch_p95: float
+    parse_p50: float | None
+    parse_p95: float | None
+    late_p50: float
+    late_p95: float
+    payload_bytes_p50: float | None
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty sequence: always an observed value."""
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _both(values: Sequence[float]) -> tuple[float | None, float | None]:
+    if not values:
+        return None, None
+    return percentile(values, 0.5), percentile(values, 0.95)
+
+
+def _day(capture_utc: int) -> str:
+    return datetime.fromtimestamp(capture_utc, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def ingest_trends(
+    metrics: Iterable[IngestMetrics], since_utc: int = 0
+) -> list[EndpointTrend]:
+    """Summarise telemetry captured at or after `since_utc`, by day then endpoint."""
+    recent = sorted(
+        (m for m in metrics if m.capture_utc >= since_utc),
+        key=lambda m: (_day(m.capture_utc), m.endpoint),
+    )
+    trends = []
+    for (day, endpoint), group in groupby(
+        recent, key=lambda m: (_day(m.capture_utc), m.endpoint)
+    ):
+        scrapes = list(group)
+        parse_p50, parse_p95 = _both(
+            [m.parse_seconds for m in scrapes if m.parse_seconds is not None]
+        )
+        payloads = [m.payload_bytes for m in scrapes if m.payload_bytes is not None]
+        late = [float(m.observed_utc - m.capture_utc) for m in scrapes]
+        fetch = [m.fetch_seconds for m in scrapes]
+        trends.append(
+            EndpointTrend(
+                day=day,
+                endpoint=endpoint,
+                scrapes=len(scrapes),
+                failures=sum(m.error is not None for m in scrapes),
+                retries=sum(m.retries or 0 for m in scrapes),
+                fetch_p50=percentile(fetch, 0.5),
+                fetch_p95=percentile(fetch, 0.95),
+                parse_p50=parse_p50,
+                parse_p95=parse_p95,
+                late_p50=percentile(late, 0.5),
+                late_p95=percentile(late, 0.95),
+                payload_bytes_p50=percentile(payloads, 0.5) if payloads else None,
+            )
+        )
+    return trends
+
+
+def _seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+def format_trends(trends: Sequence[EndpointTrend]) -> list[str]:
+    """Fixed-width report lines, one per day and endpoint."""
+    lines = [
+        f"{'day':<10} {'endpoint':<25} {'n':>3} {'fail':>4} {'retry':>5}"
+        f" {'fetch p50':>9} {'p95':>7} {'parse p50':>9} {'p95':>7}"
+        f" {'late p50':>8} {'p95':>5} {'kB p50':>7}"
+    ]
+    for t in trends:
+        kilobytes = (
+            "-" if t.payload_bytes_p50 is None else f"{t.payload_bytes_p50 / 1e3:.1f}"
+        )
+        lines.append(
+            f"{t.day:<10} {t.endpoint:<25} {t.scrapes:>3} {t.failures:>4}"
+            f" {t.retries:>5} {_seconds(t.fetch_p50):>9} {_seconds(t.fetch_p95):>7}"
+            f" {_seconds(t.parse_p50):>9} {_seconds(t.parse_p95):>7}"
+            f" {t.late_p50:>8.0f} {t.late_p95:>5.0f} {kilobytes:>7}"
+        )
+    return lines
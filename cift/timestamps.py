@@ -0,0 +1,116 @@
+"""The API's fixed timestamp format, parsed arithmetically instead of via strptime.
+
+Every window of every payload and every row of the legacy CSVs carries one of
+these strings, and the same few thousand values recur across captures, so the
+codec is memoized. Anything that is not the exact zero-padded form falls back to
+strptime, so accepted inputs and their values are unchanged.
+"""
+
+from datetime import datetime
+from datetime import timezone
+from functools import lru_cache
+
+HALF_HOUR_SECONDS = 1800
+
+API_FORMAT = "%Y-%m-%dT%H:%MZ"
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _days_from_civil(year: int, month: int, day: int) -> int:
+    """Days since 1970-01-01 for a proleptic Gregorian date (H. Hinnant's algorithm)."""
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _is_leap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+# "THH:MMZ" -> seconds into the day: all 1,440 valid time-of-day suffixes.
+_TIME_OF_DAY = {
+    f"T{hour:02d}:{minute:02d}Z": hour * 3600 + minute * 60
+    for hour in range(24)
+    for minute in range(60)
+}
+
+
+@lru_cache(maxsize=1 << 14)
+def _date_seconds(date: str) -> int | None:
+    """'YYYY-MM-DD' to the unix time of its midnight; None unless exactly that form."""
+    digits = date[0:4] + date[5:7] + date[8:10]
+    if not (
+        len(date) == 10
+        and date[4] == "-"
+        and date[7] == "-"
+        and digits.isascii()
+        and digits.isdigit()
+    ):
+        return None
+    year, month, day = int(digits[0:4]), int(digits[4:6]), int(digits[6:8])
+    if not 1 <= month <= 12:
+        return None
+    month_days = 29 if month == 2 and _is_leap(year) else _DAYS_IN_MONTH[month - 1]
+    if not 1 <= day <= month_days:
+        return None
+    return _days_from_civil(year, month, day) * 86400
+
+
+@lru_cache(maxsize=1 << 16)
+def to_epoch(timestamp: str) -> int:
+    """Convert an API timestamp like '2023-03-22T11:30Z' to unix seconds.
+
+    A date recurs in 48 windows and a time of day in every date, so the halves
+    are looked up separately: a never-seen timestamp is cheap once its date is.
+    """
+    seconds = _TIME_OF_DAY.get(timestamp[10:])
+    midnight = _date_seconds(timestamp[:10])
+    if seconds is None or midnight is None:
+        # Not the canonical zero-padded form: strptime decides (and raises).
+        return _strptime_epoch(timestamp)
+    return midnight + seconds
+
+
+def compact_to_epoch(stamp: str) -> int:
+    """Convert a file-name stamp like '2023-03-22T1131Z' to unix seconds."""
+    if len(stamp) == 16 and stamp[13] != ":":
+        return to_epoch(f"{stamp[:13]}:{stamp[13:]}")
+    dt = datetime.strptime(stamp, "%Y-%m-%dT%H%MZ").replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _strptime_epoch(timestamp: str) -> int:
+    dt = datetime.strptime(timestamp, API_FORMAT).replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+class WindowSequenceError(ValueError):
+    """Window timestamps are misaligned or not one contiguous half-hour run."""
+
+
+class HalfHourRun:
+    """Validate a run of window starts in one pass: each must sit on a half-hour
+    boundary and follow the previous one by exactly thirty minutes."""
+
+    def __init__(self) -> None:
+        self.first: int | None = None
+        self.last: int | None = None
+
+    def push(self, timestamp: str) -> int:
+        epoch = to_epoch(timestamp)
+        if epoch % HALF_HOUR_SECONDS:
+            raise WindowSequenceError(
+                f"window {timestamp} is not on a half-hour boundary"
+            )
+        if self.last is None:
+            self.first = epoch
+        elif epoch - self.last != HALF_HOUR_SECONDS:
+            raise WindowSequenceError(
+                f"windows are not contiguous half-hours ({self.last} -> {epoch})"
+            )
+        self.last = epoch
+        return epoch
@@ -0,0 +1,137 @@
+"""Ingest through the real HTTP client against the local API stand-in."""
+
+import sqlite3
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from benchmarks.standin import Faults
+from benchmarks.standin import StandIn
+from benchmarks.standin import fixture_payloads
+from benchmarks.standin import slot_clock
+from benchmarks.standin import synthetic_payload
+from cift.client import CarbonIntensityClient
+from cift.client import RetryPolicy
+from cift.client import pooled_session
+from cift.decode import loads
+from cift.ingest import IncompleteIngestError
+from cift.ingest import run_ingest
+from cift.parse import ENDPOINTS
+from cift.store import Store
+from tests.conftest import FIXTURES
+from tests.conftest import FixtureClient
+from tests.conftest import utc
+
+NOW = utc("2024-01-12T06:01Z")
+SLOT = int(utc("2024-01-12T06:00Z").timestamp())
+
+
+def http_client(
+    api: StandIn, clock: Callable[[], float] | None = None
+) -> CarbonIntensityClient:
+    return CarbonIntensityClient(
+        session=pooled_session(),
+        retry=RetryPolicy(base_delay_seconds=0.01, max_delay_seconds=0.02),
+        clock=clock or slot_clock(SLOT),
+        base_url=api.base_url,
+    )
+
+
+def fixture_rows(tmp_path: Path) -> list[tuple[int, int, int | None, int | None]]:
+    payloads = {
+        endpoint: loads(
+            (FIXTURES / "real_day" / endpoint / "2024-01-12T0601Z.json").read_bytes()
+        )
+        for endpoint in ENDPOINTS
+    }
+    run_ingest(tmp_path / "in-process", NOW, FixtureClient(payloads))
+    return sorted(Store(tmp_path / "in-process").national_rows())
+
+
+class TestHttpIngest:
+    @pytest.mark.parametrize("workers", [1, 5])
+    def test_an_ingest_over_http_records_what_the_fixture_client_does(
+        self, tmp_path: Path, workers: int
+    ) -> None:
+        with StandIn(fixture_payloads()) as api:
+            run_ingest(tmp_path / "http", NOW, http_client(api), max_workers=workers)
+            requests = api.requests
+
+        assert requests == len(ENDPOINTS)
+        assert sorted(Store(tmp_path / "http").national_rows()) == fixture_rows(
+            tmp_path
+        )
+
+    def test_a_5xx_burst_is_retried_and_counted_in_the_telemetry(
+        self, tmp_path: Path
+    ) -> None:
+        with StandIn(fixture_payloads(), Faults(burst_5xx=2)) as api:
+            run_ingest(tmp_path, NOW, http_client(api), max_workers=5)
+
+        metrics = Store(tmp_path).ingest_metrics()
+        assert [m.retries for m in metrics] == [2] * len(ENDPOINTS)
+        assert all(m.error is None for m in metrics)
+
+    def test_dripped_truncated_bodies_still_arrive_whole(self, tmp_path: Path) -> None:
+        faults = Faults(horizon_windows=3, drip_bytes=256, drip_interval_seconds=0.001)
+        with StandIn(fixture_payloads(), faults) as api:
+            run_ingest(tmp_path, NOW, http_client(api))
+
+        windows = {row[0] for row in Store(tmp_path).national_rows()}
+        assert len(windows) == 6  # three forward, three past
+
+    def test_synthetic_payloads_have_full_horizons(self, tmp_path: Path) -> None:
+        with StandIn(synthetic_payload) as api:
+            run_ingest(tmp_path, NOW, http_client(api))
+
+        metrics = {m.endpoint: m.row_count for m in Store(tmp_path).ingest_metrics()}
+        assert metrics == {
+            "national_fw48h": 96,
+            "national_pt24h": 48,
+            "national_generation_pt24h": 48,
+            "regional_fw48h": 96 * 18,
+            "regional_pt24h": 48 * 18,
+        }
+
+
+def inbox_table(inbox: Path, table: str) -> list[tuple[object, ...]]:
+    connection = sqlite3.connect(inbox)
+    rows = sorted(connection.execute(f"SELECT * FROM {table}"))
+    connection.close()
+    return rows
+
+
+class TestPerRegionFallback:
+    def test_a_bulk_payload_missing_a_region_is_rebuilt_from_single_regions(
+        self, tmp_path: Path
+    ) -> None:
+        with StandIn(fixture_payloads()) as api:
+            clean = run_ingest(tmp_path / "clean", NOW, http_client(api))
+        with StandIn(fixture_payloads(), Faults(missing_region=11)) as api:
+            inbox = run_ingest(tmp_path / "http", NOW, http_client(api), max_workers=5)
+            requests = api.requests
+
+        assert requests == len(ENDPOINTS) + 2 * 18
+        captures = inbox_table(inbox, "captures")
+        assert {endpoint: source for _, endpoint, *_, source in captures} == {
+            "national_fw48h": "live",
+            "national_pt24h": "live",
+            "national_generation_pt24h": "live",
+            "regional_fw48h": "live_per_region",
+            "regional_pt24h": "live_per_region",
+        }
+        assert inbox_table(inbox, "regional_intensity") == inbox_table(
+            clean, "regional_intensity"
+        )
+
+    def test_no_fallback_runs_past_the_slot_deadline(self, tmp_path: Path) -> None:
+        late = float(SLOT + 19 * 60 + 30)
+        with StandIn(fixture_payloads(), Faults(missing_region=11)) as api:
+            with pytest.raises(IncompleteIngestError) as raised:
+                run_ingest(tmp_path, NOW, http_client(api, clock=lambda: late))
+            requests = api.requests
+
+        assert requests == len(ENDPOINTS)
+        assert set(raised.value.failures) == {"regional_fw48h", "regional_pt24h"}
+        assert "per-region fallback failed: Timeout" in str(raised.value)
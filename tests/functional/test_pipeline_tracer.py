@@ -1,15 +1,29 @@
 """Walking-skeleton tests: the whole ingest → inbox → compact → read path, minimally."""
 
 import sqlite3
+import threading
+from datetime import datetime
 from datetime import timedelta
 from pathlib import Path
 from typing import Any
+from typing import Collection
 
 import pytest
 import requests
 
+import cift.store
+from cift.client import Attempt
+from cift.client import Transfer
+from cift.client import fingerprint
+from cift.decode import loads
+from cift.ingest import CATCH_UP_ENDPOINTS
+from cift.ingest import IncompleteIngestError
+from cift.ingest import missed_slots
+from cift.ingest import run_catch_up
 from cift.ingest import run_ingest
+from cift.parse import ENDPOINTS
 from cift.store import Store
+from tests.conftest import FIXTURES
 from tests.conftest import FixtureClient
 from tests.conftest import utc
 
@@ -47,6 +61,13 @@ class FailingClient:
         raise requests.ConnectionError("api unreachable")
 
 
+class PartlyFailingClient(FixtureClient):
+    def fetch(self, endpoint: str, at: datetime) -> dict[str, Any]:
+        if endpoint == "regional_fw48h":
+            raise requests.ConnectionError("regional endpoint down")
+        return super().fetch(endpoint, at)
+
+
 class TestIngestGuards:
     def test_a_rerun_in_the_same_slot_exits_successfully_without_writing(
         self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
@@ -78,6 +99,52 @@ class TestIngestGuards:
             or not (tmp_path / "inbox").exists()
         )
 
+    def test_a_failed_endpoint_still_records_the_others_and_says_so(
+        self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
+    ) -> None:
+        with pytest.raises(
+            IncompleteIngestError, match="regional endpoint down"
+        ) as info:
+            run_ingest(
+                db_root=tmp_path,
+                now=utc("2023-03-22T11:33Z"),
+                client=PartlyFailingClient(five_endpoint_payloads),
+                max_workers=5,
+            )
+
+        connection = sqlite3.connect(info.value.path)
+        endpoints = {
+            endpoint
+            for (endpoint,) in connection.execute("SELECT endpoint FROM captures")
+        }
+        connection.close()
+        assert set(info.value.failures) == {"regional_fw48h"}
+        assert endpoints == set(five_endpoint_payloads) - {"regional_fw48h"}
+
+    def test_an_error_body_is_malformed_and_the_others_are_still_recorded(
+        self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
+    ) -> None:
+        payloads = {
+            **five_endpoint_payloads,
+            "national_fw48h": {"error": {"code": "500", "message": "upstream"}},
+        }
+
+        with pytest.raises(IncompleteIngestError, match="national_fw48h") as info:
+            run_ingest(
+                db_root=tmp_path,
+                now=utc("2023-03-22T11:33Z"),
+                client=FixtureClient(payloads),
+            )
+
+        connection = sqlite3.connect(info.value.path)
+        endpoints = {
+            endpoint
+            for (endpoint,) in connection.execute("SELECT endpoint FROM captures")
+        }
+        connection.close()
+        assert set(info.value.failures) == {"national_fw48h"}
+        assert endpoints == set(five_endpoint_payloads) - {"national_fw48h"}
+
     def test_observed_utc_records_the_real_fetch_time_not_the_slot(
         self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
     ) -> None:
@@ -94,3 +161,332 @@ class TestIngestGuards:
         }
         connection.close()
         assert observed == {int(now.timestamp())}
+
+
+class BarrierClient(FixtureClient):
+    """Serves canned payloads only once `parties` fetches are in flight together."""
+
+    def __init__(self, payloads: dict[str, Any], parties: int):
+        super().__init__(payloads)
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def fetch(self, endpoint: str, at: datetime) -> dict[str, Any]:
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            self.barrier.wait()
+            return super().fetch(endpoint, at)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class TestConcurrentIngest:
+    def test_all_endpoints_are_in_flight_at_once_and_land_in_one_inbox(
+        self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
+    ) -> None:
+        client = BarrierClient(five_endpoint_payloads, parties=5)
+
+        inbox = run_ingest(
+            db_root=tmp_path,
+            now=utc("2023-03-22T11:33Z"),
+            client=client,
+            max_workers=5,
+        )
+
+        connection = sqlite3.connect(inbox)
+        endpoints = {
+            endpoint
+            for (endpoint,) in connection.execute("SELECT endpoint FROM captures")
+        }
+        connection.close()
+        assert client.peak == 5
+        assert endpoints == set(five_endpoint_payloads)
+
+    def test_the_concurrency_limit_bounds_fetches_in_flight(
+        self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
+    ) -> None:
+        client = BarrierClient(five_endpoint_payloads, parties=1)
+
+        run_ingest(
+            db_root=tmp_path,
+            now=utc("2023-03-22T11:33Z"),
+            client=client,
+            max_workers=2,
+        )
+
+        assert client.peak <= 2
+        assert len(client.requests) == 5
+
+    def test_one_failed_endpoint_leaves_no_inbox_when_fetching_concurrently(
+        self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
+    ) -> None:
+        del five_endpoint_payloads["regional_pt24h"]
+
+        with pytest.raises(KeyError, match="regional_pt24h"):
+            run_ingest(
+                db_root=tmp_path,
+                now=utc("2023-03-22T11:33Z"),
+                client=FixtureClient(five_endpoint_payloads),
+                max_workers=5,
+            )
+
+        assert not list(tmp_path.glob("inbox/snap_*"))
+
+
+class RetryingClient(FixtureClient):
+    """Keeps attempt records like CarbonIntensityClient: one retry per endpoint."""
+
+    def attempts_for(self, endpoint: str) -> list[Attempt]:
+        transfer = Transfer(wire_bytes=900, body_bytes=4000, ttfb_seconds=0, seconds=0)
+        return [
+            Attempt(endpoint, 1, 0.0, 0.1, error="ReadTimeout()"),
+            Attempt(endpoint, 2, 2.0, 0.1, transfer=transfer),
+        ]
+
+
+class TestIngestTelemetry:
+    def test_every_endpoint_gets_a_metrics_row_including_a_failed_one(
+        self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
+    ) -> None:
+        now = utc("2023-03-22T11:33Z")
+        with pytest.raises(IncompleteIngestError):
+            run_ingest(
+                db_root=tmp_path,
+                now=now,
+                client=PartlyFailingClient(five_endpoint_payloads),
+            )
+
+        metrics = {m.endpoint: m for m in Store(tmp_path).ingest_metrics()}
+
+        assert set(metrics) == set(five_endpoint_payloads)
+        failed = metrics["regional_fw48h"]
+        assert failed.error == "ConnectionError: regional endpoint down"
+        assert (failed.row_count, failed.parse_seconds) == (0, None)
+        national = metrics["national_pt24h"]
+        assert national.observed_utc - national.capture_utc == 180
+        assert national.row_count == 3
+        assert national.parse_seconds is not None and national.fetch_seconds >= 0
+        # A plain client keeps no attempt records, so these are unknown, not zero.
+        assert (national.retries, national.payload_bytes) == (None, None)
+
+    def test_retries_and_bytes_come_from_a_client_that_logs_attempts(
+        self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
+    ) -> None:
+        run_ingest(
+            db_root=tmp_path,
+            now=utc("2023-03-22T11:33Z"),
+            client=RetryingClient(five_endpoint_payloads),
+        )
+
+        metrics = Store(tmp_path).ingest_metrics()
+
+        assert {(m.retries, m.payload_bytes, m.wire_bytes) for m in metrics} == {
+            (1, 4000, 900)
+        }
+
+    def test_compaction_folds_telemetry_into_the_partitions(
+        self, tmp_path: Path, five_endpoint_payloads: dict[str, Any]
+    ) -> None:
+        now = utc("2023-03-22T11:33Z")
+        run_ingest(
+            db_root=tmp_path, now=now, client=FixtureClient(five_endpoint_payloads)
+        )
+        store = Store(tmp_path)
+        before = store.ingest_metrics()
+
+        store.compact(now=now + timedelta(days=2))
+
+        assert not list(store.inbox_dir.glob("snap_*.sqlite"))
+        assert store.ingest_metrics(include_inbox=False) == before
+        assert len(before) == 5
+
+
+class BytesClient:
+    """Serves raw fixture bodies like CarbonIntensityClient.fetch_raw would."""
+
+    def __init__(self, bodies: dict[str, bytes]):
+        self.bodies = bodies
+        self.decoded: list[str] = []
+
+    def fetch(self, endpoint: str, at: datetime) -> dict[str, Any]:
+        return self.fetch_raw(endpoint, at)[1] or {}
+
+    def fetch_raw(
+        self, endpoint: str, at: datetime, known: Collection[str] = ()
+    ) -> tuple[str, dict[str, Any] | None]:
+        identity = fingerprint(self.bodies[endpoint])
+        if identity in known:
+            return identity, None
+        self.decoded.append(endpoint)
+        return identity, loads(self.bodies[endpoint])
+
+
+def real_day_bodies(slot_name: str, past_from: str | None = None) -> dict[str, bytes]:
+    """One slot's raw bodies; pt24h bodies optionally repeat an earlier slot's."""
+    bodies = {}
+    for endpoint in ENDPOINTS:
+        name = past_from if past_from and "pt24h" in endpoint else slot_name
+        path = FIXTURES / "real_day" / endpoint / f"2024-01-12T{name}.json"
+        bodies[endpoint] = path.read_bytes()
+    return bodies
+
+
+def decoded(bodies: dict[str, bytes]) -> FixtureClient:
+    return FixtureClient({endpoint: loads(body) for endpoint, body in bodies.items()})
+
+
+def partition_rows(store: Store) -> dict[str, list[Any]]:
+    rows = {}
+    for path in sorted(store.db_root.glob("[0-9][0-9][0-9][0-9]/*.sqlite")):
+        connection = sqlite3.connect(path)
+        for table in ("national_intensity", "regional_intensity", "generation_mix"):
+            rows[f"{path.name}:{table}"] = sorted(
+                connection.execute(f"SELECT * FROM {table}")
+            )
+        connection.close()
+    return rows
+
+
+class TestPayloadDedupe:
+    def test_a_repeated_body_is_stored_as_a_reference_and_expands_exactly(
+        self, tmp_path: Path
+    ) -> None:
+        """The 06:31 scrape gets the 06:01 pt24h bodies again, byte for byte. The
+        plain store parses them; the deduplicating one records references."""
+        first, second = real_day_bodies("0601Z"), real_day_bodies("0631Z", "0601Z")
+        plain, deduped = Store(tmp_path / "plain"), Store(tmp_path / "deduped")
+        run_ingest(plain.db_root, utc("2024-01-12T06:01Z"), decoded(first))
+        run_ingest(plain.db_root, utc("2024-01-12T06:31Z"), decoded(second))
+        run_ingest(deduped.db_root, utc("2024-01-12T06:01Z"), BytesClient(first))
+        client = BytesClient(second)
+        inbox = run_ingest(deduped.db_root, utc("2024-01-12T06:31Z"), client)
+
+        connection = sqlite3.connect(inbox)
+        references = connection.execute(
+            "SELECT endpoint, reference_utc FROM payload_fingerprints"
+            " WHERE reference_utc IS NOT NULL ORDER BY endpoint"
+        ).fetchall()
+        (national,) = connection.execute(
+            "SELECT COUNT(*) FROM national_intensity"
+        ).fetchone()
+        connection.close()
+        earlier = int(utc("2024-01-12T06:00Z").timestamp())
+        assert references == [
+            ("national_generation_pt24h", earlier),
+            ("national_pt24h", earlier),
+            ("regional_pt24h", earlier),
+        ]
+        assert sorted(client.decoded) == ["national_fw48h", "regional_fw48h"]
+        assert sorted(deduped.national_rows()) == sorted(plain.national_rows())
+
+        for store in (plain, deduped):
+            store.compact(now=utc("2024-01-13T02:12Z"))
+        assert partition_rows(deduped) == partition_rows(plain)
+        assert sorted(deduped.national_rows()) == sorted(plain.national_rows())
+
+    def test_a_repeated_forward_body_is_parsed_and_rejected_not_referenced(
+        self, tmp_path: Path
+    ) -> None:
+        stale = real_day_bodies("0601Z")
+        run_ingest(tmp_path, utc("2024-01-12T06:01Z"), BytesClient(stale))
+
+        with pytest.raises(IncompleteIngestError, match="before its capture slot"):
+            run_ingest(tmp_path, utc("2024-01-12T06:31Z"), BytesClient(stale))
+
+
+class SlotFixtureClient:
+    """Serves the real_day file for each query time; other times are a 404."""
+
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, datetime]] = []
+
+    def fetch(self, endpoint: str, at: datetime) -> dict[str, Any]:
+        self.requests.append((endpoint, at))
+        path = FIXTURES / "real_day" / endpoint / f"{at:%Y-%m-%dT%H%MZ}.json"
+        if not path.exists():
+            raise requests.HTTPError(f"404 for {path.name}")
+        return dict(loads(path.read_bytes()))
+
+
+class TestCatchUp:
+    def test_missed_slots_get_catch_up_inboxes_of_their_past_horizons(
+        self, tmp_path: Path
+    ) -> None:
+        live = SlotFixtureClient()
+        run_ingest(tmp_path, utc("2024-01-12T06:01Z"), live)
+        run_ingest(tmp_path, utc("2024-01-12T07:31Z"), live)
+        clients: list[SlotFixtureClient] = []
+
+        def factory() -> SlotFixtureClient:
+            clients.append(SlotFixtureClient())
+            return clients[-1]
+
+        observed = utc("2024-01-12T08:10Z").timestamp()
+        report = run_catch_up(
+            tmp_path,
+            utc("2024-01-12T08:05Z"),
+            factory,
+            requests_per_second=1000.0,
+            clock=lambda: observed,
+        )
+
+        store = Store(tmp_path)
+        missed = [utc("2024-01-12T06:30Z"), utc("2024-01-12T07:00Z")]
+        assert report.inboxes == tuple(
+            store.inbox_path(int(slot.timestamp())) for slot in missed
+        )
+        # Every other slot of the last day is a 404 here, reported per endpoint.
+        assert len(report.failures) == (47 - 2 - 2) * len(CATCH_UP_ENDPOINTS)
+        assert {endpoint for _, endpoint, _ in report.failures} == set(
+            CATCH_UP_ENDPOINTS
+        )
+        assert len(clients) == 47 - 2
+        connection = sqlite3.connect(report.inboxes[0])
+        captures = connection.execute(
+            "SELECT endpoint, observed_utc, source FROM captures ORDER BY endpoint"
+        ).fetchall()
+        connection.close()
+        assert captures == [
+            (endpoint, int(observed), "catch_up")
+            for endpoint in sorted(CATCH_UP_ENDPOINTS)
+        ]
+        queried = {at for client in clients for _, at in client.requests}
+        assert utc("2024-01-12T06:31Z") in queried
+        assert utc("2024-01-12T08:01Z") not in queried  # the current slot is live's
+
+    def test_slots_already_compacted_past_are_not_caught_up(
+        self, tmp_path: Path
+    ) -> None:
+        run_ingest(tmp_path, utc("2024-01-12T06:01Z"), SlotFixtureClient())
+        Store(tmp_path).compact(now=utc("2024-01-13T00:10Z"))
+
+        slots = missed_slots(Store(tmp_path), utc("2024-01-12T08:05Z"))
+
+        assert slots == [
+            int(utc(f"2024-01-12T{hh_mm}Z").timestamp())
+            for hh_mm in ("06:30", "07:00", "07:30")
+        ]
+
+    def test_partitions_of_older_captures_are_not_opened(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        run_ingest(tmp_path, utc("2024-01-12T06:01Z"), SlotFixtureClient())
+        Store(tmp_path).compact(now=utc("2024-01-13T00:10Z"))
+        real_open_reader = cift.store._open_reader
+        opened: list[str] = []
+
+        def open_reader(path: Path, immutable: bool = False) -> Any:
+            opened.append(path.name)
+            return real_open_reader(path, immutable)
+
+        monkeypatch.setattr(cift.store, "_open_reader", open_reader)
+
+        slots = missed_slots(Store(tmp_path), utc("2024-02-01T08:05Z"))
+
+        assert len(slots) == 47
+        assert opened == ["catalog.sqlite"]
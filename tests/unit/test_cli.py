@@ -19,6 +19,25 @@ class TestNewCommandDispatch:
         assert kwargs["db_root"] == Path("data/db")
         assert kwargs["now"].tzinfo is not None
         assert hasattr(kwargs["client"], "fetch")
+        assert kwargs["max_workers"] == 5
+
+    def test_ingest_catch_up_reports_failures_and_exits_non_zero(
+        self, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        report = cift.ingest.CatchUpReport(
+            inboxes=(Path("data/db/inbox/snap_x.sqlite"),),
+            failures=((1705041000, "national_pt24h", "HTTPError: 502"),),
+        )
+        with mock.patch.object(cift.ingest, "run_catch_up", return_value=report) as run:
+            with pytest.raises(SystemExit):
+                cli.main(["ingest", "--catch-up", "--requests_per_second", "4"])
+
+        _, kwargs = run.call_args
+        assert kwargs["requests_per_second"] == 4.0
+        assert callable(kwargs["client_factory"])
+        printed = capsys.readouterr().out
+        assert "inbox=data/db/inbox/snap_x.sqlite" in printed
+        assert "CATCH-UP-FAILED: 2024-01-12T06:30Z national_pt24h: HTTPError" in printed
 
     def test_compact_dispatches_and_prints_the_report(
         self, capsys: pytest.CaptureFixture[str]
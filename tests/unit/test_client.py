@@ -1,23 +1,45 @@
-"""HTTP client behaviour: timeout wiring and one retry on transient failure."""
-
+"""HTTP client behaviour: timeout wiring and deadline-bounded retries."""
+
+import gzip
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
 from typing import Any
+from typing import Iterator
 
 import pytest
 import requests
 
+import cift.client
 from cift.client import CarbonIntensityClient
+from cift.client import RetryPolicy
+from cift.client import fingerprint
+from cift.client import pooled_session
 from tests.conftest import utc
 
 
+class FakeRaw:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def stream(self, amt: int, decode_content: bool) -> Iterator[bytes]:
+        for start in range(0, len(self.body), amt):
+            end = start + amt
+            yield self.body[start:end]
+
+
 class FakeResponse:
     def __init__(self, payload: dict[str, Any]):
-        self.payload = payload
+        self.headers: dict[str, str] = {}
+        self.raw = FakeRaw(json.dumps(payload).encode())
 
     def raise_for_status(self) -> None:
         pass
 
-    def json(self) -> dict[str, Any]:
-        return self.payload
+    def close(self) -> None:
+        pass
 
 
 class FlakySession:
@@ -26,29 +48,198 @@ class FlakySession:
         self.payload = payload
         self.calls: list[str] = []
 
-    def get(self, url: str, timeout: float) -> FakeResponse:
+    def get(self, url: str, timeout: float, stream: bool) -> FakeResponse:
         self.calls.append(url)
         if len(self.calls) <= self.failures:
             raise requests.ConnectionError("transient blip")
         return FakeResponse(self.payload)
 
 
+class FakeClock:
+    """Wall clock that only moves when the client sleeps (or a test advances it)."""
+
+    def __init__(self, now: float):
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+AT = utc("2023-03-22T11:31Z")
+SLOT = AT.timestamp() - 60
+
+
+def client_for(session: FlakySession, clock: FakeClock) -> CarbonIntensityClient:
+    return CarbonIntensityClient(
+        session=session,
+        retry=RetryPolicy(base_delay_seconds=2.0, max_delay_seconds=60.0),
+        clock=clock,
+        sleep=clock.sleep,
+        rng=random.Random(7),
+    )
+
+
 class TestFetchRetry:
-    def test_fetch_retries_once_on_a_transient_error(self) -> None:
+    def test_fetch_retries_on_a_transient_error(self) -> None:
         session = FlakySession(failures=1, payload={"data": ["ok"]})
-        client = CarbonIntensityClient(session=session, retry_delay_seconds=0)
+        client = client_for(session, FakeClock(SLOT + 60))
 
-        payload = client.fetch("national_fw48h", utc("2023-03-22T11:31Z"))
+        payload = client.fetch("national_fw48h", AT)
 
         assert payload == {"data": ["ok"]}
         assert len(session.calls) == 2
         assert session.calls[0].endswith("/intensity/2023-03-22T11:31Z/fw48h")
 
-    def test_fetch_raises_after_the_retry_also_fails(self) -> None:
-        session = FlakySession(failures=2, payload={})
-        client = CarbonIntensityClient(session=session, retry_delay_seconds=0)
+    def test_backoff_grows_exponentially_with_jitter_until_success(self) -> None:
+        clock = FakeClock(SLOT + 60)
+        session = FlakySession(failures=4, payload={"data": ["ok"]})
+
+        client_for(session, clock).fetch("national_fw48h", AT)
+
+        assert len(session.calls) == 5
+        for attempt, pause in enumerate(clock.sleeps, start=1):
+            cap = 2.0 * 2 ** (attempt - 1)
+            assert cap / 2 <= pause <= cap
+
+    def test_fetch_gives_up_before_the_slot_deadline_and_raises(self) -> None:
+        clock = FakeClock(SLOT + 60)
+        session = FlakySession(failures=10_000, payload={})
+        client = client_for(session, clock)
 
         with pytest.raises(requests.ConnectionError, match="transient blip"):
-            client.fetch("national_fw48h", utc("2023-03-22T11:31Z"))
+            client.fetch("national_fw48h", AT)
 
-        assert len(session.calls) == 2
+        assert len(session.calls) > 2
+        assert clock.now <= client.retry.deadline(AT)
+
+    def test_no_retry_once_the_deadline_has_passed(self) -> None:
+        session = FlakySession(failures=1, payload={"data": ["ok"]})
+        client = client_for(session, FakeClock(SLOT + 25 * 60))
+
+        with pytest.raises(requests.ConnectionError):
+            client.fetch("national_fw48h", AT)
+
+        assert len(session.calls) == 1
+
+    def test_every_attempt_is_recorded_with_its_timing(self) -> None:
+        clock = FakeClock(SLOT + 60)
+        session = FlakySession(failures=2, payload={"data": ["ok"]})
+        client = client_for(session, clock)
+
+        client.fetch("national_pt24h", AT)
+
+        assert [(a.endpoint, a.attempt) for a in client.attempts] == [
+            ("national_pt24h", 1),
+            ("national_pt24h", 2),
+            ("national_pt24h", 3),
+        ]
+        assert [a.error is None for a in client.attempts] == [False, False, True]
+        assert client.attempts[1].started_utc == SLOT + 60 + clock.sleeps[0]
+
+
+class TestRegionFetch:
+    def test_fetch_region_requests_the_single_region_route(self) -> None:
+        session = FlakySession(failures=0, payload={"data": ["ok"]})
+        client = client_for(session, FakeClock(SLOT + 60))
+
+        payload = client.fetch_region("one_region_fw48h", AT, 13)
+
+        assert payload == {"data": ["ok"]}
+        assert session.calls == [
+            "https://api.carbonintensity.org.uk"
+            "/regional/intensity/2023-03-22T11:31Z/fw48h/regionid/13"
+        ]
+
+    def test_even_the_first_region_attempt_must_fit_the_deadline(self) -> None:
+        session = FlakySession(failures=0, payload={"data": ["ok"]})
+        client = client_for(session, FakeClock(SLOT + 19 * 60 + 30))
+
+        with pytest.raises(requests.Timeout, match="slot deadline"):
+            client.fetch_region("one_region_pt24h", AT, 1)
+
+        assert session.calls == []
+
+
+class GzipHandler(BaseHTTPRequestHandler):
+    """Serves one JSON body, gzipped only when the request offers gzip."""
+
+    body = json.dumps({"data": [{"from": "2023-03-22T11:30Z"}] * 500}).encode()
+    peers: list[int] = []
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server's naming
+        self.peers.append(self.client_address[1])
+        compressed = "gzip" in self.headers.get("Accept-Encoding", "")
+        body = gzip.compress(self.body) if compressed else self.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class TestRawFetch:
+    def test_a_known_body_is_fingerprinted_but_never_decoded(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        session = FlakySession(failures=0, payload={"data": ["ok"]})
+        body = json.dumps({"data": ["ok"]}).encode()
+        client = client_for(session, FakeClock(SLOT + 60))
+
+        def no_decoding(body: bytes, response: object) -> dict[str, Any]:
+            raise AssertionError("a known body was decoded")
+
+        first = client.fetch_raw("national_pt24h", AT)
+        monkeypatch.setattr(cift.client, "_decode", no_decoding)
+        second = client.fetch_raw("national_pt24h", AT, known=[fingerprint(body)])
+
+        assert first == (fingerprint(body), {"data": ["ok"]})
+        assert second == (fingerprint(body), None)
+
+
+class TestPooledTransport:
+    def test_compressed_responses_are_decoded_and_measured_over_kept_alive_sockets(
+        self,
+    ) -> None:
+        GzipHandler.protocol_version = "HTTP/1.1"
+        server = ThreadingHTTPServer(("127.0.0.1", 0), GzipHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        client = CarbonIntensityClient(session=pooled_session(), base_url=base)
+        try:
+            for _ in range(3):
+                payload = client.fetch("national_fw48h", AT)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        (_, transfer), *_ = client.transfers()
+        assert payload == json.loads(GzipHandler.body)
+        assert transfer.encoding == "gzip"
+        assert transfer.body_bytes == len(GzipHandler.body)
+        assert transfer.wire_bytes < transfer.body_bytes / 10
+        assert 0 <= transfer.ttfb_seconds <= transfer.seconds
+        assert len(set(GzipHandler.peers)) == 1  # one connection, reused
+
+    def test_a_truncated_body_is_retried_like_any_transport_error(self) -> None:
+        class TruncatingSession(FlakySession):
+            def get(self, url: str, timeout: float, stream: bool) -> FakeResponse:
+                response = super().get(url, timeout, stream)
+                if len(self.calls) == 1:
+                    response.raw.body = response.raw.body[:-5]
+                return response
+
+        session = TruncatingSession(failures=0, payload={"data": ["ok"]})
+        client = client_for(session, FakeClock(SLOT + 60))
+
+        assert client.fetch("national_fw48h", AT) == {"data": ["ok"]}
+        assert [a.error is None for a in client.attempts] == [False, True]
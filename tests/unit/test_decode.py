@@ -0,0 +1,40 @@
+"""The bytes JSON decode layer: same values and same rejections whatever backend."""
+
+import json
+
+import pytest
+
+import cift.decode
+from cift.decode import loads
+
+
+class TestLoads:
+    def test_decodes_utf8_bytes_without_a_str_round_trip(self) -> None:
+        assert loads('{"shortname": "Ynys Môn", "perc": 12.3}'.encode()) == {
+            "shortname": "Ynys Môn",
+            "perc": 12.3,
+        }
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"{ not json",
+            b'{"perc": NaN}',
+            b'{"perc": Infinity}',
+            b'\xef\xbb\xbf{"data": []}',
+            b'{"shortname": "\xff"}',
+        ],
+        ids=["garbled", "nan", "infinity", "byte-order-mark", "invalid-utf8"],
+    )
+    def test_rejects_what_a_strict_decoder_rejects(self, data: bytes) -> None:
+        with pytest.raises(json.JSONDecodeError):
+            loads(data)
+
+    def test_the_stdlib_fallback_is_used_when_no_fast_decoder_is_installed(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(cift.decode, "_fast", None)
+
+        assert loads(b'{"data": [1]}') == {"data": [1]}
+        with pytest.raises(json.JSONDecodeError):
+            loads(b'{"perc": NaN}')
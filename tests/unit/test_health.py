@@ -0,0 +1,119 @@
+"""Ingest-time horizon health: the daily thresholds, applied to each scrape."""
+
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+from cift.analysis import horizon_health
+from cift.ingest import check_horizons
+from cift.ingest import run_ingest
+from cift.parse import Snapshot
+from cift.parse import floor_to_slot
+from cift.parse import parse_snapshot
+from cift.store import Store
+from tests.conftest import FixtureClient
+from tests.conftest import generation_payload
+from tests.conftest import national_payload
+from tests.conftest import regional_payload
+from tests.conftest import utc
+
+BASE = utc("2023-03-22T08:00Z")
+
+
+def regional(captured: datetime, window_count: int) -> Snapshot:
+    slot = floor_to_slot(captured)
+    windows = [
+        ((captured + timedelta(minutes=30 * offset)).strftime("%Y-%m-%dT%H:%MZ"), 100)
+        for offset in range(window_count)
+    ]
+    return parse_snapshot("regional_fw48h", regional_payload(*windows), slot, slot)
+
+
+def scrape(store: Store, snapshot: Snapshot) -> list[str]:
+    """What one ingest does: write the inbox, then check just that scrape."""
+    store.write_inbox([snapshot])
+    return check_horizons(store, [snapshot])
+
+
+class TestCheckHorizons:
+    def test_the_same_alerts_fire_as_the_daily_report_adding_only_inboxes(
+        self, tmp_path: Path
+    ) -> None:
+        store = Store(tmp_path)
+        counts = [1, 60, 60, 96, 60, 60, 60, 60, 60, 60, 60]
+        alerts = []
+        for index, count in enumerate(counts):
+            captured = BASE + timedelta(minutes=30 * index)
+            alerts += scrape(store, regional(captured, count))
+
+        assert alerts == list(
+            horizon_health(store, now=utc("2023-03-22T14:00Z")).alerts
+        )
+        assert alerts == [
+            "regional_fw48h at 2023-03-22T08:00Z observed only 1/96 windows",
+            "regional_fw48h sustained truncation: six consecutive short captures"
+            " ending 2023-03-22T12:30Z",
+        ]
+        assert sorted(path.name for path in (tmp_path / "inbox").iterdir()) == [
+            f"snap_{(BASE + timedelta(minutes=30 * index)):%Y-%m-%dT%H%MZ}.sqlite"
+            for index in range(len(counts))
+        ]
+
+    def test_a_capture_older_than_a_recorded_one_is_skipped(
+        self, tmp_path: Path
+    ) -> None:
+        store = Store(tmp_path)
+        scrape(store, regional(BASE + timedelta(hours=1), 96))
+
+        late = scrape(store, regional(BASE, 1))
+
+        assert late == []
+
+    def test_a_streak_older_than_the_lookback_starts_over(self, tmp_path: Path) -> None:
+        store = Store(tmp_path)
+        for index in range(5):
+            scrape(store, regional(BASE + timedelta(minutes=30 * index), 60))
+
+        alerts = scrape(store, regional(BASE + timedelta(days=2), 60))
+
+        assert alerts == []
+
+    def test_a_streak_continues_across_compaction(self, tmp_path: Path) -> None:
+        store = Store(tmp_path)
+        evening = utc("2023-03-22T21:30Z")
+        for index in range(5):
+            scrape(store, regional(evening + timedelta(minutes=30 * index), 60))
+        store.compact(now=utc("2023-03-23T00:10Z"))
+
+        alerts = scrape(store, regional(utc("2023-03-23T00:00Z"), 60))
+
+        assert not list((tmp_path / "inbox").glob("snap_2023-03-22*"))
+        assert alerts == [
+            "regional_fw48h sustained truncation: six consecutive short captures"
+            " ending 2023-03-23T00:00Z"
+        ]
+
+
+class TestIngestAlerts:
+    def test_run_ingest_reports_a_short_horizon_within_the_scrape(
+        self, tmp_path: Path
+    ) -> None:
+        at = "2023-03-22T11:30Z"
+        payloads = {
+            "national_fw48h": national_payload((at, 100, None)),
+            "national_pt24h": national_payload(("2023-03-22T11:00Z", 100, 100)),
+            "regional_fw48h": regional_payload((at, 100)),
+            "regional_pt24h": regional_payload(("2023-03-22T11:00Z", 100)),
+            "national_generation_pt24h": generation_payload("2023-03-22T11:00Z"),
+        }
+        alerts: list[str] = []
+
+        run_ingest(
+            tmp_path,
+            utc("2023-03-22T11:31Z"),
+            FixtureClient(payloads),
+            on_alert=alerts.append,
+        )
+
+        assert len(alerts) == 5
+        assert all("observed only 1/" in alert for alert in alerts)
@@ -5,6 +5,7 @@ from pathlib import Path
 
 import pytest
 
+import cift.parse
 from cift.migrate import MigrationError
 from cift.migrate import Staging
 from cift.migrate import emit
@@ -66,6 +67,29 @@ class TestJsonBacklogStaging:
             "2024-01-12T0931Z.json",
         ]
 
+    def test_whole_file_decoding_stages_exactly_what_streaming_does(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        files = sorted((FIXTURES / "real_day" / "regional_fw48h").glob("*.json"))
+        not_an_object = tmp_path / "2024-01-12T0901Z.json"
+        not_an_object.write_text("[]")
+        query = "SELECT * FROM candidates ORDER BY window_utc, region_id, capture_utc"
+
+        streamed = Staging(tmp_path / "streamed.sqlite")
+        stage_json_backlog(streamed, files, endpoint="regional_fw48h", max_workers=1)
+        monkeypatch.setattr(cift.parse, "DECODER", "orjson")
+        whole = Staging(tmp_path / "whole.sqlite")
+        report = stage_json_backlog(
+            whole, [*files, not_an_object], endpoint="regional_fw48h", max_workers=1
+        )
+
+        assert report.staged == 6
+        assert [name for name, _reason in report.excluded] == [not_an_object.name]
+        assert (
+            streamed.connect().execute(query).fetchall()
+            == whole.connect().execute(query).fetchall()
+        )
+
 
 REGIONAL_CSV = """from,regions.regionid,regions.intensity.forecast,biomass,coal,gas,hydro,imports,nuclear,other,solar,wind
 2023-05-15T16:30Z,1,55,0.0,0.0,10.0,0.0,0.0,0.0,0.0,0.0,90.0
@@ -315,6 +339,29 @@ class TestEmit:
         ]
         assert not list((tmp_path / "db" / "inbox").glob("snap_*.sqlite"))
 
+    def test_batches_leave_partitions_open_until_the_last_compaction(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        staging = Staging(tmp_path / "staging.sqlite")
+        files = sorted((FIXTURES / "real_day" / "regional_fw48h").glob("*.json"))
+        stage_json_backlog(staging, files, endpoint="regional_fw48h")
+        preflight(staging)
+        resolve(staging)
+        store = Store(tmp_path / "db")
+        closes: list[int] = []
+        close_sealed = Store._close_sealed
+
+        def spy(self: Store, now_utc: int) -> None:
+            closes.append(now_utc)
+            close_sealed(self, now_utc)
+
+        monkeypatch.setattr(Store, "_close_sealed", spy)
+
+        emit(staging, store, compact_now=utc("2024-02-20T02:12Z"), batch_slots=2)
+
+        assert closes == [int(utc("2024-02-20T02:12Z").timestamp())]
+        assert not [info.path.name for info in store.partitions() if info.has_tails]
+
 
 class TestResolutionFieldCoverage:
     def test_resolution_fails_when_the_winner_lacks_a_field_the_loser_has(
@@ -1,10 +1,22 @@
 """Parsing and the completeness invariant: reject anything reconstruction can't trust."""
 
+import json
+import sqlite3
+from typing import Any
+
 import pytest
 
+from cift.parse import FUELS
+from cift.parse import NATIONAL_COLUMNS
+from cift.parse import Columns
 from cift.parse import MalformedSnapshotError
+from cift.parse import Rejected
 from cift.parse import floor_to_slot
+from cift.parse import merge_region_payloads
 from cift.parse import parse_snapshot
+from cift.parse import parse_snapshot_stream
+from cift.parse import parse_snapshots
+from tests.conftest import FIXTURES
 from tests.conftest import generation_payload
 from tests.conftest import load_fixture
 from tests.conftest import national_payload
@@ -66,6 +78,26 @@ class TestParseSnapshot:
         with pytest.raises(MalformedSnapshotError, match="contiguous"):
             parse_snapshot("national_fw48h", payload, SLOT, SLOT)
 
+    @pytest.mark.parametrize("forecast", [41.5, "41"])
+    def test_a_value_that_is_not_an_integer_rejects_the_endpoint(
+        self, forecast: Any
+    ) -> None:
+        national = national_payload(("2023-03-22T11:30Z", 41, None))
+        national["data"][0]["intensity"]["forecast"] = forecast
+        regional = regional_payload(("2023-03-22T11:30Z", 50))
+        regional["data"][0]["regions"][3]["intensity"]["forecast"] = forecast
+
+        with pytest.raises(MalformedSnapshotError, match="2023-03-22T11:30Z"):
+            parse_snapshot("national_fw48h", national, SLOT, SLOT)
+        with pytest.raises(MalformedSnapshotError, match="2023-03-22T11:30Z"):
+            parse_snapshot("regional_fw48h", regional, SLOT, SLOT)
+
+    def test_a_window_off_the_half_hour_grid_rejects_the_endpoint(self) -> None:
+        payload = national_payload(("2023-03-22T11:45Z", 41, None))
+
+        with pytest.raises(MalformedSnapshotError, match="half-hour boundary"):
+            parse_snapshot("national_fw48h", payload, SLOT, SLOT)
+
     def test_a_missing_region_rejects_the_endpoint(self) -> None:
         payload = regional_payload(
             ("2023-03-22T11:30Z", 50), region_ids=tuple(range(1, 18))
@@ -87,6 +119,38 @@ class TestParseSnapshot:
         with pytest.raises(MalformedSnapshotError, match="one decimal"):
             parse_snapshot("national_generation_pt24h", payload, SLOT, SLOT)
 
+    @pytest.mark.parametrize("perc", [12.31, 1e-05, float("nan"), "12.3"])
+    def test_only_one_decimal_numbers_are_accepted(self, perc: object) -> None:
+        payload = generation_payload("2023-03-22T11:00Z")
+        for entry in payload["data"][0]["generationmix"]:
+            if entry["fuel"] == "wind":
+                entry["perc"] = perc
+
+        with pytest.raises(MalformedSnapshotError, match="one decimal"):
+            parse_snapshot("national_generation_pt24h", payload, SLOT, SLOT)
+
+    def test_integral_and_one_decimal_percentages_become_exact_tenths(self) -> None:
+        payload = generation_payload(
+            "2023-03-22T11:00Z", mix={"wind": 100, "solar": 0.1, "gas": 33.3}
+        )
+
+        snapshot = parse_snapshot("national_generation_pt24h", payload, SLOT, SLOT)
+
+        tenths = dict(zip(FUELS, snapshot.generation[0][2:], strict=True))
+        assert (tenths["wind"], tenths["solar"], tenths["gas"]) == (1000, 1, 333)
+
+    def test_a_percentage_within_rounding_error_of_one_decimal_is_accepted(
+        self,
+    ) -> None:
+        payload = generation_payload(
+            "2023-03-22T11:00Z", mix={"wind": 12.300000000000002, "gas": 12.30000000001}
+        )
+
+        snapshot = parse_snapshot("national_generation_pt24h", payload, SLOT, SLOT)
+
+        tenths = dict(zip(FUELS, snapshot.generation[0][2:], strict=True))
+        assert (tenths["wind"], tenths["gas"]) == (123, 123)
+
     def test_an_empty_response_rejects_the_endpoint(self) -> None:
         with pytest.raises(MalformedSnapshotError, match="no windows"):
             parse_snapshot("national_fw48h", {"data": []}, SLOT, SLOT)
@@ -125,3 +189,209 @@ class TestParseSnapshot:
             MalformedSnapshotError, match="reaches into its own capture"
         ):
             parse_snapshot("national_pt24h", payload, SLOT, SLOT)
+
+
+def chunked(payload: bytes, size: int) -> list[bytes]:
+    return [payload[start:][:size] for start in range(0, len(payload), size)]
+
+
+REAL_DAY = FIXTURES / "real_day"
+
+
+class TestStreamingParse:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096, 1 << 20])
+    @pytest.mark.parametrize(
+        "endpoint",
+        [
+            "national_fw48h",
+            "national_pt24h",
+            "regional_fw48h",
+            "regional_pt24h",
+            "national_generation_pt24h",
+        ],
+    )
+    def test_streaming_yields_the_identical_snapshot_for_real_payloads(
+        self, endpoint: str, chunk_size: int
+    ) -> None:
+        raw = (REAL_DAY / endpoint / "2024-01-12T0601Z.json").read_bytes()
+        slot = floor_to_slot(utc("2024-01-12T06:01Z"))
+
+        streamed = parse_snapshot_stream(endpoint, chunked(raw, chunk_size), slot, 1)
+
+        assert streamed == parse_snapshot(endpoint, json.loads(raw), slot, 1)
+
+    def test_pretty_printed_payloads_with_extra_keys_stream_identically(self) -> None:
+        payload = {
+            "meta": {"data": [1]},
+            **load_fixture("regional/2023-03-22T1131Z.json"),
+        }
+        raw = json.dumps(payload, indent=4).encode()
+
+        streamed = parse_snapshot_stream(
+            "regional_fw48h", chunked(raw, 100), SLOT, SLOT
+        )
+
+        assert streamed == parse_snapshot("regional_fw48h", payload, SLOT, SLOT)
+
+    def test_a_defective_window_is_rejected_exactly_as_the_dict_parser_rejects_it(
+        self,
+    ) -> None:
+        payload = regional_payload(
+            ("2023-03-22T11:30Z", 50), region_ids=tuple(range(1, 18))
+        )
+        raw = json.dumps(payload).encode()
+
+        with pytest.raises(MalformedSnapshotError, match="18 regions"):
+            parse_snapshot_stream("regional_fw48h", chunked(raw, 64), SLOT, SLOT)
+
+    def test_a_truncated_body_is_a_decode_error_not_a_short_snapshot(self) -> None:
+        raw = json.dumps(
+            national_payload(
+                ("2023-03-22T11:30Z", 41, None), ("2023-03-22T12:00Z", 42, None)
+            )
+        ).encode()
+
+        with pytest.raises(json.JSONDecodeError):
+            parse_snapshot_stream("national_fw48h", [raw[:-40]], SLOT, SLOT)
+
+    def test_a_payload_without_data_is_malformed_like_the_dict_parser_says(
+        self,
+    ) -> None:
+        with pytest.raises(MalformedSnapshotError, match="KeyError: 'data'"):
+            parse_snapshot_stream("national_fw48h", [b'{"error": "x"}'], SLOT, SLOT)
+        with pytest.raises(MalformedSnapshotError, match="KeyError: 'data'"):
+            parse_snapshot("national_fw48h", {"error": "x"}, SLOT, SLOT)
+
+    def test_a_window_of_the_wrong_shape_is_malformed(self) -> None:
+        payload = regional_payload(("2023-03-22T11:30Z", 50))
+        del payload["data"][0]["regions"]
+
+        with pytest.raises(MalformedSnapshotError, match="KeyError: 'regions'"):
+            parse_snapshot("regional_fw48h", payload, SLOT, SLOT)
+
+
+def split_regions(bulk: dict[str, Any]) -> dict[int, dict[str, Any]]:
+    """The one_region_* responses the API would give for the same horizon."""
+    return {
+        region_id: {
+            "data": {
+                "regionid": region_id,
+                "shortname": f"region {region_id}",
+                "data": [
+                    {
+                        "from": window["from"],
+                        "intensity": region["intensity"],
+                        "generationmix": region["generationmix"],
+                    }
+                    for window in bulk["data"]
+                    for region in window["regions"]
+                    if region["regionid"] == region_id
+                ],
+            }
+        }
+        for region_id in range(1, 19)
+    }
+
+
+class TestMergeRegionPayloads:
+    @pytest.mark.parametrize("endpoint", ["regional_fw48h", "regional_pt24h"])
+    def test_merged_single_region_payloads_parse_like_the_bulk_payload(
+        self, endpoint: str
+    ) -> None:
+        raw = (REAL_DAY / endpoint / "2024-01-12T0601Z.json").read_bytes()
+        slot = floor_to_slot(utc("2024-01-12T06:01Z"))
+
+        merged = merge_region_payloads(endpoint, split_regions(json.loads(raw)))
+
+        assert parse_snapshot(endpoint, merged, slot, 1) == parse_snapshot(
+            endpoint, json.loads(raw), slot, 1
+        )
+
+    def test_a_response_for_the_wrong_region_is_malformed(self) -> None:
+        payloads = split_regions(regional_payload(("2023-03-22T11:30Z", 50)))
+        payloads[3] = payloads[4]
+
+        with pytest.raises(MalformedSnapshotError, match="asked for region 3"):
+            merge_region_payloads("regional_fw48h", payloads)
+
+    def test_regions_with_different_horizons_are_malformed(self) -> None:
+        payloads = split_regions(
+            regional_payload(("2023-03-22T11:30Z", 50), ("2023-03-22T12:00Z", 51))
+        )
+        del payloads[7]["data"]["data"][-1]
+
+        with pytest.raises(MalformedSnapshotError, match="horizons disagree"):
+            merge_region_payloads("regional_fw48h", payloads)
+
+
+class TestParseSnapshots:
+    def test_a_process_pool_yields_every_result_in_input_order(self) -> None:
+        slot = floor_to_slot(utc("2024-01-12T06:01Z"))
+        items = [
+            (
+                endpoint,
+                (REAL_DAY / endpoint / "2024-01-12T0601Z.json").read_bytes(),
+                slot,
+            )
+            for endpoint in ("national_fw48h", "regional_fw48h", "regional_pt24h")
+        ] * 3
+        items.insert(4, ("national_fw48h", b"{ not json", slot))
+        items.insert(6, ("national_pt24h", b"[]", slot))
+
+        results = list(parse_snapshots(items, max_workers=2, chunksize=2))
+
+        assert len(results) == len(items)
+        assert [type(r) for r in results].count(Rejected) == 2
+        rejected = [results[4], results[6]]
+        assert isinstance(rejected[0], Rejected)
+        assert rejected[0].reason.startswith("JSONDecodeError: ")
+        assert isinstance(rejected[1], Rejected)
+        for (endpoint, data, capture), result in zip(items, results, strict=True):
+            if not isinstance(result, Rejected):
+                assert result == parse_snapshot(
+                    endpoint, json.loads(data), capture, None
+                )
+
+    def test_one_worker_parses_in_process_with_identical_results(self) -> None:
+        slot = floor_to_slot(utc("2024-01-12T06:01Z"))
+        items = [
+            (
+                endpoint,
+                (REAL_DAY / endpoint / "2024-01-12T0601Z.json").read_bytes(),
+                slot,
+            )
+            for endpoint in ("national_pt24h", "national_generation_pt24h")
+        ]
+
+        inline = list(parse_snapshots(items, max_workers=1))
+
+        assert inline == list(parse_snapshots(items, max_workers=2))
+
+
+class TestColumns:
+    def test_rows_round_trip_with_nulls_through_the_tuple_view(self) -> None:
+        rows = [(SLOT, SLOT, 41, None), (SLOT + 1800, SLOT, None, 43)]
+
+        columns = Columns(NATIONAL_COLUMNS, rows)
+
+        assert list(columns) == rows
+        assert columns[1] == rows[1] and columns[-2] == rows[0]
+        assert columns == tuple(rows)
+        assert columns.nulls(0) is None
+        assert list(columns.nulls(3) or b"") == [1, 0]
+
+    def test_parsed_snapshots_hold_typed_columns_and_feed_executemany(self) -> None:
+        snapshot = parse_snapshot(
+            "regional_fw48h", load_fixture("regional/2023-03-22T1131Z.json"), SLOT, SLOT
+        )
+        connection = sqlite3.connect(":memory:")
+        connection.execute(f"CREATE TABLE r ({', '.join(f'c{i}' for i in range(13))})")
+
+        connection.executemany(
+            f"INSERT INTO r VALUES ({', '.join('?' * 13)})", snapshot.regional
+        )
+
+        assert isinstance(snapshot.regional, Columns)
+        assert snapshot.regional.column(0).itemsize == 8
+        stored = connection.execute("SELECT * FROM r ORDER BY rowid").fetchall()
+        assert stored == list(snapshot.regional)
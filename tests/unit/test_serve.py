@@ -0,0 +1,136 @@
+"""Ingest daemon: slot-aligned firing, drift correction, health file, shutdown."""
+
+import asyncio
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+import cift.serve
+from cift.serve import next_fire_utc
+from cift.serve import serve_ingest
+from tests.conftest import utc
+
+
+class FakeLoopClock:
+    """Wall clock advanced only by the daemon's sleeps, optionally overshooting."""
+
+    def __init__(self, now: datetime, overshoot: float = 0.0):
+        self.now = now.timestamp()
+        self.overshoot = overshoot
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds + self.overshoot
+
+
+class RecordingIngest:
+    def __init__(self, clock: FakeLoopClock, fail_slots: int = 0):
+        self.clock = clock
+        self.fail_slots = fail_slots
+        self.fired: list[float] = []
+
+    def __call__(
+        self,
+        db_root: Path,
+        now: datetime,
+        client: object,
+        max_workers: int,
+        delta: bool = False,
+        on_alert: Callable[[str], None] | None = None,
+        packed: bool = False,
+        compress: bool = False,
+    ) -> Path:
+        self.fired.append(self.clock())
+        if len(self.fired) <= self.fail_slots:
+            raise ConnectionError("api unreachable")
+        return db_root / "inbox" / f"snap_{now:%H%M}.sqlite"
+
+
+def serve(
+    tmp_path: Path,
+    clock: FakeLoopClock,
+    max_slots: int,
+    stop: asyncio.Event | None = None,
+) -> int:
+    return asyncio.run(
+        serve_ingest(
+            db_root=tmp_path,
+            client_factory=object,  # type: ignore[arg-type]
+            health_path=tmp_path / "health.json",
+            stop=stop or asyncio.Event(),
+            clock=clock,
+            sleep=clock.sleep,
+            max_slots=max_slots,
+        )
+    )
+
+
+class TestNextFire:
+    def test_an_unscraped_current_slot_fires_now_and_a_scraped_one_waits(
+        self,
+    ) -> None:
+        now = utc("2023-03-22T11:40Z").timestamp()
+        slot = utc("2023-03-22T11:30Z").timestamp()
+
+        assert next_fire_utc(now, 60, last_slot=None) == slot + 60
+        assert next_fire_utc(now, 60, last_slot=int(slot)) == slot + 1800 + 60
+
+
+class TestServeIngest:
+    def test_fires_each_slot_at_slot_plus_one_minute_despite_sleep_overshoot(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        clock = FakeLoopClock(utc("2023-03-22T11:31Z"), overshoot=0.25)
+        ingest = RecordingIngest(clock)
+        monkeypatch.setattr(cift.serve, "run_ingest", ingest)
+
+        attempted = serve(tmp_path, clock, max_slots=3)
+
+        assert attempted == 3
+        targets = [utc(f"2023-03-22T{t}Z").timestamp() for t in ("11:31", "12:01")]
+        # Sleeps are capped and re-aimed, so overshoot never accumulates.
+        assert ingest.fired[0] == targets[0]
+        assert 0 <= ingest.fired[1] - targets[1] <= 0.25
+        assert max(clock.sleeps) <= cift.serve.MAX_SLEEP_SECONDS
+
+    def test_the_health_file_records_the_last_successful_slot(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        clock = FakeLoopClock(utc("2023-03-22T11:31Z"))
+        ingest = RecordingIngest(clock, fail_slots=1)
+        monkeypatch.setattr(cift.serve, "run_ingest", ingest)
+
+        serve(tmp_path, clock, max_slots=2)
+
+        health = json.loads((tmp_path / "health.json").read_text())
+        assert len(ingest.fired) == 2  # the failed first slot did not stop the loop
+        assert health["last_success_slot"] == "2023-03-22T12:00Z"
+        assert health["seconds_after_slot"] == 60
+
+    def test_a_stop_request_ends_the_loop_without_another_scrape(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        clock = FakeLoopClock(utc("2023-03-22T11:35Z"))
+        ingest = RecordingIngest(clock)
+        monkeypatch.setattr(cift.serve, "run_ingest", ingest)
+        stop = asyncio.Event()
+        real_sleep = clock.sleep
+
+        async def sleep_then_stop(seconds: float) -> None:
+            await real_sleep(seconds)
+            stop.set()
+
+        clock.sleep = sleep_then_stop  # type: ignore[method-assign]
+
+        attempted = serve(tmp_path, clock, max_slots=5, stop=stop)
+
+        assert attempted == 1
+        health = json.loads((tmp_path / "health.json").read_text())
+        assert health["last_success_slot"] == "2023-03-22T11:30Z"
@@ -11,10 +11,12 @@ import pytest
 
 import cift.store
 from cift.ingest import run_ingest
+from cift.parse import ENDPOINTS
 from cift.parse import Snapshot
 from cift.parse import floor_to_slot
 from cift.parse import parse_snapshot
 from cift.store import ConflictingObservationsError
+from cift.store import IngestMetrics
 from cift.store import PartitionSizeError
 from cift.store import SchemaVersionError
 from cift.store import Store
@@ -53,6 +55,7 @@ class TestSchema:
             "regional_intensity",
             "generation_mix",
             "captures",
+            "ingest_metrics",
             "capture_gaps",
         }
         assert pragma == {
@@ -366,6 +369,31 @@ class TestCompactionGuards:
         ).exists()
         assert [f for _c, f, _a in store.national_trajectory(utc(window))] == [11]
 
+    def test_the_out_of_order_check_queries_no_partition(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        window = "2023-03-20T11:00Z"
+        ingest_national(tmp_path, "2023-03-20T10:31Z", (window, 11, None))
+        Store(tmp_path).compact(now=utc("2023-03-23T12:00Z"))
+        ingest_national(tmp_path, "2023-03-20T10:01Z", (window, 10, None))
+        log = spy_connect(monkeypatch)
+
+        report = Store(tmp_path).compact(now=utc("2023-03-23T12:00Z"))
+
+        assert report.quarantined == ("snap_2023-03-20T1000Z.sqlite",)
+        assert not [line for line in log if "national_2023-03" in line]
+
+    def test_a_late_inbox_is_caught_without_a_catalog_too(self, tmp_path: Path) -> None:
+        window = "2023-03-20T11:00Z"
+        ingest_national(tmp_path, "2023-03-20T10:31Z", (window, 11, None))
+        Store(tmp_path).compact(now=utc("2023-03-23T12:00Z"))
+        (tmp_path / "catalog.sqlite").unlink()
+        ingest_national(tmp_path, "2023-03-20T10:01Z", (window, 10, None))
+
+        report = Store(tmp_path).compact(now=utc("2023-03-23T12:00Z"))
+
+        assert report.quarantined == ("snap_2023-03-20T1000Z.sqlite",)
+
     def test_a_partition_approaching_the_size_limit_fails_the_merge_loudly(
         self, tmp_path: Path
     ) -> None:
@@ -483,12 +511,12 @@ class TestCompactionGuards:
         real_open = cift.store._open
         opened: list[str] = []
 
-        def failing_open(path: Path, ddl: str = cift.store._DDL) -> object:
+        def failing_open(path: Path, *args: Any) -> object:
             if path.name.startswith("regional_") and path.name not in opened:
                 opened.append(path.name)
                 if len(opened) == 2:
                     raise RuntimeError("injected crash before the second partition")
-            return real_open(path, ddl)
+            return real_open(path, *args)
 
         monkeypatch.setattr(cift.store, "_open", failing_open)
         with pytest.raises(RuntimeError, match="injected crash"):
@@ -555,3 +583,705 @@ class TestReconstructionProperty:
                 )
             ]
             assert reconstructed == sorted(full_fidelity), (window_utc, region_id)
+
+
+REAL_SLOTS = ["0601Z", "0631Z", "0701Z", "0731Z", "0801Z", "0831Z"]
+
+
+def real_day_snapshots(slot_name: str) -> list[Snapshot]:
+    slot = floor_to_slot(utc(f"2024-01-12T{slot_name[:2]}:{slot_name[2:4]}Z"))
+    return [
+        parse_snapshot(
+            endpoint,
+            load_fixture(f"real_day/{endpoint}/2024-01-12T{slot_name}.json"),
+            slot,
+            slot,
+        )
+        for endpoint in ENDPOINTS
+    ]
+
+
+def partition_contents(db_root: Path) -> dict[str, dict[str, list[Any]]]:
+    contents = {}
+    for path in sorted(db_root.glob("[0-9][0-9][0-9][0-9]/*.sqlite")):
+        connection = sqlite3.connect(path)
+        contents[path.name] = {
+            table: sorted(connection.execute(f"SELECT * FROM {table}"))
+            for table in (
+                "national_intensity",
+                "regional_intensity",
+                "generation_mix",
+                "captures",
+            )
+        }
+        connection.close()
+    return contents
+
+
+def inbox_rows(store: Store, table: str) -> int:
+    total = 0
+    for path in store.inbox_dir.glob("snap_*.sqlite"):
+        connection = sqlite3.connect(path)
+        total += connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        connection.close()
+    return total
+
+
+class TestDeltaInboxes:
+    def test_delta_inboxes_compact_to_exactly_what_full_inboxes_do(
+        self, tmp_path: Path
+    ) -> None:
+        """Half the day diffs against unmerged inboxes, the rest against the
+        partition tail left by a compaction in between."""
+        full, delta = Store(tmp_path / "full"), Store(tmp_path / "delta")
+        after_the_day = utc("2024-01-13T02:12Z")
+        for store, sparse in ((full, False), (delta, True)):
+            for slot_name in REAL_SLOTS[:3]:
+                store.write_inbox(real_day_snapshots(slot_name), delta=sparse)
+            store.compact(now=after_the_day)
+            for slot_name in REAL_SLOTS[3:]:
+                store.write_inbox(real_day_snapshots(slot_name), delta=sparse)
+
+        assert inbox_rows(delta, "regional_intensity") < inbox_rows(
+            full, "regional_intensity"
+        )
+        assert inbox_rows(delta, "captures") == inbox_rows(full, "captures")
+        full.compact(now=after_the_day)
+        delta.compact(now=after_the_day)
+        assert partition_contents(delta.db_root) == partition_contents(full.db_root)
+        assert partition_contents(full.db_root)
+
+    def test_consecutive_deltas_compact_to_exactly_what_full_inboxes_do(
+        self, tmp_path: Path
+    ) -> None:
+        full, delta = Store(tmp_path / "full"), Store(tmp_path / "delta")
+        for slot_name in REAL_SLOTS:
+            full.write_inbox(real_day_snapshots(slot_name))
+            delta.write_inbox(real_day_snapshots(slot_name), delta=True)
+
+        full.compact(now=utc("2024-01-13T02:12Z"))
+        delta.compact(now=utc("2024-01-13T02:12Z"))
+
+        assert partition_contents(delta.db_root) == partition_contents(full.db_root)
+
+    def test_a_delta_base_is_always_stored_in_full(self, tmp_path: Path) -> None:
+        store = Store(tmp_path)
+        for slot_name in REAL_SLOTS:
+            store.write_inbox(real_day_snapshots(slot_name), delta=True)
+
+        bases = {}
+        for path in store.inbox_dir.glob("snap_*.sqlite"):
+            connection = sqlite3.connect(path)
+            (slot,) = connection.execute(
+                "SELECT MIN(capture_utc) FROM captures"
+            ).fetchone()
+            if cift.store._has_table(connection, "delta_bases"):
+                bases[slot] = dict(connection.execute("SELECT * FROM delta_bases"))
+            else:
+                bases[slot] = {}
+            connection.close()
+
+        assert any(bases.values())
+        for by_table in bases.values():
+            for table, base in by_table.items():
+                assert table not in bases[base]
+
+    def test_a_delta_whose_base_vanished_is_quarantined_not_misapplied(
+        self, tmp_path: Path
+    ) -> None:
+        store = Store(tmp_path)
+        base = store.write_inbox(real_day_snapshots(REAL_SLOTS[0]))
+        sparse = store.write_inbox(real_day_snapshots(REAL_SLOTS[1]), delta=True)
+        base.unlink()
+
+        report = store.compact(now=utc("2024-01-13T02:12Z"))
+
+        assert report.quarantined == (sparse.name,)
+        assert partition_contents(tmp_path) == {}
+
+
+class TestPackedInboxes:
+    def test_packed_inboxes_read_and_compact_exactly_as_databases_do(
+        self, tmp_path: Path
+    ) -> None:
+        """Packed, compressed and delta packs against a database baseline, with
+        telemetry so text, real and NULL columns round-trip too."""
+        # (packed, compress, delta)
+        variants = {
+            "database": (False, False, False),
+            "packed": (True, False, False),
+            "compressed": (True, True, False),
+            "delta": (True, False, True),
+        }
+        stores = {name: Store(tmp_path / name) for name in variants}
+        for name, (packed, compress, delta) in variants.items():
+            for slot_name in REAL_SLOTS:
+                snapshots = real_day_snapshots(slot_name)
+                metrics = [
+                    IngestMetrics(
+                        snapshot.capture_utc,
+                        snapshot.endpoint,
+                        snapshot.capture_utc,
+                        fetch_seconds=0.25,
+                        retries=None,
+                        row_count=-1,
+                        error="HTTPError: 502",
+                    )
+                    for snapshot in snapshots
+                ]
+                stores[name].write_inbox(
+                    snapshots, metrics, delta=delta, packed=packed, compress=compress
+                )
+        baseline = stores["database"]
+
+        for name, store in stores.items():
+            suffix = ".sqlite" if name == "database" else ".pack"
+            assert {path.suffix for path in store.inbox_dir.iterdir()} == {suffix}
+            assert store.capture_records() == baseline.capture_records()
+            assert store.ingest_metrics() == baseline.ingest_metrics()
+            assert sorted(store.national_rows()) == sorted(baseline.national_rows())
+            store.compact(now=utc("2024-01-13T02:12Z"))
+        for store in stores.values():
+            assert partition_contents(store.db_root) == partition_contents(
+                baseline.db_root
+            )
+            assert not list(store.inbox_dir.glob("snap_*"))
+
+    def test_a_slot_published_in_one_format_is_never_republished_in_the_other(
+        self, tmp_path: Path
+    ) -> None:
+        store = Store(tmp_path)
+        first = store.write_inbox(real_day_snapshots(REAL_SLOTS[0]))
+
+        second = store.write_inbox(real_day_snapshots(REAL_SLOTS[0]), packed=True)
+
+        assert second == first
+        assert list(store.inbox_dir.iterdir()) == [first]
+
+    def test_a_pack_is_smaller_than_the_database_it_replaces(
+        self, tmp_path: Path
+    ) -> None:
+        database = Store(tmp_path / "database").write_inbox(
+            real_day_snapshots(REAL_SLOTS[0])
+        )
+        pack = Store(tmp_path / "packed").write_inbox(
+            real_day_snapshots(REAL_SLOTS[0]), packed=True
+        )
+
+        assert pack.read_bytes().startswith(b"CIFTPACK1 none\n")
+        assert pack.stat().st_size < database.stat().st_size / 4
+
+
+def real_day_inboxes(db_root: Path) -> Store:
+    store = Store(db_root)
+    for slot_name in REAL_SLOTS:
+        store.write_inbox(real_day_snapshots(slot_name))
+    return store
+
+
+class TestBatchedCompaction:
+    def test_a_day_is_merged_as_one_inbox_at_a_time_would_merge_it(
+        self, tmp_path: Path
+    ) -> None:
+        one_by_one = real_day_inboxes(tmp_path / "one_by_one")
+        while one_by_one.compact(
+            now=utc("2024-01-13T02:12Z"), max_inboxes=1
+        ).merged_inboxes:
+            pass
+
+        report = real_day_inboxes(tmp_path / "batched").compact(
+            now=utc("2024-01-13T02:12Z")
+        )
+
+        assert report.merged_inboxes == len(REAL_SLOTS)
+        assert partition_contents(tmp_path / "batched") == partition_contents(
+            tmp_path / "one_by_one"
+        )
+
+    def test_each_partition_commits_once_per_day(self, tmp_path: Path) -> None:
+        single = Store(tmp_path / "single")
+        single.write_inbox(real_day_snapshots(REAL_SLOTS[0]))
+        single.compact(now=utc("2024-01-13T02:12Z"))
+
+        real_day_inboxes(tmp_path / "day").compact(now=utc("2024-01-13T02:12Z"))
+
+        for path in sorted((tmp_path / "single").glob("2024/*.sqlite")):
+            day = tmp_path / "day" / "2024" / path.name
+            assert cift.store._header(day)[0] == cift.store._header(path)[0]
+
+    def test_partitions_written_concurrently_match_those_written_in_turn(
+        self, tmp_path: Path
+    ) -> None:
+        real_day_inboxes(tmp_path / "in_turn").compact(now=utc("2024-01-13T02:12Z"))
+
+        report = real_day_inboxes(tmp_path / "concurrent").compact(
+            now=utc("2024-01-13T02:12Z"), max_workers=4
+        )
+
+        assert report.merged_inboxes == len(REAL_SLOTS)
+        assert len(partition_contents(tmp_path / "concurrent")) > 1
+        assert partition_contents(tmp_path / "concurrent") == partition_contents(
+            tmp_path / "in_turn"
+        )
+
+    def test_one_oversized_partition_rolls_back_every_concurrent_writer(
+        self, tmp_path: Path
+    ) -> None:
+        store = real_day_inboxes(tmp_path)
+        store.partition_size_limit = 40 * 1024  # only the regional one is larger
+
+        with pytest.raises(PartitionSizeError, match="regional_2024-01a"):
+            store.compact(now=utc("2024-01-13T02:12Z"), max_workers=4)
+
+        assert len(cift.store._inbox_files(store.inbox_dir)) == len(REAL_SLOTS)
+        for tables in partition_contents(tmp_path).values():
+            assert tables["captures"] == []
+
+    def test_a_batch_interrupted_after_committing_merges_again_identically(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        real_day_inboxes(tmp_path / "clean").compact(now=utc("2024-01-13T02:12Z"))
+        store = real_day_inboxes(tmp_path / "interrupted")
+        real_unlink = Path.unlink
+
+        def crash(path: Path, missing_ok: bool = False) -> None:
+            if path.name.startswith("snap_"):
+                raise KeyboardInterrupt
+            real_unlink(path, missing_ok)
+
+        monkeypatch.setattr(Path, "unlink", crash)
+        with pytest.raises(KeyboardInterrupt):
+            store.compact(now=utc("2024-01-13T02:12Z"))
+        monkeypatch.setattr(Path, "unlink", real_unlink)
+
+        report = Store(tmp_path / "interrupted").compact(now=utc("2024-01-13T02:12Z"))
+
+        assert (report.merged_inboxes, report.quarantined) == (len(REAL_SLOTS), ())
+        assert partition_contents(tmp_path / "interrupted") == partition_contents(
+            tmp_path / "clean"
+        )
+
+
+def tails(db_root: Path) -> dict[str, list[Any]]:
+    """Every partition's regional tail, and what the change-log says it must be."""
+    found = {}
+    for path in sorted(db_root.glob("2024/regional_*.sqlite")):
+        connection = sqlite3.connect(path)
+        found[path.name] = connection.execute(
+            "SELECT * FROM latest_regional_intensity"
+        ).fetchall()
+        found[f"{path.name} change-log"] = connection.execute(
+            "SELECT window_utc, region_id, MAX(capture_utc), forecast, biomass, coal,"
+            " gas, hydro, imports, nuclear, other, solar, wind FROM regional_intensity"
+            " GROUP BY window_utc, region_id"
+        ).fetchall()
+        connection.close()
+    return found
+
+
+class TestChangeLogTails:
+    def test_the_tail_holds_each_keys_latest_stored_row(self, tmp_path: Path) -> None:
+        store = real_day_inboxes(tmp_path)
+        store.compact(now=utc("2024-01-13T02:12Z"), max_inboxes=2)
+        store.compact(now=utc("2024-01-13T02:12Z"))
+
+        found = tails(tmp_path)
+
+        assert found["regional_2024-01a.sqlite"]
+        assert (
+            found["regional_2024-01a.sqlite"]
+            == found["regional_2024-01a.sqlite change-log"]
+        )
+
+    def test_merging_reads_the_tail_not_the_change_log(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        store = real_day_inboxes(tmp_path)
+        store.compact(now=utc("2024-01-13T02:12Z"), max_inboxes=2)
+        log = spy_connect(monkeypatch)
+
+        Store(tmp_path).compact(now=utc("2024-01-13T02:12Z"))
+
+        assert not [line for line in log if "GROUP BY" in line]
+
+    def test_a_partition_without_a_tail_rebuilds_it_and_merges_the_same(
+        self, tmp_path: Path
+    ) -> None:
+        for name in ("with_tail", "without_tail"):
+            real_day_inboxes(tmp_path / name).compact(
+                now=utc("2024-01-13T02:12Z"), max_inboxes=2
+            )
+        partition = tmp_path / "without_tail" / "2024" / "regional_2024-01a.sqlite"
+        connection = sqlite3.connect(partition)
+        connection.execute("DROP TABLE latest_regional_intensity")
+        connection.close()
+
+        for name in ("with_tail", "without_tail"):
+            Store(tmp_path / name).compact(now=utc("2024-01-13T02:12Z"))
+
+        assert partition_contents(tmp_path / "without_tail") == partition_contents(
+            tmp_path / "with_tail"
+        )
+        assert tails(tmp_path / "without_tail") == tails(tmp_path / "with_tail")
+
+    def test_a_sealed_partition_closes_without_its_tail(self, tmp_path: Path) -> None:
+        real_day_inboxes(tmp_path).compact(now=utc("2024-01-13T02:12Z"))
+        before = partition_contents(tmp_path)
+
+        Store(tmp_path).compact(now=utc("2024-02-20T02:12Z"))
+
+        partition = tmp_path / "2024" / "regional_2024-01a.sqlite"
+        connection = sqlite3.connect(partition)
+        assert not cift.store._has_tails(connection)
+        (free,) = connection.execute("PRAGMA freelist_count").fetchone()
+        connection.close()
+        assert free == 0
+        assert partition_contents(tmp_path) == before
+
+    def test_closed_partitions_are_not_opened_again(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        real_day_inboxes(tmp_path).compact(now=utc("2024-01-13T02:12Z"))
+        Store(tmp_path).compact(now=utc("2024-02-20T02:12Z"))
+        log = spy_connect(monkeypatch)
+
+        with Store(tmp_path) as store:
+            store.compact(now=utc("2024-02-21T02:12Z"))
+            # The year's generation partition stays open to merges.
+            assert [
+                info.path.name for info in store.partitions() if info.has_tails
+            ] == ["generation_2024.sqlite"]
+
+        assert [line for line in log if line.startswith("connect")] == [
+            "connect catalog.sqlite?mode=ro"
+        ]
+
+
+STATS = {
+    "forecast_count": 100,
+    "abs_err_mean": 20.0,
+    "abs_err_sem": 0.5,
+    "abs_err_ci95_lo": 19.0,
+    "abs_err_ci95_hi": 21.0,
+    "pc_err_mean": 10.0,
+    "pc_err_sem": 0.2,
+    "pc_err_ci95_lo": 9.6,
+    "pc_err_ci95_hi": 10.4,
+}
+
+
+def spy_connect(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record every connection opened, and every statement run on them."""
+    real_connect = sqlite3.connect
+    log: list[str] = []
+
+    def connect(path: Any, *args: Any, **kwargs: Any) -> sqlite3.Connection:
+        log.append(f"connect {Path(str(path)).name}")
+        connection = real_connect(path, *args, **kwargs)
+        connection.set_trace_callback(log.append)
+        return connection
+
+    monkeypatch.setattr(cift.store.sqlite3, "connect", connect)
+    return log
+
+
+class TestConnectionCache:
+    def test_repeated_reads_reuse_one_connection_per_partition(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        ingest_national(tmp_path, "2023-03-22T11:31Z", ("2023-03-22T11:30Z", 41, None))
+        Store(tmp_path).compact(now=utc("2023-03-24T02:12Z"))
+        log = spy_connect(monkeypatch)
+
+        with Store(tmp_path) as store:
+            for _ in range(5):
+                store.national_trajectory(utc("2023-03-22T11:30Z"))
+
+        # Read-only first, to see it is closed, then immutable from then on.
+        assert [line for line in log if line.startswith("connect")] == [
+            "connect national_2023-03.sqlite?mode=ro",
+            "connect national_2023-03.sqlite?mode=ro&immutable=1",
+        ]
+
+    def test_schema_is_prepared_once_per_file_per_store(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        with Store(tmp_path) as store:
+            store.record_stats("2023-10-17", STATS)
+            store.close()
+            log = spy_connect(monkeypatch)
+            store.record_stats("2023-10-18", STATS)
+
+        assert log[0] == "connect analysis.sqlite"
+        assert not [line for line in log if "CREATE" in line or "user_version" in line]
+        assert list(store._prepared) == [
+            (tmp_path / "analysis.sqlite", cift.store._ANALYSIS_DDL)
+        ]
+
+    def test_the_cache_is_bounded_and_closes_what_it_evicts(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        ingest_national(tmp_path, "2023-03-22T11:31Z", ("2023-03-22T11:30Z", 41, None))
+        ingest_national(tmp_path, "2023-04-22T11:31Z", ("2023-04-22T11:30Z", 42, None))
+        Store(tmp_path).compact(now=utc("2023-04-24T02:12Z"))
+        log = spy_connect(monkeypatch)
+
+        with Store(tmp_path, max_connections=1) as store:
+            for _ in range(2):
+                store.national_trajectory(utc("2023-03-22T11:30Z"))
+                store.national_trajectory(utc("2023-04-22T11:30Z"))
+            assert len(store._readers) == 1
+
+        opened = [line for line in log if line.startswith("connect")]
+        assert opened == 2 * [
+            "connect national_2023-03.sqlite?mode=ro",
+            "connect national_2023-03.sqlite?mode=ro&immutable=1",
+            "connect national_2023-04.sqlite?mode=ro",
+            "connect national_2023-04.sqlite?mode=ro&immutable=1",
+        ]
+
+    def test_a_failed_batch_leaves_nothing_behind(self, tmp_path: Path) -> None:
+        store = Store(tmp_path)
+
+        with pytest.raises(RuntimeError):
+            with store.batch():
+                store.record_stats("2023-10-17", STATS)
+                store.record_stats("2023-10-18", STATS)
+                raise RuntimeError("analysis failed")
+
+        assert store.stats_history() == []
+        store.close()
+
+    def test_a_batch_is_one_transaction_visible_once_it_ends(
+        self, tmp_path: Path
+    ) -> None:
+        store = Store(tmp_path)
+
+        with store.batch():
+            store.record_stats("2023-10-17", STATS)
+            with store.batch():
+                store.record_stats("2023-10-18", STATS)
+            assert Store(tmp_path).stats_history() == []
+
+        assert len(Store(tmp_path).stats_history()) == 2
+        store.close()
+
+    def test_a_closed_store_reopens_on_demand(self, tmp_path: Path) -> None:
+        store = Store(tmp_path)
+        store.record_stats("2023-10-17", STATS)
+        store.close()
+
+        store.record_stats("2023-10-18", STATS)
+
+        assert len(store.stats_history()) == 2
+        store.close()
+
+
+class TestReaders:
+    def test_reads_write_nothing_to_or_beside_a_partition(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        for slot_name in REAL_SLOTS:
+            Store(tmp_path).write_inbox(real_day_snapshots(slot_name))
+        Store(tmp_path).compact(now=utc("2024-01-13T02:12Z"))
+        before = {path: path.stat().st_mtime_ns for path in tmp_path.rglob("*")}
+        log = spy_connect(monkeypatch)
+
+        with Store(tmp_path) as store:
+            store.national_rows()
+            store.capture_records()
+            store.ingest_metrics()
+            store.national_trajectory(utc("2024-01-12T11:30Z"))
+            store.regional_trajectory(utc("2024-01-12T11:30Z"), 1)
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                store._reader(tmp_path / "2024" / "national_2024-01.sqlite").execute(
+                    "DELETE FROM national_intensity"
+                )
+
+        assert {path: path.stat().st_mtime_ns for path in tmp_path.rglob("*")} == before
+        assert not [
+            line for line in log if line.startswith(("CREATE", "PRAGMA user_version ="))
+        ]
+
+    def test_a_delta_ingest_reads_its_base_without_touching_a_partition(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        for slot_name in REAL_SLOTS[:-1]:
+            Store(tmp_path).write_inbox(real_day_snapshots(slot_name))
+        Store(tmp_path).compact(now=utc("2024-01-13T02:12Z"))
+        partitions = sorted(tmp_path.glob("2024/*"))
+        before = {path: path.stat().st_mtime_ns for path in partitions}
+        log = spy_connect(monkeypatch)
+        client = FixtureClient(
+            {
+                endpoint: load_fixture(f"real_day/{endpoint}/2024-01-12T0831Z.json")
+                for endpoint in ENDPOINTS
+            }
+        )
+
+        inbox = run_ingest(tmp_path, utc("2024-01-12T08:31Z"), client, delta=True)
+
+        written = sqlite3.connect(inbox)
+        assert written.execute("SELECT * FROM delta_bases").fetchall()
+        written.close()
+        assert sorted(tmp_path.glob("2024/*")) == partitions
+        assert {path: path.stat().st_mtime_ns for path in partitions} == before
+        assert not [
+            line
+            for line in log
+            if line.startswith(
+                ("connect national_", "connect regional_", "connect generation_")
+            )
+            and "mode=ro" not in line
+        ]
+
+    def test_a_partition_an_unmerged_inbox_can_reach_is_not_immutable(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        ingest_national(tmp_path, "2023-03-22T11:31Z", ("2023-03-22T11:30Z", 41, None))
+        Store(tmp_path).compact(now=utc("2023-03-24T02:12Z"))
+        ingest_national(tmp_path, "2023-04-01T11:31Z", ("2023-04-01T11:30Z", 41, None))
+        log = spy_connect(monkeypatch)
+
+        with Store(tmp_path) as store:
+            store.national_trajectory(utc("2023-03-22T11:30Z"))
+
+        assert log[0] == "connect national_2023-03.sqlite?mode=ro"
+
+    def test_a_partition_compacted_into_after_a_read_is_read_afresh(
+        self, tmp_path: Path
+    ) -> None:
+        ingest_national(tmp_path, "2023-03-22T11:31Z", ("2023-03-22T11:30Z", 41, None))
+        store = Store(tmp_path)
+        store.compact(now=utc("2023-03-24T02:12Z"))
+        assert len(store.national_trajectory(utc("2023-03-22T11:30Z"))) == 1
+
+        ingest_national(
+            tmp_path,
+            "2023-03-22T12:01Z",
+            ("2023-03-22T11:30Z", 41, 43),
+            endpoint="national_pt24h",
+        )
+        store.compact(now=utc("2023-03-24T02:12Z"))
+
+        assert len(store.national_trajectory(utc("2023-03-22T11:30Z"))) == 2
+        store.close()
+
+
+class TestCatalog:
+    def test_compaction_catalogues_each_partition_as_opening_it_would(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        ingest_national(tmp_path, "2023-03-22T11:31Z", ("2023-03-22T11:30Z", 41, None))
+        ingest_national(tmp_path, "2023-04-22T11:31Z", ("2023-04-22T11:30Z", 42, None))
+        ingest_national(tmp_path, "2023-04-22T12:01Z", ("2023-04-22T12:00Z", 43, None))
+        Store(tmp_path).compact(now=utc("2023-04-24T02:12Z"))
+        log = spy_connect(monkeypatch)
+
+        with Store(tmp_path) as store:
+            march, april = store.partitions()
+
+        assert [line for line in log if line.startswith("connect")] == [
+            "connect catalog.sqlite?mode=ro"
+        ]
+        assert april.path == tmp_path / "2023" / "national_2023-04.sqlite"
+        assert (april.kind, april.row_count) == ("national", 2)
+        assert april.window_first_utc == int(utc("2023-04-22T11:30Z").timestamp())
+        assert april.capture_last_utc == int(utc("2023-04-22T12:00Z").timestamp())
+        assert april.page_count * 4096 == april.path.stat().st_size
+        assert march.row_count == 1
+        assert march.fingerprint != april.fingerprint
+
+    def test_partitions_changed_behind_its_back_are_described_afresh(
+        self, tmp_path: Path
+    ) -> None:
+        ingest_national(tmp_path, "2023-03-22T11:31Z", ("2023-03-22T11:30Z", 41, None))
+        ingest_national(tmp_path, "2023-04-22T11:31Z", ("2023-04-22T11:30Z", 42, None))
+        Store(tmp_path).compact(now=utc("2023-04-24T02:12Z"))
+        march = tmp_path / "2023" / "national_2023-03.sqlite"
+        connection = sqlite3.connect(march)
+        with connection:
+            connection.execute("DELETE FROM national_intensity")
+        connection.close()
+        (tmp_path / "2023" / "national_2023-04.sqlite").unlink()
+        store = Store(tmp_path)
+
+        assert [info.row_count for info in store.partitions()] == [0]
+        store.refresh_catalog()
+        catalog = sqlite3.connect(store.catalog_path)
+        assert catalog.execute("SELECT name, row_count FROM partitions").fetchall() == [
+            ("2023/national_2023-03.sqlite", 0)
+        ]
+        catalog.close()
+        store.close()
+
+    def test_capture_records_since_skips_partitions_of_older_captures(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        ingest_national(tmp_path, "2023-03-22T11:31Z", ("2023-03-22T11:30Z", 41, None))
+        ingest_national(tmp_path, "2023-04-22T11:31Z", ("2023-04-22T11:30Z", 42, None))
+        Store(tmp_path).compact(now=utc("2023-04-24T02:12Z"))
+        log = spy_connect(monkeypatch)
+
+        with Store(tmp_path) as store:
+            records = store.capture_records(
+                since_utc=int(utc("2023-04-01T00:00Z").timestamp())
+            )
+
+        assert [slot for slot, *_ in records] == [
+            int(utc("2023-04-22T11:30Z").timestamp())
+        ]
+        assert "connect national_2023-03.sqlite?mode=ro&immutable=1" not in log
+
+
+class TestBoundedReads:
+    def test_only_partitions_and_inboxes_meeting_the_bounds_are_opened(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        ingest_national(tmp_path, "2023-03-22T11:31Z", ("2023-03-22T11:30Z", 41, None))
+        ingest_national(tmp_path, "2023-04-22T11:31Z", ("2023-04-22T11:30Z", 42, None))
+        Store(tmp_path).compact(now=utc("2023-04-24T02:12Z"))
+        ingest_national(tmp_path, "2023-04-24T11:31Z", ("2023-04-24T11:30Z", 43, None))
+        ingest_national(tmp_path, "2023-04-25T11:31Z", ("2023-04-25T11:30Z", 44, None))
+        log = spy_connect(monkeypatch)
+
+        with Store(tmp_path) as store:
+            rows = store.national_rows(
+                window_from=int(utc("2023-04-01T00:00Z").timestamp()),
+                capture_to=int(utc("2023-04-24T12:00Z").timestamp()),
+            )
+
+        assert {forecast for _w, _c, forecast, _a in rows} == {42, 43}
+        connected = [line for line in log if line.startswith("connect")]
+        assert not any("national_2023-03" in line for line in connected)
+        assert not any("2023-04-25" in line for line in connected)
+        assert any("national_intensity WHERE window_utc >= " in line for line in log)
+
+    def test_bounded_reads_are_the_full_reads_filtered(self, tmp_path: Path) -> None:
+        store = Store(tmp_path)
+        for slot_name in REAL_SLOTS[:3]:
+            store.write_inbox(real_day_snapshots(slot_name))
+        store.compact(now=utc("2024-01-13T02:12Z"), max_inboxes=2)
+        for slot_name in REAL_SLOTS[3:]:
+            store.write_inbox(real_day_snapshots(slot_name), delta=True)
+        window_from = int(utc("2024-01-11T09:00Z").timestamp())
+        window_to = int(utc("2024-01-12T09:00Z").timestamp())
+        capture_from = int(utc("2024-01-12T06:30Z").timestamp())
+
+        for read, capture_column in (
+            (store.national_rows, 1),
+            (store.regional_rows, 2),
+            (store.generation_rows, 1),
+        ):
+            expected = [
+                row
+                for row in read()
+                if window_from <= row[0] <= window_to
+                and row[capture_column] >= capture_from
+            ]
+            bounded = read(
+                window_from=window_from, window_to=window_to, capture_from=capture_from
+            )
+            assert expected
+            assert sorted(bounded) == sorted(expected)
+        store.close()
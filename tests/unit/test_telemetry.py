@@ -0,0 +1,78 @@
+"""Ingest telemetry trends: nearest-rank percentiles per day and endpoint."""
+
+from cift.store import IngestMetrics
+from cift.telemetry import format_trends
+from cift.telemetry import ingest_trends
+from cift.telemetry import percentile
+from tests.conftest import utc
+
+SLOT = int(utc("2023-03-22T11:30Z").timestamp())
+
+
+def scrape(
+    slot: int,
+    fetch_seconds: float,
+    endpoint: str = "national_fw48h",
+    late: int = 60,
+    error: str | None = None,
+) -> IngestMetrics:
+    return IngestMetrics(
+        capture_utc=slot,
+        endpoint=endpoint,
+        observed_utc=slot + late,
+        fetch_seconds=fetch_seconds,
+        retries=1 if error else 0,
+        payload_bytes=None if error else 2000,
+        parse_seconds=None if error else 0.01,
+        row_count=0 if error else 96,
+        error=error,
+    )
+
+
+class TestPercentile:
+    def test_nearest_rank_always_returns_an_observed_value(self) -> None:
+        values = [float(v) for v in range(1, 21)]
+
+        assert percentile(values, 0.5) == 10.0
+        assert percentile(values, 0.95) == 19.0
+        assert percentile([7.0], 0.95) == 7.0
+
+
+class TestIngestTrends:
+    def test_scrapes_group_by_utc_day_and_endpoint_with_failures_counted(
+        self,
+    ) -> None:
+        metrics = [
+            scrape(SLOT, 0.5),
+            scrape(SLOT + 1800, 1.5, late=600),
+            scrape(SLOT + 3600, 30.0, error="ReadTimeout: slow"),
+            scrape(SLOT, 0.2, endpoint="regional_fw48h"),
+            scrape(SLOT + 86400, 0.4),
+        ]
+
+        trends = ingest_trends(metrics)
+
+        assert [(t.day, t.endpoint, t.scrapes) for t in trends] == [
+            ("2023-03-22", "national_fw48h", 3),
+            ("2023-03-22", "regional_fw48h", 1),
+            ("2023-03-23", "national_fw48h", 1),
+        ]
+        busy = trends[0]
+        assert (busy.failures, busy.retries) == (1, 1)
+        assert (busy.fetch_p50, busy.fetch_p95) == (1.5, 30.0)
+        assert (busy.late_p50, busy.late_p95) == (60.0, 600.0)
+        assert busy.parse_p50 == 0.01 and busy.payload_bytes_p50 == 2000
+
+    def test_only_captures_since_the_cutoff_are_summarised(self) -> None:
+        metrics = [scrape(SLOT, 0.5), scrape(SLOT + 86400, 0.4)]
+
+        trends = ingest_trends(metrics, since_utc=SLOT + 86400)
+
+        assert [t.day for t in trends] == ["2023-03-23"]
+
+    def test_the_report_has_a_header_and_a_line_per_trend(self) -> None:
+        lines = format_trends(ingest_trends([scrape(SLOT, 30.0, error="boom")]))
+
+        assert lines[0].split()[:3] == ["day", "endpoint", "n"]
+        assert lines[1].split()[:5] == ["2023-03-22", "national_fw48h", "1", "1", "1"]
+        assert lines[1].split()[-1] == "-"  # no payload size on a failed scrape
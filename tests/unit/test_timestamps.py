@@ -0,0 +1,67 @@
+"""Timestamp codec: agrees with strptime everywhere, validates window runs."""
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from cift.timestamps import HalfHourRun
+from cift.timestamps import WindowSequenceError
+from cift.timestamps import compact_to_epoch
+from cift.timestamps import to_epoch
+
+
+def reference(timestamp: str, fmt: str = "%Y-%m-%dT%H:%MZ") -> int:
+    return int(
+        datetime.strptime(timestamp, fmt).replace(tzinfo=timezone.utc).timestamp()
+    )
+
+
+class TestToEpoch:
+    def test_matches_strptime_for_every_minute_step_across_leap_years(self) -> None:
+        start = datetime(1999, 12, 31, 0, 0, tzinfo=timezone.utc)
+        for step in range(0, 30 * 366 * 24 * 60, 7919):  # prime stride hits all fields
+            stamp = (start + timedelta(minutes=step)).strftime("%Y-%m-%dT%H:%MZ")
+            assert to_epoch(stamp) == reference(stamp), stamp
+
+    def test_leap_days_and_year_boundaries(self) -> None:
+        for stamp in ("2024-02-29T23:30Z", "2000-02-29T00:00Z", "2023-12-31T23:59Z"):
+            assert to_epoch(stamp) == reference(stamp)
+
+    @pytest.mark.parametrize(
+        "bad",
+        ["2023-02-29T10:00Z", "2023-13-01T10:00Z", "2023-03-22T24:00Z", "", "nonsense"],
+    )
+    def test_invalid_timestamps_raise_value_error_like_strptime(self, bad: str) -> None:
+        with pytest.raises(ValueError):
+            to_epoch(bad)
+
+    def test_unpadded_forms_strptime_accepts_still_parse(self) -> None:
+        assert to_epoch("2023-3-22T11:30Z") == reference("2023-03-22T11:30Z")
+
+    def test_file_name_stamps(self) -> None:
+        assert compact_to_epoch("2023-03-22T1131Z") == reference(
+            "2023-03-22T1131Z", "%Y-%m-%dT%H%MZ"
+        )
+
+
+class TestHalfHourRun:
+    def test_a_contiguous_aligned_run_records_its_bounds(self) -> None:
+        run = HalfHourRun()
+
+        epochs = [run.push(s) for s in ("2023-03-22T11:30Z", "2023-03-22T12:00Z")]
+
+        assert (run.first, run.last) == (epochs[0], epochs[1])
+        assert epochs[1] - epochs[0] == 1800
+
+    def test_a_misaligned_window_is_rejected(self) -> None:
+        with pytest.raises(WindowSequenceError, match="half-hour boundary"):
+            HalfHourRun().push("2023-03-22T11:15Z")
+
+    def test_a_gap_is_rejected(self) -> None:
+        run = HalfHourRun()
+        run.push("2023-03-22T11:30Z")
+
+        with pytest.raises(WindowSequenceError, match="contiguous"):
+            run.push("2023-03-22T12:30Z")